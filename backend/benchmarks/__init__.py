@@ -0,0 +1,6 @@
+"""
+Load-test fixtures and benchmarks
+
+Run from the backend directory as modules, e.g.:
+    python -m benchmarks.synthetic_data --clients 1000
+"""
@@ -0,0 +1,143 @@
+"""
+Page-load benchmark for POST /api/batch
+
+Loads a dashboard-style page (a client and its contacts, notes, timeline,
+contracts, time entries, expenses and invoices, plus the client list) for
+random clients three ways and reports p50/p95 page time:
+
+- sequential: one GET after another (a component waiting on the previous one)
+- parallel:   all GETs at once over up to --connections connections (what a
+              browser does)
+- batch:      one POST /api/batch carrying all of them
+
+Requests carry an Origin header so the CORS middleware does the work it does
+for the admin UI. The first page is also checked for identical results
+across the three modes.
+
+Usage:
+    python -m benchmarks.batch_benchmark
+    python -m benchmarks.batch_benchmark --pages 500 --base-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.http_benchmark import (
+    DEFAULT_DATABASE_URL, discover_ids, discover_ids_from_db, ensure_seeded, percentile, start_server,
+)
+
+ORIGIN = "http://localhost:3000"
+
+
+def page_paths(client_id: int) -> List[str]:
+    return [
+        f"/api/clients/{client_id}",
+        f"/api/client-contacts/client/{client_id}",
+        f"/api/client-notes/client/{client_id}",
+        f"/api/client-timeline/client/{client_id}",
+        f"/api/contracts/client/{client_id}",
+        f"/api/time-entries/client/{client_id}",
+        f"/api/expenses/?client_id={client_id}",
+        f"/api/invoices/?client_id={client_id}",
+        "/api/clients/?limit=20",
+    ]
+
+
+async def load_sequential(http: httpx.AsyncClient, paths: List[str]) -> list:
+    results = []
+    for path in paths:
+        response = await http.get(path)
+        results.append((response.status_code, response.json()))
+    return results
+
+
+async def load_parallel(http: httpx.AsyncClient, paths: List[str]) -> list:
+    responses = await asyncio.gather(*(http.get(path) for path in paths))
+    return [(response.status_code, response.json()) for response in responses]
+
+
+async def load_batch(http: httpx.AsyncClient, paths: List[str]) -> list:
+    response = await http.post("/api/batch", json={"requests": [{"path": path} for path in paths]})
+    response.raise_for_status()
+    return [(result["status"], result["body"]) for result in response.json()]
+
+
+MODES = {"sequential": load_sequential, "parallel": load_parallel, "batch": load_batch}
+
+
+async def run(base_url: str, client_ids: List[int], args) -> dict:
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    headers = {"Origin": ORIGIN}
+    timings = {mode: [] for mode in MODES}
+    mismatches = []
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, headers=headers, timeout=60) as http:
+        first = page_paths(client_ids[0])
+        reference = await load_sequential(http, first)
+        for mode, load in MODES.items():
+            if await load(http, first) != reference:
+                mismatches.append(mode)
+
+        for i, client_id in enumerate(client_ids):
+            paths = page_paths(client_id)
+            # Rotate the order so no mode always runs against a warmer cache
+            modes = list(MODES.items())
+            for mode, load in modes[i % len(modes):] + modes[:i % len(modes)]:
+                start = time.perf_counter()
+                await load(http, paths)
+                timings[mode].append(time.perf_counter() - start)
+    return {"timings": timings, "mismatches": mismatches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page-load benchmark: separate GETs vs POST /api/batch")
+    parser.add_argument("--base-url", help="Benchmark an already running server instead of booting one")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL),
+                        help=f"Database for the booted server (default: {DEFAULT_DATABASE_URL})")
+    parser.add_argument("--clients", type=int, default=2000, help="Synthetic clients to seed an empty database with (default: 2000)")
+    parser.add_argument("--pages", type=int, default=200, help="Page loads per mode (default: 200)")
+    parser.add_argument("--connections", type=int, default=6, help="Connections for the parallel mode (default: 6, like a browser)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  Batch API Benchmark")
+    print("=" * 70)
+
+    process = None
+    base_url = args.base_url
+    try:
+        if not base_url:
+            ensure_seeded(args.database_url, args.clients, args.seed)
+            process, base_url = start_server(args.database_url, 1)
+            print(f"🚀 Server running at {base_url}")
+        ids = discover_ids(base_url) if args.base_url else discover_ids_from_db(args.database_url)
+        rng = random.Random(args.seed)
+        client_ids = [rng.choice(ids["clients"]) for _ in range(args.pages)]
+        print(f"⏱️  {args.pages} page loads x {len(MODES)} modes, {len(page_paths(0))} requests per page...")
+        result = asyncio.run(run(base_url, client_ids, args))
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print("=" * 70)
+    print(f"{'Mode':12} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    print("-" * 70)
+    for mode, durations in result["timings"].items():
+        durations = sorted(durations)
+        print(f"{mode:12} {percentile(durations, 50) * 1000:>9.1f} {percentile(durations, 95) * 1000:>9.1f} "
+              f"{sum(durations) / len(durations) * 1000:>9.1f}")
+    print("=" * 70)
+    if result["mismatches"]:
+        print(f"❌ Results differ from the sequential GETs: {', '.join(result['mismatches'])}")
+        raise SystemExit(1)
+    print("✅ Batch results match the separate GETs")
+
+
+if __name__ == "__main__":
+    main()
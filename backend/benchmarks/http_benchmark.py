@@ -0,0 +1,362 @@
+"""
+HTTP load/latency benchmark for the API
+
+Boots the app with uvicorn against a seeded benchmark database (seeding it with
+benchmarks.synthetic_data first if it has no synthetic clients), replays a
+weighted mix of CRM and invoicing requests at a fixed concurrency, and reports
+p50/p95/p99 latency and throughput per route.
+
+Results are saved as JSON. Pass --compare with an earlier result to flag routes
+whose latency regressed by more than --threshold percent (exit code 1).
+
+The request sequence is derived from --seed, so two runs against the same
+database replay the same requests in the same order.
+
+Usage:
+    python -m benchmarks.http_benchmark
+    python -m benchmarks.http_benchmark --clients 5000 --concurrency 32 --requests 10000
+    python -m benchmarks.http_benchmark --compare benchmarks/results/baseline.json --threshold 10
+    python -m benchmarks.http_benchmark --base-url http://127.0.0.1:8000   # existing server
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_DATABASE_URL = "sqlite:///./bench.db"
+STARTUP_TIMEOUT_SECONDS = 60
+
+
+class Scenario(NamedTuple):
+    route: str
+    weight: int
+    build: Callable[[random.Random, dict], str]
+
+
+def _pick(rng: random.Random, ids: List[int]) -> int:
+    return rng.choice(ids) if ids else 0
+
+
+# Weighted request mix, roughly what the admin UI does: mostly client and invoice
+# pages, some searches, occasional PDF generation
+SCENARIOS = [
+    Scenario("GET /api/clients/", 12, lambda rng, ids: f"/api/clients/?skip={rng.randrange(0, 500, 100)}&limit=100"),
+    Scenario("GET /api/clients/{id}", 18, lambda rng, ids: f"/api/clients/{_pick(rng, ids['clients'])}"),
+    Scenario("GET /api/client-contacts/client/{id}", 5, lambda rng, ids: f"/api/client-contacts/client/{_pick(rng, ids['clients'])}"),
+    Scenario("GET /api/client-notes/client/{id}", 8, lambda rng, ids: f"/api/client-notes/client/{_pick(rng, ids['clients'])}"),
+    Scenario("GET /api/client-timeline/client/{id}", 5, lambda rng, ids: f"/api/client-timeline/client/{_pick(rng, ids['clients'])}"),
+    Scenario("GET /api/time-entries/client/{id}", 10, lambda rng, ids: f"/api/time-entries/client/{_pick(rng, ids['clients'])}"),
+    Scenario("GET /api/expenses/?client_id={id}", 4, lambda rng, ids: f"/api/expenses/?client_id={_pick(rng, ids['clients'])}"),
+    Scenario("GET /api/invoices/", 8, lambda rng, ids: "/api/invoices/?limit=100"),
+    Scenario("GET /api/invoices/?client_id={id}", 6, lambda rng, ids: f"/api/invoices/?client_id={_pick(rng, ids['clients'])}"),
+    Scenario("GET /api/invoices/{id}", 10, lambda rng, ids: f"/api/invoices/{_pick(rng, ids['invoices'])}"),
+    Scenario("GET /api/invoices/{id}/generate-pdf", 2, lambda rng, ids: f"/api/invoices/{_pick(rng, ids['invoices'])}/generate-pdf"),
+    Scenario("GET /api/scope-of-work/", 3, lambda rng, ids: "/api/scope-of-work/"),
+    Scenario("GET /api/scope-of-work/{id}", 3, lambda rng, ids: f"/api/scope-of-work/{_pick(rng, ids['scopes'])}"),
+    Scenario("GET /api/search/?q=...", 4, lambda rng, ids: f"/api/search/?q={rng.choice(ids['names'] or ['acme'])}"),
+    Scenario("GET /api/debt-tracker/summary", 2, lambda rng, ids: "/api/debt-tracker/summary"),
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _synthetic_client_count(database_url: str) -> int:
+    from sqlalchemy import create_engine, text
+    from benchmarks.synthetic_data import SYNTHETIC_EMAIL_DOMAIN
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT COUNT(*) FROM clients WHERE email LIKE :pattern"),
+                {"pattern": f"%@{SYNTHETIC_EMAIL_DOMAIN}"}
+            ).scalar()
+    except Exception:
+        # Fresh database without tables yet
+        return 0
+    finally:
+        engine.dispose()
+
+
+def ensure_seeded(database_url: str, clients: int, seed: int):
+    """Seed the benchmark database with synthetic data unless it already has some"""
+    existing = _synthetic_client_count(database_url)
+    if existing:
+        print(f"✅ Benchmark database already has {existing} synthetic clients")
+        return
+    print(f"🌱 Seeding benchmark database with {clients} synthetic clients...")
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.synthetic_data", "--clients", str(clients), "--seed", str(seed)],
+        cwd=BACKEND_DIR, env={**os.environ, "DATABASE_URL": database_url}, check=True
+    )
+
+
+def start_server(database_url: str, workers: int) -> tuple:
+    """Start uvicorn on a free port and wait for /health; returns (process, base_url)"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env={**os.environ, "DATABASE_URL": database_url},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited during startup (code {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not become healthy within {STARTUP_TIMEOUT_SECONDS}s")
+
+
+def discover_ids(base_url: str) -> dict:
+    """Collect ids to request (and names to search for) through the API itself"""
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        clients = client.get("/api/clients/", params={"limit": 1000}).json()
+        invoices = client.get("/api/invoices/", params={"limit": 1000}).json()
+        scopes = client.get("/api/scope-of-work/").json()
+    ids = {
+        "clients": sorted(c["id"] for c in clients),
+        "invoices": sorted(i["id"] for i in invoices),
+        "scopes": sorted(s["id"] for s in scopes),
+        "names": sorted({c["last_name"].lower()[:4] for c in clients if c.get("last_name")}),
+    }
+    if not ids["clients"] or not ids["invoices"]:
+        raise RuntimeError("Benchmark database has no clients or invoices - seed it first")
+    return ids
+
+
+def discover_ids_from_db(database_url: str) -> dict:
+    """Same as discover_ids, read directly from the database (cheap, and covers every row)"""
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            ids = {
+                "clients": conn.execute(text("SELECT id FROM clients ORDER BY id")).scalars().all(),
+                "invoices": conn.execute(text("SELECT id FROM invoices ORDER BY id")).scalars().all(),
+                "scopes": conn.execute(text("SELECT id FROM scope_of_work ORDER BY id")).scalars().all(),
+                "names": sorted({name.lower()[:4] for name in conn.execute(
+                    text("SELECT DISTINCT last_name FROM clients WHERE last_name IS NOT NULL")).scalars()}),
+            }
+    finally:
+        engine.dispose()
+    if not ids["clients"] or not ids["invoices"]:
+        raise RuntimeError("Benchmark database has no clients or invoices - seed it first")
+    return ids
+
+
+def build_plan(ids: dict, count: int, seed: int) -> List[tuple]:
+    """Deterministic list of (route, path) to replay"""
+    rng = random.Random(seed)
+    weights = [scenario.weight for scenario in SCENARIOS]
+    plan = []
+    for scenario in rng.choices(SCENARIOS, weights=weights, k=count):
+        plan.append((scenario.route, scenario.build(rng, ids)))
+    return plan
+
+
+async def replay(base_url: str, plan: List[tuple], concurrency: int, timeout: float) -> tuple:
+    """Run the plan with `concurrency` workers; returns (samples, elapsed seconds)"""
+    samples = []  # (route, seconds, ok)
+    queue = iter(plan)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            for route, path in queue:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    await response.aread()
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                samples.append((route, time.perf_counter() - started, ok))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _stats(durations: List[float], errors: int, elapsed: float) -> dict:
+    durations = sorted(durations)
+    return {
+        "requests": len(durations),
+        "errors": errors,
+        "rps": round(len(durations) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 2) if durations else 0.0,
+        "p50_ms": round(percentile(durations, 50) * 1000, 2),
+        "p95_ms": round(percentile(durations, 95) * 1000, 2),
+        "p99_ms": round(percentile(durations, 99) * 1000, 2),
+        "max_ms": round(durations[-1] * 1000, 2) if durations else 0.0,
+    }
+
+
+def summarize(samples: List[tuple], elapsed: float) -> dict:
+    by_route = defaultdict(list)
+    errors = defaultdict(int)
+    for route, seconds, ok in samples:
+        by_route[route].append(seconds)
+        if not ok:
+            errors[route] += 1
+    return {
+        "overall": _stats([s[1] for s in samples], sum(errors.values()), elapsed),
+        "routes": {route: _stats(by_route[route], errors[route], elapsed) for route in sorted(by_route)},
+    }
+
+
+def compare(current: dict, baseline: dict, metric: str, threshold: float) -> List[str]:
+    """Routes whose metric got worse by more than threshold percent"""
+    regressions = []
+    for route, stats in current["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before or not before.get(metric):
+            continue
+        change = (stats[metric] - before[metric]) / before[metric] * 100
+        if change > threshold:
+            regressions.append(f"{route}: {metric} {before[metric]:.1f}ms -> {stats[metric]:.1f}ms (+{change:.0f}%)")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: dict, baseline: Optional[dict] = None):
+    print("=" * 70)
+    print(f"{'Route':44} {'req':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'rps':>7}")
+    print("-" * 70)
+    rows = list(result["routes"].items()) + [("OVERALL", result["overall"])]
+    for route, stats in rows:
+        line = (f"{route[:44]:44} {stats['requests']:>6} {stats['p50_ms']:>7.1f} {stats['p95_ms']:>7.1f} "
+                f"{stats['p99_ms']:>7.1f} {stats['rps']:>7.1f}")
+        if stats["errors"]:
+            line += f"  ❌ {stats['errors']} errors"
+        before = (baseline or {}).get("routes", {}).get(route) if route != "OVERALL" else (baseline or {}).get("overall")
+        if before and before.get("p95_ms"):
+            line += f"  ({(stats['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100:+.0f}% p95)"
+        print(line)
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP latency/throughput benchmark for the API")
+    parser.add_argument("--base-url", help="Benchmark an already running server instead of booting one")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL),
+                        help=f"Database for the booted server (default: {DEFAULT_DATABASE_URL})")
+    parser.add_argument("--clients", type=int, default=2000, help="Synthetic clients to seed an empty database with (default: 2000)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent in-flight requests (default: 16)")
+    parser.add_argument("--requests", type=int, default=3000, help="Measured requests (default: 3000)")
+    parser.add_argument("--warmup", type=int, default=200, help="Unmeasured warm-up requests (default: 200)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the request mix and synthetic data (default: 42)")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/http-<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"],
+                        help="Metric used for regression detection (default: p95_ms)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent (default: 10)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  HTTP Benchmark")
+    print("=" * 70)
+
+    process = None
+    base_url = args.base_url
+    try:
+        if not base_url:
+            ensure_seeded(args.database_url, args.clients, args.seed)
+            process, base_url = start_server(args.database_url, args.workers)
+            print(f"🚀 Server running at {base_url} ({args.workers} worker(s))")
+
+        ids = discover_ids(base_url) if args.base_url else discover_ids_from_db(args.database_url)
+        print(f"   {len(ids['clients'])} clients, {len(ids['invoices'])} invoices, {len(ids['scopes'])} SOWs to sample from")
+
+        if args.warmup:
+            print(f"🔥 Warming up ({args.warmup} requests)...")
+            asyncio.run(replay(base_url, build_plan(ids, args.warmup, args.seed + 1), args.concurrency, args.timeout))
+
+        print(f"⏱️  Replaying {args.requests} requests at concurrency {args.concurrency}...")
+        samples, elapsed = asyncio.run(replay(base_url, build_plan(ids, args.requests, args.seed), args.concurrency, args.timeout))
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "base_url": args.base_url,
+            "database": args.database_url if not args.base_url else None,
+            "workers": args.workers if not args.base_url else None,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "elapsed_seconds": round(elapsed, 3),
+        },
+        **summarize(samples, elapsed),
+    }
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(result, baseline)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"http-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"💾 Results saved to {output}")
+
+    if result["overall"]["errors"]:
+        print(f"⚠️  {result['overall']['errors']} request(s) failed")
+
+    if baseline:
+        regressions = compare(result, baseline, args.metric, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} route(s) regressed by more than {args.threshold:.0f}% ({args.metric}):")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ No route regressed by more than {args.threshold:.0f}% ({args.metric})")
+
+
+if __name__ == "__main__":
+    main()
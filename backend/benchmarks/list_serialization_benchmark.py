@@ -0,0 +1,145 @@
+"""
+List endpoint serialization benchmark: ORM + response_model vs utils.fast_list
+
+Runs each list route two ways against the benchmark database, in-process (no
+HTTP), and reports the best-of-N time per route and page size:
+
+- orm:  what the routes did before - db.query(Model) into the identity map,
+        then what FastAPI does with a response_model: validate every object
+        (from_attributes), dump it to Python and json.dumps the result
+- fast: the route function itself (Core select of the schema's columns,
+        one TypeAdapter.dump_json call)
+
+It also checks both paths produce the same JSON.
+
+Usage:
+    python -m benchmarks.list_serialization_benchmark
+    python -m benchmarks.list_serialization_benchmark --limits 100,1000,5000 --repeat 5
+"""
+import argparse
+import json
+import os
+import time
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from starlette.responses import Response
+
+from benchmarks.http_benchmark import DEFAULT_DATABASE_URL
+
+
+def _json_response_body(adapter: TypeAdapter, objects) -> bytes:
+    """FastAPI's serialize_response + JSONResponse.render for a response_model"""
+    validated = adapter.validate_python(objects, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+
+def build_routes(db, limit: int) -> List[tuple]:
+    """(name, orm path, fast path) per list route"""
+    from models import Client, DebtAccount, Invoice, InvoiceExpense
+    from routers import clients, debt_tracker, expenses, invoices
+    from schemas import ClientList, Invoice as InvoiceSchema, InvoiceExpense as InvoiceExpenseSchema
+
+    client_adapter = TypeAdapter(List[ClientList])
+    invoice_adapter = TypeAdapter(List[InvoiceSchema])
+    expense_adapter = TypeAdapter(List[InvoiceExpenseSchema])
+    debt_adapter = TypeAdapter(List[debt_tracker.DebtAccountResponse])
+
+    def orm_clients():
+        rows = db.query(Client).order_by(Client.created_at.desc()).limit(limit).all()
+        return _json_response_body(client_adapter, rows)
+
+    def orm_invoices():
+        # items / expenses are lazy-loaded per invoice during validation, as they were
+        rows = db.query(Invoice).order_by(Invoice.issue_date.desc()).limit(limit).all()
+        return _json_response_body(invoice_adapter, rows)
+
+    def orm_expenses():
+        rows = db.query(InvoiceExpense).order_by(InvoiceExpense.date.desc()).limit(limit).all()
+        return _json_response_body(expense_adapter, rows)
+
+    def orm_debt_accounts():
+        rows = db.query(DebtAccount).filter(DebtAccount.is_paid_off == False).all()
+        return _json_response_body(debt_adapter, [debt_tracker.DebtAccountResponse.from_orm(row) for row in rows])
+
+    return [
+        (f"GET /api/clients/?limit={limit}", orm_clients,
+         lambda: clients.get_clients(_request(), Response(), limit=limit, db=db).body),
+        (f"GET /api/invoices/?limit={limit}", orm_invoices,
+         lambda: invoices.get_invoices(_request(), Response(), limit=limit, db=db).body),
+        (f"GET /api/expenses/?limit={limit}", orm_expenses,
+         lambda: expenses.get_expenses(limit=limit, db=db).body),
+        ("GET /api/debt-tracker/accounts", orm_debt_accounts,
+         lambda: debt_tracker.get_debt_accounts(db=db).body),
+    ]
+
+
+def best_of(db, function: Callable[[], bytes], repeat: int) -> tuple:
+    best, body = float("inf"), b""
+    for _ in range(repeat):
+        db.expunge_all()  # start each run with an empty identity map, like a new request
+        start = time.perf_counter()
+        body = function()
+        best = min(best, time.perf_counter() - start)
+        db.rollback()
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM vs fast list serialization benchmark")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL),
+                        help=f"Seeded benchmark database (default: {DEFAULT_DATABASE_URL})")
+    parser.add_argument("--limits", default="100,1000,5000", help="Comma-separated page sizes (default: 100,1000,5000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, best is reported (default: 5)")
+    args = parser.parse_args()
+
+    # The routers bind to DATABASE_URL when imported; HTTP caching would answer repeats with 304s
+    # and the query cache with the first run's bytes
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["HTTP_CACHE_ENABLED"] = "false"
+    os.environ["QUERY_CACHE_ENABLED"] = "false"
+    from database import SessionLocal
+
+    print("=" * 70)
+    print("  List Serialization Benchmark")
+    print("=" * 70)
+
+    rows = []
+    mismatches = []
+    seen = set()
+    db = SessionLocal()
+    try:
+        for limit in [int(value) for value in args.limits.split(",") if value.strip()]:
+            for name, orm_path, fast_path in build_routes(db, limit):
+                if name in seen:
+                    continue  # routes without a limit only run once
+                seen.add(name)
+                orm_seconds, orm_body = best_of(db, orm_path, args.repeat)
+                fast_seconds, fast_body = best_of(db, fast_path, args.repeat)
+                if json.loads(orm_body) != json.loads(fast_body):
+                    mismatches.append(name)
+                rows.append((name, len(json.loads(fast_body)), orm_seconds, fast_seconds, len(fast_body)))
+                print(f"   ✓ {name}")
+    finally:
+        db.close()
+
+    print("=" * 70)
+    print(f"{'Route':36} {'rows':>6} {'orm ms':>9} {'fast ms':>9} {'speedup':>8}")
+    print("-" * 70)
+    for name, count, orm_seconds, fast_seconds, size in rows:
+        print(f"{name:36} {count:>6} {orm_seconds * 1000:>9.1f} {fast_seconds * 1000:>9.1f} {orm_seconds / fast_seconds:>7.1f}x")
+    print("=" * 70)
+    if mismatches:
+        print(f"❌ JSON differs between the ORM and fast paths: {', '.join(mismatches)}")
+        raise SystemExit(1)
+    print("✅ Both paths produce the same JSON")
+
+
+if __name__ == "__main__":
+    main()
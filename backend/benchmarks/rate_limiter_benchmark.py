@@ -0,0 +1,168 @@
+"""
+Contention benchmark for utils.rate_limiter
+
+Hammers a limiter from several threads or processes and reports throughput,
+per-check latency and whether the limit held:
+
+- hot:    every worker checks the same identity (worst-case contention on one
+          bucket). The bucket holds --capacity tokens and effectively never
+          refills, so exactly --capacity checks may succeed in total. With the
+          memory backend and several processes each process has its own
+          buckets, so N processes let N x capacity through - which is what the
+          sqlite backend is for.
+- spread: workers check random identities out of --keys (typical traffic)
+
+It also checks that the memory backend stays bounded: --keys distinct
+identities against a backend capped at --max-keys buckets.
+
+Usage:
+    python -m benchmarks.rate_limiter_benchmark
+    python -m benchmarks.rate_limiter_benchmark --workers 8 --ops 20000 --backends sqlite
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Tuple
+
+from benchmarks.http_benchmark import percentile
+from utils.rate_limiter import MemoryBackend, RateLimiter, SQLiteBackend
+
+# Refill slow enough that no token comes back during a run
+NO_REFILL_SECONDS = 10 ** 9
+
+
+def make_limiter(backend_kind: str, path: str, capacity: int, max_keys: int) -> RateLimiter:
+    backend = SQLiteBackend(path) if backend_kind == "sqlite" else MemoryBackend(max_keys=max_keys)
+    return RateLimiter("bench", capacity=capacity, per_seconds=NO_REFILL_SECONDS, backend=backend)
+
+
+def run_worker(limiter: RateLimiter, identities: List[str], ops: int, seed: int) -> Tuple[List[float], int]:
+    rng = random.Random(seed)
+    latencies = []
+    allowed = 0
+    for _ in range(ops):
+        identity = identities[0] if len(identities) == 1 else rng.choice(identities)
+        start = time.perf_counter()
+        result = limiter.check(identity)
+        latencies.append(time.perf_counter() - start)
+        allowed += result.allowed
+    return latencies, allowed
+
+
+def _process_worker(args) -> Tuple[List[float], int]:
+    backend_kind, path, capacity, max_keys, identities, ops, seed = args
+    return run_worker(make_limiter(backend_kind, path, capacity, max_keys), identities, ops, seed)
+
+
+def run_scenario(backend_kind: str, mode: str, pattern: str, workers: int, args, tmp_dir: str) -> dict:
+    path = os.path.join(tmp_dir, f"{backend_kind}-{mode}-{pattern}-{workers}.db")
+    identities = ["hot"] if pattern == "hot" else [f"user{i}@example.com" for i in range(args.keys)]
+    capacity = args.capacity if pattern == "hot" else args.ops * workers  # spread: measure speed, not denials
+
+    start = time.perf_counter()
+    if mode == "threads":
+        limiter = make_limiter(backend_kind, path, capacity, args.max_keys)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda i: run_worker(limiter, identities, args.ops, args.seed + i), range(workers)))
+    else:
+        jobs = [(backend_kind, path, capacity, args.max_keys, identities, args.ops, args.seed + i) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_process_worker, jobs))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for worker_latencies, _ in results for latency in worker_latencies)
+    allowed = sum(worker_allowed for _, worker_allowed in results)
+    shared = mode == "threads" or backend_kind == "sqlite"
+    expected = (capacity if shared else capacity * workers) if pattern == "hot" else None
+    return {
+        "name": f"{backend_kind:6} {mode:9} {pattern:6}",
+        "workers": workers,
+        "ops_per_second": len(latencies) / elapsed,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "allowed": allowed,
+        "expected": expected,
+        "shared": shared,
+    }
+
+
+def check_memory_bound(args) -> Tuple[int, int]:
+    backend = MemoryBackend(max_keys=args.max_keys)
+    limiter = RateLimiter("bench", capacity=args.capacity, per_seconds=NO_REFILL_SECONDS, backend=backend)
+    peak = 0
+    for i in range(args.keys):
+        limiter.check(f"user{i}@example.com")
+        peak = max(peak, len(backend))
+    return peak, len(backend)
+
+
+def check_idle_eviction(args) -> int:
+    # Buckets that refill in 50ms are dropped as soon as they're full again
+    backend = MemoryBackend(max_keys=args.max_keys)
+    limiter = RateLimiter("bench", capacity=args.capacity, per_seconds=0.05, backend=backend)
+    for i in range(min(args.keys, args.max_keys)):
+        limiter.check(f"user{i}@example.com")
+    time.sleep(0.1)
+    limiter.check("late@example.com")
+    return len(backend)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contention benchmark for the rate limiter backends")
+    parser.add_argument("--backends", default="memory,sqlite", help="Comma-separated backends (default: memory,sqlite)")
+    parser.add_argument("--workers", type=int, default=4, help="Threads / processes per scenario (default: 4)")
+    parser.add_argument("--ops", type=int, default=5000, help="Checks per worker (default: 5000)")
+    parser.add_argument("--capacity", type=int, default=100, help="Bucket capacity in the hot scenario (default: 100)")
+    parser.add_argument("--keys", type=int, default=50000, help="Distinct identities in the spread scenario (default: 50000)")
+    parser.add_argument("--max-keys", type=int, default=10000, help="Memory backend bucket cap (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  Rate Limiter Contention Benchmark")
+    print("=" * 70)
+    print(f"   {args.workers} workers x {args.ops} checks, hot capacity {args.capacity}, {args.keys} spread identities")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend_kind in [b.strip() for b in args.backends.split(",") if b.strip()]:
+            for mode in ("threads", "processes"):
+                for pattern in ("hot", "spread"):
+                    for workers in sorted({1, args.workers}):
+                        if workers == 1 and mode == "processes":
+                            continue
+                        rows.append(run_scenario(backend_kind, mode, pattern, workers, args, tmp_dir))
+                        print(f"   ✓ {rows[-1]['name'].strip()} x{workers}")
+
+    print("=" * 70)
+    print(f"{'Scenario':26} {'workers':>7} {'ops/s':>9} {'p50 µs':>8} {'p99 µs':>8}  allowed")
+    print("-" * 70)
+    failures = 0
+    for row in rows:
+        line = f"{row['name']:26} {row['workers']:>7} {row['ops_per_second']:>9.0f} {row['p50_us']:>8.1f} {row['p99_us']:>8.1f}  "
+        if row["expected"] is None:
+            line += f"{row['allowed']}"
+        elif row["allowed"] != row["expected"]:
+            failures += 1
+            line += f"{row['allowed']} ❌ expected {row['expected']}"
+        elif not row["shared"]:
+            line += f"{row['allowed']} ⚠️  per-process buckets"
+        else:
+            line += f"{row['allowed']} ✅"
+        print(line)
+    print("=" * 70)
+
+    peak, final = check_memory_bound(args)
+    bounded = peak <= args.max_keys
+    print(f"{'✅' if bounded else '❌'} Memory backend: {args.keys} identities -> peak {peak} buckets (cap {args.max_keys}), {final} kept")
+    remaining = check_idle_eviction(args)
+    print(f"{'✅' if remaining == 1 else '❌'} Idle eviction: {remaining} bucket(s) left after the others refilled")
+    if failures or not bounded or remaining != 1:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
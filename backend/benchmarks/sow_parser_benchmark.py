@@ -0,0 +1,364 @@
+"""
+SOW section parser benchmark: line-by-line scanning vs utils.sow_parser
+
+Parses every sample AI response in benchmarks/fixtures/sow_ai_responses/
+with the old parse_ai_response_to_sections (kept below verbatim) and the
+current one, and reports per fixture:
+
+- time per parse (best of --repeat runs of --number parses)
+- how many of the 19 sections came from the AI text rather than template
+  padding, for each parser, and how many stray sections the old parser made
+  up (e.g. from a "4. Deliverables will be ..." line inside section 8)
+
+The current parser is checked against expected.json (which sections are
+found, where each one starts and ends, how many suggestions); the benchmark
+exits 1 on any mismatch. --scale also times the standard response with every
+section's content repeated N times, to show how each parser grows with output
+length.
+
+Fixtures share one SOW body laid out in the formats gpt-4o-mini returns:
+SECTION:/CONTENT: blocks, markdown and bold headings, title variations,
+truncated output, inline content, skipped sections and a refusal. Add a .txt file and an entry in
+expected.json when a new variation shows up.
+
+Usage:
+    python -m benchmarks.sow_parser_benchmark
+    python -m benchmarks.sow_parser_benchmark --repeat 5 --number 200 --scale 1,10,50
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from typing import Callable
+
+from routers.scope_of_work import AIGenerateSOWRequest, generate_sow_with_templates, parse_ai_response_to_sections
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "sow_ai_responses")
+
+
+def legacy_parse(ai_content: str, request) -> tuple:
+    """parse_ai_response_to_sections before utils/sow_parser.py, verbatim"""
+    sections = []
+    suggestions = []
+    current_section = None
+    current_content = []
+    in_suggestions = False
+    
+    lines = ai_content.split('\n')
+    
+    # Expected section titles (for matching)
+    expected_sections = [
+        "1. Executive Summary / Purpose",
+        "2. Definitions & Terminology",
+        "3. Scope of Work (Core Section)",
+        "4. Deliverables",
+        "5. Milestones & Timeline",
+        "6. Technical Architecture",
+        "7. Roles & Responsibilities",
+        "8. Acceptance Criteria & Review Process",
+        "9. Change Management",
+        "10. Pricing & Payment Terms",
+        "11. IP Ownership & Licensing",
+        "12. Confidentiality & Data Handling",
+        "13. Security & Compliance",
+        "14. Testing & QA",
+        "15. Deployment & Handoff",
+        "16. Support, Maintenance & Warranty",
+        "17. Assumptions & Constraints",
+        "18. Termination & Exit",
+        "19. Legal Boilerplate (Often Referenced)",
+    ]
+    
+    for line in lines:
+        line_stripped = line.strip()
+        line_upper = line_stripped.upper()
+        
+        # Check for suggestions section
+        if 'SUGGESTIONS' in line_upper and ':' in line:
+            in_suggestions = True
+            continue
+        elif in_suggestions:
+            if line_stripped:
+                suggestions.append(line_stripped)
+            continue
+        
+        # Check for section header - more flexible matching
+        section_found = False
+        # Handle ### SECTION: format (markdown headers)
+        if line_stripped.startswith('### SECTION:') or line_stripped.startswith('## SECTION:'):
+            # Markdown format: ### SECTION: 1. Title
+            section_text = line_stripped.replace('### SECTION:', '').replace('## SECTION:', '').replace('SECTION:', '').strip()
+            section_found = True
+        elif line_stripped.startswith('SECTION:'):
+            # Standard format: SECTION: 1. Title
+            section_text = line_stripped.replace('SECTION:', '').strip()
+            section_found = True
+        elif line_stripped.startswith('###') and any(exp in line_stripped for exp in expected_sections):
+            # Markdown format: ### 6. Technical Architecture
+            section_text = line_stripped.replace('###', '').strip()
+            section_found = True
+        elif any(line_stripped.startswith(exp) for exp in expected_sections):
+            # Direct section title match
+            section_text = line_stripped
+            section_found = True
+        elif line_stripped and any(exp in line_stripped for exp in expected_sections):
+            # Partial match - find the matching section
+            for exp in expected_sections:
+                if exp in line_stripped:
+                    section_text = exp
+                    section_found = True
+                    break
+        
+        if section_found:
+            # Save previous section
+            if current_section and current_content:
+                # Clean up previous section title
+                cleaned_prev_title = current_section
+                if cleaned_prev_title.startswith('###'):
+                    cleaned_prev_title = cleaned_prev_title.replace('###', '').strip()
+                if cleaned_prev_title.startswith('##'):
+                    cleaned_prev_title = cleaned_prev_title.replace('##', '').strip()
+                if cleaned_prev_title.startswith('SECTION:'):
+                    cleaned_prev_title = cleaned_prev_title.replace('SECTION:', '').strip()
+                
+                # Clean up content
+                cleaned_prev_content = []
+                for line in current_content:
+                    line_stripped = line.strip()
+                    if line_stripped in ['SECTION:', 'CONTENT:'] or line_stripped.startswith('### SECTION:') or line_stripped.startswith('## SECTION:'):
+                        continue
+                    if line_stripped.startswith('SECTION: ') and len(line_stripped) > 10:
+                        cleaned_prev_content.append(line.replace('SECTION: ', ''))
+                    elif line_stripped.startswith('CONTENT: ') and len(line_stripped) > 10:
+                        cleaned_prev_content.append(line.replace('CONTENT: ', ''))
+                    else:
+                        cleaned_prev_content.append(line)
+                
+                sections.append({
+                    "title": cleaned_prev_title,
+                    "content": '\n'.join(cleaned_prev_content).strip(),
+                    "order": len(sections) + 1
+                })
+            # Start new section
+            current_section = section_text
+            current_content = []
+            continue
+        
+        # Check for content marker
+        if line_stripped.startswith('CONTENT:'):
+            content_line = line_stripped.replace('CONTENT:', '').strip()
+            if content_line:
+                current_content.append(content_line)
+            continue
+        
+        # Skip lines that look like section headers in content (clean up)
+        if current_section and (line_stripped.startswith('### SECTION:') or line_stripped.startswith('## SECTION:') or 
+                               (line_stripped.startswith('SECTION:') and not line_stripped.startswith('SECTION: '))):
+            continue
+        
+        # Continue content if we're in a section
+        if current_section:
+            # Skip empty lines only if we haven't started content yet
+            if line_stripped or current_content:
+                # Clean up any remaining SECTION: or CONTENT: markers in content
+                cleaned_line = line
+                if line_stripped.startswith('SECTION:') and 'CONTENT:' not in line:
+                    continue  # Skip standalone SECTION: lines in content
+                current_content.append(cleaned_line)
+    
+    # Save last section
+    if current_section and current_content:
+        # Clean up content - remove any SECTION: or CONTENT: markers that might be in the content
+        cleaned_content = []
+        for line in current_content:
+            line_stripped = line.strip()
+            # Skip lines that are just markers
+            if line_stripped in ['SECTION:', 'CONTENT:'] or line_stripped.startswith('### SECTION:') or line_stripped.startswith('## SECTION:'):
+                continue
+            # Remove SECTION: or CONTENT: prefixes if they appear in the middle of content
+            if line_stripped.startswith('SECTION: ') and len(line_stripped) > 10:
+                cleaned_content.append(line.replace('SECTION: ', ''))
+            elif line_stripped.startswith('CONTENT: ') and len(line_stripped) > 10:
+                cleaned_content.append(line.replace('CONTENT: ', ''))
+            else:
+                cleaned_content.append(line)
+        
+        # Clean up section title - remove any markdown formatting
+        cleaned_title = current_section
+        if cleaned_title.startswith('###'):
+            cleaned_title = cleaned_title.replace('###', '').strip()
+        if cleaned_title.startswith('##'):
+            cleaned_title = cleaned_title.replace('##', '').strip()
+        # Remove SECTION: prefix if it somehow got into the title
+        if cleaned_title.startswith('SECTION:'):
+            cleaned_title = cleaned_title.replace('SECTION:', '').strip()
+        
+        # Final cleanup of content - remove any remaining markers
+        final_content = '\n'.join(cleaned_content).strip()
+        # Remove any SECTION: or CONTENT: lines that might be in the middle
+        final_lines = []
+        for line in final_content.split('\n'):
+            line_stripped = line.strip()
+            # Skip lines that are just markers
+            if line_stripped in ['SECTION:', 'CONTENT:', '### SECTION:', '## SECTION:']:
+                continue
+            # Remove SECTION: or CONTENT: prefixes if they appear
+            if line_stripped.startswith('SECTION: '):
+                final_lines.append(line.replace('SECTION: ', ''))
+            elif line_stripped.startswith('CONTENT: '):
+                final_lines.append(line.replace('CONTENT: ', ''))
+            elif line_stripped.startswith('### SECTION: '):
+                final_lines.append(line.replace('### SECTION: ', ''))
+            elif line_stripped.startswith('## SECTION: '):
+                final_lines.append(line.replace('## SECTION: ', ''))
+            else:
+                final_lines.append(line)
+        
+        sections.append({
+            "title": cleaned_title,
+            "content": '\n'.join(final_lines).strip(),
+            "order": len(sections) + 1
+        })
+    
+    # If we got some sections but not all, that's okay - return what we have
+    # Only fallback to templates if we got very few sections (likely parsing failure)
+    if len(sections) < 5:
+        print(f"Warning: Only parsed {len(sections)} sections from AI response. Falling back to templates.")
+        print(f"First 500 chars of AI response: {ai_content[:500]}")
+        template_result = generate_sow_with_templates(request, {}, None)["sections"]
+        return template_result, []
+    
+    # If we have sections but not all 19, pad with templates for missing ones
+    if len(sections) < 19:
+        print(f"Warning: Parsed {len(sections)} sections, expected 19. Some sections may be missing.")
+        # Get template sections to fill in gaps
+        template_sections = generate_sow_with_templates(request, {}, None)["sections"]
+        existing_titles = {s["title"] for s in sections}
+        
+        # Add missing sections from templates
+        for template_section in template_sections:
+            if template_section["title"] not in existing_titles:
+                sections.append(template_section)
+    
+    return sections, suggestions
+
+
+def load_fixtures() -> tuple:
+    with open(os.path.join(FIXTURES_DIR, "expected.json")) as f:
+        expected = json.load(f)
+    texts = {}
+    for name in expected:
+        with open(os.path.join(FIXTURES_DIR, f"{name}.txt")) as f:
+            texts[name] = f.read()
+    return texts, expected
+
+
+def check(name: str, sections: list, suggestions: list, expected: dict) -> list:
+    """Differences between a parse and expected.json"""
+    from utils.sow_parser import SECTION_TITLES
+
+    errors = []
+    by_number = {section["title"].split(".")[0]: section["content"] for section in sections}
+    if not expected["sections"]:
+        return errors  # template fallback; nothing to compare
+    for number, (starts, ends) in expected["sections"].items():
+        content = by_number.get(number, "")
+        if not content.startswith(starts) or not content.endswith(ends):
+            errors.append(f"{name}: section {number} content starts {content[:40]!r}, ends {content[-40:]!r}")
+    if len(suggestions) != expected["suggestions"]:
+        errors.append(f"{name}: {len(suggestions)} suggestions, expected {expected['suggestions']}")
+    if [section["title"] for section in sections] != SECTION_TITLES:
+        errors.append(f"{name}: section titles are not the 19 SOW titles in order")
+    return errors
+
+
+def from_ai(sections: list, templates: dict) -> tuple:
+    """(SOW sections whose content isn't template padding, sections that aren't SOW sections)"""
+    found = {section["title"] for section in sections
+             if section["title"] in templates and section["content"] != templates[section["title"]]}
+    return len(found), sum(1 for section in sections if section["title"] not in templates)
+
+
+def best_of(function: Callable[[], tuple], repeat: int, number: int) -> float:
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):  # both parsers print warnings on padding
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def scaled(text: str, factor: int) -> str:
+    """The standard response with every section's content repeated `factor` times"""
+    blocks = text.split("\n\nSECTION: ")
+    out = []
+    for block in blocks:
+        header, _, content = block.partition("\nCONTENT: ")
+        if not content:
+            out.append(block)
+            continue
+        suggestions = ""
+        if "\n\nSUGGESTIONS:" in content:
+            content, _, suggestions = content.partition("\n\nSUGGESTIONS:")
+            suggestions = "\n\nSUGGESTIONS:" + suggestions
+        out.append(header + "\nCONTENT: " + "\n\n".join([content] * factor) + suggestions)
+    return "\n\nSECTION: ".join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SOW section parser benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, best is reported (default: 5)")
+    parser.add_argument("--number", type=int, default=100, help="Parses per run (default: 100)")
+    parser.add_argument("--scale", default="1,10,50", help="Content repetition factors for the scaling run (default: 1,10,50)")
+    args = parser.parse_args()
+
+    request = AIGenerateSOWRequest(client_id=1, project_title="Customer Portal", pricing_type="milestones", num_milestones=3)
+    templates = {section["title"]: section["content"] for section in generate_sow_with_templates(request, {}, None)["sections"]}
+    texts, expected = load_fixtures()
+
+    print("=" * 70)
+    print("  SOW Section Parser Benchmark")
+    print("=" * 70)
+
+    rows = []
+    errors = []
+    for name, text in texts.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            legacy_sections, _ = legacy_parse(text, request)
+            sections, suggestions = parse_ai_response_to_sections(text, request)
+        errors += check(name, sections, suggestions, expected[name])
+        legacy_seconds = best_of(lambda: legacy_parse(text, request), args.repeat, args.number)
+        seconds = best_of(lambda: parse_ai_response_to_sections(text, request), args.repeat, args.number)
+        (legacy_found, legacy_stray), (found, _) = from_ai(legacy_sections, templates), from_ai(sections, templates)
+        rows.append((name, len(text), legacy_found, legacy_stray, found, legacy_seconds, seconds))
+        print(f"   ✓ {name}")
+
+    for factor in [int(value) for value in args.scale.split(",") if value.strip()]:
+        text = scaled(texts["standard"], factor)
+        number = max(1, args.number // factor)
+        legacy_seconds = best_of(lambda: legacy_parse(text, request), args.repeat, number)
+        seconds = best_of(lambda: parse_ai_response_to_sections(text, request), args.repeat, number)
+        rows.append((f"standard x{factor}", len(text), None, None, None, legacy_seconds, seconds))
+
+    print("=" * 70)
+    print(f"{'Fixture':24} {'chars':>7} {'old':>4} {'+bad':>4} {'new':>4} {'old us':>8} {'new us':>8} {'speedup':>8}")
+    print("-" * 70)
+    for name, size, legacy_found, legacy_stray, found, legacy_seconds, seconds in rows:
+        counts = f"{legacy_found:>4} {legacy_stray:>4} {found:>4}" if found is not None else f"{'':>14}"
+        print(f"{name:24} {size:>7} {counts} {legacy_seconds * 1e6:>8.0f} {seconds * 1e6:>8.0f} "
+              f"{legacy_seconds / seconds:>7.1f}x")
+    print("old / new: sections taken from the AI text (of 19); +bad: stray sections the old parser added")
+    print("=" * 70)
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        raise SystemExit(1)
+    print("✅ All fixtures parsed as expected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark for POST /api/scope-of-work/{id}/ai/regenerate-sections
+
+Builds a throwaway SQLite database with one client and a 19-section SOW, swaps
+the OpenAI client for a fake one that takes --latency seconds per call, and
+times regenerating 1, 4, 8, ... sections in one request:
+
+- sequential: SOW_AI_SECTION_CONCURRENCY=1 (one call after another, what
+  calling /ai/regenerate-section per section costs)
+- concurrent: SOW_AI_SECTION_CONCURRENCY=--concurrency
+
+It reports the calls in flight at once and the request's DB query count
+(from Server-Timing; the context is loaded once however many sections are
+requested), checks the new content was saved, and checks that a request
+where one section's call fails saves nothing and that a four-section request
+fits the default rate limit. Exits 1 if a check fails.
+
+Usage:
+    python -m benchmarks.sow_regenerate_benchmark
+    python -m benchmarks.sow_regenerate_benchmark --sections 1,4,8,19 --latency 0.5 --concurrency 4
+"""
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+
+class FakeOpenAI:
+    """Stands in for openai.OpenAI: every section call takes `latency` seconds"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.fail = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature, max_tokens, **kwargs):
+        title = re.search(r"SECTION TO REGENERATE:\n(.+)", messages[-1]["content"]).group(1)
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            if title in self.fail:
+                raise RuntimeError("simulated API error")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        content = f"SECTION: {title}\nCONTENT: Regenerated {title} (call {call}).\n\nSecond paragraph."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")])
+
+
+def seed(SessionLocal) -> int:
+    """One client and a SOW with the 19 template sections; returns the SOW id"""
+    from models import Client, ClientTechStack, ScopeOfWork, ScopeSection
+    from utils.sow_templates import SOW_SECTIONS
+
+    db = SessionLocal()
+    try:
+        client = Client(first_name="Dana", last_name="Whitfield", company="Harbor Freight Logistics",
+                        email="dana@example.com", client_date=datetime(2025, 1, 6),
+                        description="Customer portal for shipment tracking")
+        client.tech_stack = [ClientTechStack(technology="React", category="frontend"),
+                             ClientTechStack(technology="FastAPI", category="backend")]
+        scope = ScopeOfWork(client=client, title="Customer Portal")
+        scope.sections = [ScopeSection(title=section["title"], content=section["template"], order=section["order"])
+                          for section in SOW_SECTIONS]
+        db.add(scope)
+        db.commit()
+        return scope.id
+    finally:
+        db.close()
+
+
+def query_count(response) -> int:
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else -1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent per-section SOW regeneration benchmark")
+    parser.add_argument("--sections", default="1,4,8", help="Comma-separated section counts per request (default: 1,4,8)")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per simulated OpenAI call (default: 1.0)")
+    parser.add_argument("--concurrency", type=int, default=4, help="SOW_AI_SECTION_CONCURRENCY for the concurrent run (default: 4)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="sow_regenerate_")
+    # The app binds to DATABASE_URL when imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["RATE_LIMIT_BACKEND"] = "memory"
+    from fastapi.testclient import TestClient
+    from database import SessionLocal
+    from main import app
+    from migrations import ensure_schema_current
+    from routers import scope_of_work
+    from utils.rate_limiter import MemoryBackend, RateLimiter
+    from utils.sow_parser import SECTION_TITLES
+
+    print("=" * 70)
+    print("  SOW Section Regeneration Benchmark")
+    print("=" * 70)
+
+    rows = []
+    failures = []
+    try:
+        ensure_schema_current()
+        scope_id = seed(SessionLocal)
+        fake = FakeOpenAI(args.latency)
+        scope_of_work.get_openai_client = lambda: fake
+        http = TestClient(app)
+
+        # The default section limit lets a caller refresh four sections at once
+        response = http.post(
+            f"/api/scope-of-work/{scope_id}/ai/regenerate-sections", json={"section_titles": SECTION_TITLES[:4]}
+        )
+        if response.status_code != 200:
+            failures.append(f"4 sections under the default rate limit: HTTP {response.status_code} {response.text[:200]}")
+        else:
+            print("   ✓ 4 sections fit the default rate limit")
+
+        # Keep the AI rate limit out of the way for the timed runs: every run comes from the same client IP
+        scope_of_work.sow_ai_section_rate_limiter = RateLimiter(
+            "bench", capacity=10 ** 6, per_seconds=1, backend=MemoryBackend()
+        )
+
+        def regenerate(titles: list):
+            return http.post(f"/api/scope-of-work/{scope_id}/ai/regenerate-sections", json={"section_titles": titles})
+
+        def saved() -> dict:
+            return {s["title"]: s["content"] for s in http.get(f"/api/scope-of-work/{scope_id}").json()["sections"]}
+
+        for count in [int(value) for value in args.sections.split(",") if value.strip()]:
+            titles = SECTION_TITLES[:count]
+            timings = {}
+            for mode, concurrency in (("sequential", 1), ("concurrent", args.concurrency)):
+                scope_of_work.SOW_AI_SECTION_CONCURRENCY = concurrency
+                fake.max_in_flight = 0
+                start = time.perf_counter()
+                response = regenerate(titles)
+                timings[mode] = time.perf_counter() - start
+                if response.status_code != 200:
+                    failures.append(f"{count} sections ({mode}): HTTP {response.status_code} {response.text[:200]}")
+                    continue
+                returned = {s["title"]: s["content"] for s in response.json()["sections"]}
+                current = saved()
+                if any(current[title] != returned[title] or not returned[title].startswith("Regenerated") for title in titles):
+                    failures.append(f"{count} sections ({mode}): regenerated content was not saved")
+            rows.append((count, timings["sequential"], timings["concurrent"], fake.max_in_flight, query_count(response)))
+            print(f"   ✓ {count} section(s)")
+
+        # One failing call: nothing is saved
+        scope_of_work.SOW_AI_SECTION_CONCURRENCY = args.concurrency
+        titles = SECTION_TITLES[:4]
+        before = saved()
+        fake.fail = {titles[-1]}
+        response = regenerate(titles)
+        fake.fail = set()
+        if response.status_code != 500 or saved() != before:
+            failures.append(f"partial failure: HTTP {response.status_code}, sections changed: {saved() != before}")
+        else:
+            print("   ✓ partial failure saves nothing")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("=" * 70)
+    print(f"{'sections':>8} {'sequential s':>13} {'concurrent s':>13} {'speedup':>8} {'in flight':>10} {'db queries':>11}")
+    print("-" * 70)
+    for count, sequential, concurrent, in_flight, queries in rows:
+        print(f"{count:>8} {sequential:>13.2f} {concurrent:>13.2f} {sequential / concurrent:>7.1f}x {in_flight:>10} {queries:>11}")
+    print("=" * 70)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        raise SystemExit(1)
+    print("✅ Sections regenerated concurrently and saved atomically")
+
+
+if __name__ == "__main__":
+    main()
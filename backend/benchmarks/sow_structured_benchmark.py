@@ -0,0 +1,206 @@
+"""
+AI SOW generation benchmark: text output vs structured (JSON schema) output
+
+Runs the SOW generation pipeline (build_sow_prompt -> OpenAI -> sections)
+against a fake OpenAI client that answers with the SOW from
+benchmarks/fixtures/sow_ai_responses/standard.txt, in the layout each mode
+asks for. On the first call of each SOW the fake misbehaves the way the real
+model does:
+
+- clean:       all 19 sections
+- skipped:     leaves out three sections
+- truncated:   hits max_tokens 70% of the way through
+- placeholder: writes "[generated content]" / "TBD" for two sections
+
+A SOW is usable when all 19 sections hold real AI content. In text mode a
+SOW with padded or placeholder sections is re-run from scratch (what users
+do today, up to --max-runs); structured mode re-requests only the missing
+sections. Per mode and scenario the benchmark reports calls, prompt and
+completion tokens, and the simulated latency of the OpenAI calls
+(--seconds-per-call + completion tokens / --tokens-per-second). Tokens are
+estimated as 4 characters each.
+
+Exits 1 if structured mode doesn't produce a usable SOW for every scenario.
+
+Usage:
+    python -m benchmarks.sow_structured_benchmark
+    python -m benchmarks.sow_structured_benchmark --tokens-per-second 60 --max-runs 3
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+from types import SimpleNamespace
+
+from routers.scope_of_work import (
+    AIGenerateSOWRequest, SOW_SYSTEM_PROMPT, build_sow_prompt, layout_sections, parse_ai_response_to_sections,
+)
+from utils.sow_parser import SECTION_TITLES, parse_sow_sections
+from utils.sow_structured import add_usage, generate_structured_sow
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "sow_ai_responses", "standard.txt")
+MAX_TOKENS = 8000
+CHARS_PER_TOKEN = 4
+
+SCENARIOS = ["clean", "skipped", "truncated", "placeholder"]
+SKIPPED = [SECTION_TITLES[6], SECTION_TITLES[11], SECTION_TITLES[15]]
+PLACEHOLDERS = {SECTION_TITLES[8]: "[generated content]", SECTION_TITLES[16]: "TBD"}
+
+
+class FakeOpenAI:
+    """Stands in for openai.OpenAI: chat.completions.create() answers from the fixture SOW"""
+
+    def __init__(self, scenario: str, sections: dict, suggestions: list):
+        self.scenario = scenario
+        self.sections = sections
+        self.suggestions = suggestions
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _answer(self, titles: list, first: bool) -> tuple:
+        """(title, content) pairs for the requested titles, as the model would write them"""
+        faulty = first and self.scenario in ("skipped", "placeholder")
+        answer = []
+        for title in titles:
+            if faulty and self.scenario == "skipped" and title in SKIPPED:
+                continue
+            content = PLACEHOLDERS.get(title) if faulty and self.scenario == "placeholder" else None
+            answer.append((title, content or self.sections[title]))
+        return answer
+
+    def create(self, model, messages, temperature, max_tokens, response_format=None):
+        first = not self.requests
+        self.requests.append({"max_tokens": max_tokens, "response_format": response_format})
+        if response_format:
+            titles = response_format["json_schema"]["schema"]["properties"]["sections"]["items"]["properties"]["title"]["enum"]
+            content = json.dumps({
+                "sections": [
+                    {"title": title, "order": SECTION_TITLES.index(title) + 1, "content": text}
+                    for title, text in self._answer(titles, first)
+                ],
+                "suggestions": self.suggestions if len(titles) == len(SECTION_TITLES) else [],
+            })
+        else:
+            content = "".join(f"SECTION: {title}\nCONTENT: {text}\n\n" for title, text in self._answer(SECTION_TITLES, first))
+            content += "SUGGESTIONS:\n" + "\n".join(self.suggestions) + "\n"
+
+        finish_reason = "stop"
+        limit = max_tokens * CHARS_PER_TOKEN
+        if first and self.scenario == "truncated":
+            limit = min(limit, int(len(content) * 0.7))
+        if len(content) > limit:
+            content, finish_reason = content[:limit], "length"
+        prompt_chars = sum(len(message["content"]) for message in messages)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+            usage=SimpleNamespace(prompt_tokens=prompt_chars // CHARS_PER_TOKEN, completion_tokens=len(content) // CHARS_PER_TOKEN),
+        )
+
+
+def simulated_seconds(usage: dict, args) -> float:
+    return usage["calls"] * args.seconds_per_call + usage["completion_tokens"] / args.tokens_per_second
+
+
+def usable(sections: list, expected: dict) -> bool:
+    by_title = {section["title"]: section["content"] for section in sections}
+    return all(by_title.get(title) == content for title, content in expected.items())
+
+
+def run_text(client_ai, request, client_context, expected: dict, max_runs: int) -> tuple:
+    """Text mode, re-running the whole SOW until usable"""
+    usage = {}
+    sections = []
+    for _ in range(max_runs):
+        prompt = build_sow_prompt(request, client_context)
+        response = client_ai.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "system", "content": SOW_SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+            temperature=0.7,
+            max_tokens=MAX_TOKENS,
+        )
+        add_usage(usage, response)
+        sections, _ = parse_ai_response_to_sections(response.choices[0].message.content, request)
+        if usable(sections, expected):
+            break
+    return sections, usage
+
+
+def run_structured(client_ai, request, client_context) -> tuple:
+    prompt = build_sow_prompt(request, client_context, structured=True)
+    parsed, suggestions, usage = generate_structured_sow(client_ai, SOW_SYSTEM_PROMPT, prompt, MAX_TOKENS)
+    sections, _ = layout_sections(parsed, suggestions, request)
+    return sections, usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI SOW generation: text vs structured output, with a fake OpenAI client")
+    parser.add_argument("--seconds-per-call", type=float, default=0.6, help="Simulated time to first token (default: 0.6)")
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="Simulated output speed (default: 80)")
+    parser.add_argument("--max-runs", type=int, default=3, help="Text mode attempts per usable SOW (default: 3)")
+    args = parser.parse_args()
+
+    with open(FIXTURE) as f:
+        expected, suggestions = parse_sow_sections(f.read())
+    request = AIGenerateSOWRequest(
+        client_id=1, project_title="Harbor Freight Logistics Customer Portal", budget=86000,
+        start_date="2025-03-03", end_date="2025-06-27", pricing_type="milestones", num_milestones=3,
+    )
+    client_context = {
+        "name": "Dana Whitfield", "company": "Harbor Freight Logistics", "email": "dana@example.com", "address": "",
+        "description": "Customer portal for shipment tracking, POD downloads and pickup requests",
+        "tech_stack": ["React (frontend)", "FastAPI (backend)", "PostgreSQL (database)"],
+        "contracts": [], "recent_notes": [],
+    }
+
+    print("=" * 70)
+    print("  AI SOW Generation Benchmark (fake OpenAI client)")
+    print("=" * 70)
+
+    rows = []
+    failures = []
+    for scenario in SCENARIOS:
+        results = {}
+        with contextlib.redirect_stdout(io.StringIO()):  # padding / repair warnings
+            results["text"] = run_text(FakeOpenAI(scenario, expected, suggestions), request, client_context, expected, args.max_runs)
+            client_ai = FakeOpenAI(scenario, expected, suggestions)
+            results["structured"] = run_structured(client_ai, request, client_context)
+        # Repairs ask only for what was missing
+        for sent in client_ai.requests[1:]:
+            titles = sent["response_format"]["json_schema"]["schema"]["properties"]["sections"]["items"]["properties"]["title"]["enum"]
+            if len(titles) == len(SECTION_TITLES):
+                failures.append(f"{scenario}: repair call re-requested every section")
+        for mode, (sections, usage) in results.items():
+            ok = usable(sections, expected)
+            if mode == "structured" and not ok:
+                failures.append(f"{scenario}: structured mode did not produce a usable SOW")
+            rows.append((scenario, mode, ok, usage))
+        print(f"   ✓ {scenario}")
+
+    print("=" * 70)
+    print(f"{'Scenario':12} {'Mode':11} {'usable':>6} {'calls':>5} {'prompt tok':>10} {'output tok':>10} {'sim. s':>7}")
+    print("-" * 70)
+    totals = {}
+    for scenario, mode, ok, usage in rows:
+        seconds = simulated_seconds(usage, args)
+        total = totals.setdefault(mode, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0})
+        for key in ("calls", "prompt_tokens", "completion_tokens"):
+            total[key] += usage[key]
+        total["seconds"] += seconds
+        print(f"{scenario:12} {mode:11} {'yes' if ok else 'no':>6} {usage['calls']:>5} {usage['prompt_tokens']:>10} "
+              f"{usage['completion_tokens']:>10} {seconds:>7.1f}")
+    print("-" * 70)
+    for mode, total in totals.items():
+        count = len(SCENARIOS)
+        print(f"{'mean':12} {mode:11} {'':>6} {total['calls'] / count:>5.2f} {total['prompt_tokens'] / count:>10.0f} "
+              f"{total['completion_tokens'] / count:>10.0f} {total['seconds'] / count:>7.1f}")
+    print("=" * 70)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        raise SystemExit(1)
+    print("✅ Structured mode produced a usable SOW in every scenario")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+"""
+Deterministic synthetic data generator for load tests and benchmarks
+
+Creates N clients with realistic distributions of contacts, notes, timeline
+events, time entries, expenses, monthly invoices, SOWs (all 19 sections),
+calendar events, plus debt accounts with payment histories.
+
+- Deterministic: the same --seed, --clients and --as-of always produce the same
+  rows (each client has its own RNG, so output doesn't depend on --batch-size)
+- Fast: rows are built as plain dicts and bulk-inserted with Core executemany,
+  batch_size clients per transaction; 10k clients (~1M rows) take a few minutes
+  on SQLite
+- Tagged: synthetic clients use @synthetic.example emails (debt accounts a
+  payment_terms marker), so --purge removes them and everything that hangs off
+  them without touching real data. Invoice numbers and emails are derived
+  from the client index, so generating again refuses to run until the previous
+  synthetic data is purged
+
+Usage:
+    python -m benchmarks.synthetic_data --clients 1000
+    python -m benchmarks.synthetic_data --clients 20000 --seed 7 --batch-size 1000
+    python -m benchmarks.synthetic_data --purge
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.synthetic_data --clients 5000
+"""
+import argparse
+import math
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import func, select, text
+from database import engine
+from migrations import run_migrations
+from models import (
+    CalendarEvent, Client, ClientContact, ClientNote, ClientTimeline,
+    DebtAccount, DebtPayment, Invoice, InvoiceExpense, InvoiceItem, ScopeOfWork, ScopeSection
+)
+from utils.sow_templates import SOW_SECTIONS
+from utils.table_versions import bump_table_versions
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.example"
+SYNTHETIC_DEBT_TERMS = "Synthetic load-test account"
+DEFAULT_AS_OF = datetime(2025, 1, 1)
+
+# Average number of child rows per client (drawn from skewed distributions around these means)
+PER_CLIENT = {
+    "contacts": 2,
+    "notes": 8,
+    "timeline": 5,
+    "time_entries": 60,
+    "expenses": 8,
+    "sows": 1,
+    "calendar_events": 4,
+}
+
+# Tables in insert order (parents before children)
+TABLES = [
+    Client.__table__, ClientContact.__table__, ClientNote.__table__, ClientTimeline.__table__,
+    Invoice.__table__, InvoiceItem.__table__, InvoiceExpense.__table__,
+    ScopeOfWork.__table__, ScopeSection.__table__, CalendarEvent.__table__,
+    DebtAccount.__table__, DebtPayment.__table__,
+]
+
+FIRST_NAMES = ["Sarah", "David", "Emily", "Michael", "Jessica", "Daniel", "Olivia", "James", "Sofia", "Liam",
+               "Ava", "Noah", "Mia", "Ethan", "Priya", "Mateo", "Chloe", "Lucas", "Aisha", "Ryan",
+               "Hannah", "Omar", "Grace", "Wei", "Elena", "Marcus", "Zoe", "Andre", "Nina", "Kenji"]
+LAST_NAMES = ["Johnson", "Martinez", "Chen", "Smith", "Patel", "Garcia", "Kim", "Brown", "Nguyen", "Rodriguez",
+              "Lee", "Walker", "Okafor", "Hernandez", "Davis", "Lopez", "Wilson", "Anderson", "Singh", "Thomas",
+              "Moore", "Taylor", "Jackson", "White", "Harris", "Clark", "Lewis", "Young", "Allen", "Wright"]
+COMPANY_WORDS = ["Tech", "Data", "Cloud", "Bright", "North", "Blue", "Summit", "Vertex", "Pixel", "Nova",
+                 "Harbor", "Atlas", "Quantum", "Green", "Iron", "Silver", "Peak", "Core", "Next", "Prime"]
+COMPANY_SUFFIXES = ["Solutions", "Labs", "Inc.", "Group", "Systems", "Studio", "Partners", "Health", "Logistics", "Capital"]
+CITIES = [("San Francisco", "CA", "941"), ("Austin", "TX", "787"), ("Seattle", "WA", "981"), ("Denver", "CO", "802"),
+          ("Chicago", "IL", "606"), ("New York", "NY", "100"), ("Atlanta", "GA", "303"), ("Boston", "MA", "021")]
+STREETS = ["Innovation Drive", "Market Street", "Main Street", "Oak Avenue", "Startup Blvd", "Harbor Way", "Pine Street"]
+JOB_TITLES = ["CEO", "CTO", "Founder", "Project Manager", "Head of Product", "Engineering Manager", "COO", "Designer"]
+PROJECT_KINDS = ["e-commerce platform", "mobile app", "analytics dashboard", "customer portal", "booking system",
+                 "inventory tool", "AI-powered search", "internal CRM", "payment integration", "marketing site"]
+FEATURES = ["user authentication", "real-time notifications", "reporting", "role-based access", "payment processing",
+            "search", "offline sync", "an admin panel", "API integrations", "automated emails", "data exports"]
+WORK_ITEMS = ["Frontend development and UI implementation", "Backend API development", "Database schema design",
+              "Code review and refactoring", "Bug fixes and QA", "Client meeting and requirements review",
+              "Deployment and DevOps setup", "Machine learning model training and validation",
+              "Performance optimization", "Writing technical documentation", "Sprint planning", "UX wireframes"]
+TEAM = ["Darius Smith", "John Doe", "Maria Lopez", "Alex Kim"]
+EXPENSE_CATEGORIES = [("Software", ["GitHub Team seats", "Figma license", "JetBrains license", "Sentry plan"]),
+                      ("Subscription", ["AWS hosting", "Vercel Pro", "OpenAI API usage", "Twilio credits"]),
+                      ("Travel", ["Flight to client site", "Hotel for onsite workshop", "Rideshare to client office"]),
+                      ("Hardware", ["Test devices", "External monitor", "Staging server"])]
+NOTE_TYPES = ["General", "Meeting", "Call", "Email", "Follow-up"]
+NOTE_TOPICS = ["budget", "timeline", "MVP scope", "design mockups", "launch plan", "hiring", "integrations",
+               "feedback on the demo", "contract terms", "next milestone", "QA results", "hosting costs"]
+TIMELINE_TYPES = ["Initial Contact", "Meeting", "Proposal Sent", "Contract Signed", "Milestone", "Follow-up"]
+CLIENT_STATUSES = [("Active", 60), ("Lead", 15), ("Prospect", 10), ("Inactive", 15)]
+CONTRACT_STATUSES = [("Contract Signed", 55), ("Negotiation", 15), ("No Contract", 20), ("Not Heard Back", 10)]
+CONTRACT_TYPES = ["Fixed Price", "Milestone Based", "Hourly"]
+SOW_STATUSES = ["Draft", "Sent", "Approved", "In Progress", "Completed"]
+DEBT_TYPES = [("credit_card", ["Chase", "Wells Fargo", "Citi", "American Express", "Capital One", "Discover"]),
+              ("loan", ["Navient", "SoFi", "Ally", "LendingClub"]),
+              ("mortgage", ["Rocket Mortgage", "Chase", "Bank of America"]),
+              ("line_of_credit", ["US Bank", "PNC"])]
+DEBT_OWNERS = ["Darius", "Wife", "You"]
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    """Skewed non-negative count around mean (most clients small, a long tail of big ones)"""
+    if mean <= 0:
+        return 0
+    sigma = 0.8
+    return int(rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma) + 0.5)
+
+
+def _sentence(rng: random.Random) -> str:
+    return (f"Discussed {rng.choice(NOTE_TOPICS)} for the {rng.choice(PROJECT_KINDS)}; "
+            f"next step is {rng.choice(FEATURES)}.")
+
+
+def _hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class SyntheticDataGenerator:
+    """Builds row dicts with explicit ids so children can reference parents without round trips"""
+
+    def __init__(self, seed: int, as_of: datetime, next_ids: Dict[str, int]):
+        self.seed = seed
+        self.as_of = as_of
+        self.next_ids = dict(next_ids)
+
+    def _id(self, table_name: str) -> int:
+        value = self.next_ids[table_name]
+        self.next_ids[table_name] = value + 1
+        return value
+
+    def client_rows(self, client_index: int, rows: Dict[str, List[dict]]):
+        """Append one client and all of its related rows to rows[table_name]"""
+        rng = random.Random(self.seed * 1_000_003 + client_index)
+        as_of = self.as_of
+
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        company = f"{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_WORDS).lower()} {rng.choice(COMPANY_SUFFIXES)}"
+        city, state, zip_prefix = rng.choice(CITIES)
+        client_date = as_of - timedelta(days=rng.randint(7, 3 * 365), minutes=rng.randint(0, 1439))
+        hourly_rate = float(rng.choice([95, 110, 125, 150, 175, 200]))
+        contract_type = rng.choice(CONTRACT_TYPES)
+        project = rng.choice(PROJECT_KINDS)
+        client_id = self._id("clients")
+        client_email = f"{first.lower()}.{last.lower()}.{client_index}@{SYNTHETIC_EMAIL_DOMAIN}"
+        rows["clients"].append({
+            "id": client_id, "first_name": first, "last_name": last, "email": client_email,
+            "client_date": client_date,
+            "description": f"{project.capitalize()} with {rng.choice(FEATURES)} and {rng.choice(FEATURES)}.",
+            "hourly_rate": hourly_rate, "notes_from_last_meeting": _sentence(rng),
+            "timeline": f"{rng.randint(2, 12)} months", "contract_status": _weighted(rng, CONTRACT_STATUSES),
+            "contract_type": contract_type,
+            "contract_due_date": client_date + timedelta(days=rng.randint(60, 365)) if contract_type == "Fixed Price" else None,
+            "status": _weighted(rng, CLIENT_STATUSES), "company": company,
+            "address": f"{rng.randint(10, 9999)} {rng.choice(STREETS)}, {city}, {state} {zip_prefix}{rng.randint(10, 99)}",
+            "created_at": client_date, "updated_at": None,
+        })
+
+        for order in range(1, max(1, min(3, _count(rng, PER_CLIENT["contacts"]))) + 1):
+            name_first = first if order == 1 else rng.choice(FIRST_NAMES)
+            name_last = last if order == 1 else rng.choice(LAST_NAMES)
+            rows["client_contacts"].append({
+                "id": self._id("client_contacts"), "client_id": client_id,
+                "name": f"{name_first} {name_last}",
+                "email": f"{name_first.lower()}.{name_last.lower()}.{client_index}@{SYNTHETIC_EMAIL_DOMAIN}",
+                "phone": f"{rng.randint(200, 989)}-555-{rng.randint(0, 9999):04d}",
+                "title": rng.choice(JOB_TITLES), "order": order, "notes": None,
+                "created_at": client_date, "updated_at": None,
+            })
+
+        for _ in range(_count(rng, PER_CLIENT["notes"])):
+            note_date = client_date + timedelta(minutes=rng.randint(0, max(1, int((as_of - client_date).total_seconds() // 60))))
+            note_type = rng.choice(NOTE_TYPES)
+            rows["client_notes"].append({
+                "id": self._id("client_notes"), "client_id": client_id,
+                "title": f"{note_type}: {rng.choice(NOTE_TOPICS)}",
+                "content": " ".join(_sentence(rng) for _ in range(rng.randint(1, 4))),
+                "note_type": note_type, "meeting_date": note_date if note_type == "Meeting" else None,
+                "created_by": rng.choice(TEAM), "created_at": note_date, "updated_at": None,
+            })
+
+        for _ in range(_count(rng, PER_CLIENT["timeline"])):
+            event_date = client_date + timedelta(days=rng.randint(0, max(1, (as_of - client_date).days)))
+            event_type = rng.choice(TIMELINE_TYPES)
+            rows["client_timeline"].append({
+                "id": self._id("client_timeline"), "client_id": client_id, "event_type": event_type,
+                "title": f"{event_type} - {company}", "description": _sentence(rng),
+                "event_date": event_date, "next_steps": f"Follow up on {rng.choice(NOTE_TOPICS)}",
+                "created_at": event_date,
+            })
+
+        self._billing_rows(rng, rows, client_id, client_date, hourly_rate, client_index)
+
+        for _ in range(_count(rng, PER_CLIENT["sows"])):
+            scope_id = self._id("scope_of_work")
+            start = client_date + timedelta(days=rng.randint(0, 60))
+            client_name = f"{first} {last}"
+            rows["scope_of_work"].append({
+                "id": scope_id, "client_id": client_id, "title": f"{project.title()} - Statement of Work",
+                "version": f"1.{rng.randint(0, 3)}", "status": rng.choice(SOW_STATUSES),
+                "description": f"Build a {project} for {company}.", "deliverables": ", ".join(rng.sample(FEATURES, 3)),
+                "timeline": f"{rng.randint(6, 40)} weeks", "budget": float(rng.randint(10, 250) * 1000),
+                "start_date": start, "end_date": start + timedelta(weeks=rng.randint(6, 40)),
+                "approved_date": None, "notes": None, "created_at": start, "updated_at": None,
+            })
+            for section in SOW_SECTIONS:
+                rows["scope_sections"].append({
+                    "id": self._id("scope_sections"), "scope_id": scope_id, "title": section["title"],
+                    "content": section["template"].replace("[CLIENT_NAME]", client_name) + "\n\n" + _sentence(rng),
+                    "order": section["order"], "created_at": start,
+                })
+
+        for _ in range(_count(rng, PER_CLIENT["calendar_events"])):
+            event_id = self._id("calendar_events")
+            start = client_date + timedelta(days=rng.randint(-14, max(1, (as_of - client_date).days)), hours=rng.randint(8, 17))
+            rows["calendar_events"].append({
+                "id": event_id, "client_id": client_id, "google_event_id": f"synthetic-{self.seed}-{event_id}",
+                "calendar_id": "primary", "event_title": f"Call with {first} {last}",
+                "event_description": _sentence(rng), "start_time": start, "end_time": start + timedelta(minutes=rng.choice([30, 45, 60])),
+                "timezone": "America/Los_Angeles", "attendee_emails": f'["{client_email}"]',
+                "hangout_link": None, "html_link": None, "status": rng.choice(["confirmed"] * 9 + ["canceled"]),
+                "created_at": start, "updated_at": None, "last_synced_at": as_of,
+            })
+
+    def _billing_rows(self, rng: random.Random, rows: Dict[str, List[dict]], client_id: int,
+                      client_date: datetime, hourly_rate: float, client_index: int):
+        """Time entries and expenses, with one invoice per past month that has billable work"""
+        days_active = max(1, (self.as_of - client_date).days)
+        by_month = defaultdict(lambda: {"items": [], "expenses": []})
+
+        for _ in range(_count(rng, PER_CLIENT["time_entries"])):
+            date = client_date + timedelta(days=rng.randint(0, days_active))
+            start = rng.randrange(8 * 60, 16 * 60, 15)
+            minutes = rng.randrange(30, 8 * 60 + 1, 15)
+            hours = round(minutes / 60, 2)
+            item = {
+                "id": self._id("invoice_items"), "invoice_id": None, "client_id": client_id, "date": date,
+                "start_time": _hhmm(start), "end_time": _hhmm(min(start + minutes, 23 * 60 + 59)),
+                "person": rng.choice(TEAM), "description": rng.choice(WORK_ITEMS), "hours": hours,
+                "rate": hourly_rate, "amount": round(hours * hourly_rate, 2), "created_at": date, "updated_at": None,
+            }
+            rows["invoice_items"].append(item)
+            by_month[(date.year, date.month)]["items"].append(item)
+
+        for _ in range(_count(rng, PER_CLIENT["expenses"])):
+            date = client_date + timedelta(days=rng.randint(0, days_active))
+            category, descriptions = rng.choice(EXPENSE_CATEGORIES)
+            expense = {
+                "id": self._id("invoice_expenses"), "invoice_id": None, "client_id": client_id, "date": date,
+                "description": rng.choice(descriptions), "category": category,
+                "amount": round(rng.lognormvariate(4.5, 0.9), 2), "person": rng.choice(TEAM),
+                "start_time": None, "end_time": None, "hours": None, "created_at": date, "updated_at": None,
+            }
+            rows["invoice_expenses"].append(expense)
+            by_month[(date.year, date.month)]["expenses"].append(expense)
+
+        # The current month is still unbilled
+        current_month = (self.as_of.year, self.as_of.month)
+        sequence = 0
+        for month in sorted(by_month):
+            if month >= current_month:
+                continue
+            sequence += 1
+            invoice_id = self._id("invoices")
+            entries = by_month[month]
+            for row in entries["items"] + entries["expenses"]:
+                row["invoice_id"] = invoice_id
+            amount = round(sum(r["amount"] for r in entries["items"] + entries["expenses"]), 2)
+            issue_date = datetime(month[0] + month[1] // 12, month[1] % 12 + 1, 1)
+            age_days = (self.as_of - issue_date).days
+            status = "Paid" if age_days > 60 else rng.choice(["Paid", "Sent", "Overdue"] if age_days > 30 else ["Sent", "Finalized"])
+            rows["invoices"].append({
+                "id": invoice_id, "client_id": client_id, "contract_id": None,
+                "invoice_number": f"SYN{client_index:06d}-INV-{sequence:03d}",
+                "amount": amount, "tax": 0.0, "total": amount, "status": status,
+                "finalized_date": issue_date, "archived_date": None, "due_date": issue_date + timedelta(days=30),
+                "issue_date": issue_date,
+                "paid_date": issue_date + timedelta(days=rng.randint(3, 45)) if status == "Paid" else None,
+                "notes": None, "project_name": f"{month[0]}-{month[1]:02d} services",
+                "created_at": issue_date, "updated_at": None,
+            })
+
+    def debt_rows(self, account_index: int, rows: Dict[str, List[dict]]):
+        """One debt account and its monthly payment history"""
+        rng = random.Random(self.seed * 2_000_003 + account_index)
+        account_type, institutions = rng.choice(DEBT_TYPES)
+        institution = rng.choice(institutions)
+        original = float(rng.randint(5, 300) * 100) if account_type != "mortgage" else float(rng.randint(150, 900) * 1000)
+        months_paid = rng.randint(0, 36)
+        monthly = round(max(25.0, original * rng.uniform(0.015, 0.04)), 2)
+        current = max(0.0, round(original - monthly * months_paid * rng.uniform(0.5, 0.8), 2))
+        account_id = self._id("debt_accounts")
+        opened = self.as_of - timedelta(days=30 * months_paid + rng.randint(0, 29))
+        rows["debt_accounts"].append({
+            "id": account_id, "bank_connection_id": None, "owner": rng.choice(DEBT_OWNERS),
+            "name": f"{institution} {account_type.replace('_', ' ').title()}", "account_type": account_type,
+            "institution_name": institution, "original_balance": original, "current_balance": current,
+            "interest_rate": round(rng.uniform(3.0, 29.99), 2), "minimum_payment": round(monthly * 0.6, 2),
+            "suggested_minimum_payment": monthly, "payment_terms": SYNTHETIC_DEBT_TERMS, "payment_link": None,
+            "monthly_payment": monthly, "due_date": self.as_of + timedelta(days=rng.randint(1, 28)),
+            "plaid_account_id": None, "is_paid_off": current == 0.0,
+            "paid_off_date": self.as_of if current == 0.0 else None, "created_at": opened, "updated_at": None,
+        })
+        for month in range(months_paid):
+            payment_date = opened + timedelta(days=30 * (month + 1))
+            rows["debt_payments"].append({
+                "id": self._id("debt_payments"), "debt_account_id": account_id,
+                "payment_amount": round(monthly * rng.uniform(1.0, 1.5), 2), "payment_date": payment_date,
+                "payment_type": rng.choice(["minimum", "custom", "manual"]), "notes": None, "created_at": payment_date,
+            })
+
+
+def _synthetic_client_count(conn) -> int:
+    return conn.execute(
+        select(func.count()).select_from(Client.__table__).where(Client.__table__.c.email.like(f"%@{SYNTHETIC_EMAIL_DOMAIN}"))
+    ).scalar()
+
+
+def _next_ids(conn) -> Dict[str, int]:
+    return {table.name: (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1 for table in TABLES}
+
+
+def _insert(conn, rows: Dict[str, List[dict]]) -> int:
+    inserted = 0
+    for table in TABLES:
+        batch = rows.get(table.name)
+        if batch:
+            conn.execute(table.insert(), batch)
+            inserted += len(batch)
+    # Core inserts bypass the ORM hook that versions tables for HTTP ETags
+    bump_table_versions(conn, [name for name, batch in rows.items() if batch])
+    return inserted
+
+
+def _fix_sequences(conn):
+    """Postgres: explicit ids don't advance the id sequences"""
+    for table in TABLES:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table.name}), false)"
+        ))
+
+
+def generate(clients: int, seed: int = 42, as_of: datetime = DEFAULT_AS_OF, batch_size: int = 500,
+             debt_accounts: int = None, rebuild_search: bool = True) -> Dict[str, int]:
+    """
+    Insert synthetic data; returns row counts per table.
+
+    Raises RuntimeError if the database already has synthetic clients (their
+    invoice numbers would collide with the new ones): purge() them first.
+
+    Args:
+        debt_accounts: Number of debt accounts (default: one per 50 clients, at least 10)
+        rebuild_search: Rebuild the CRM search index afterwards (bulk inserts bypass its ORM hook)
+    """
+    run_migrations()
+    if debt_accounts is None:
+        debt_accounts = max(10, clients // 50)
+
+    totals: Dict[str, int] = defaultdict(int)
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        existing = _synthetic_client_count(conn)
+        if existing:
+            raise RuntimeError(f"{existing:,} synthetic client(s) already exist; run with --purge first")
+        generator = SyntheticDataGenerator(seed, as_of, _next_ids(conn))
+
+    is_sqlite = engine.dialect.name == "sqlite"
+    for batch_start in range(0, clients, batch_size):
+        rows: Dict[str, List[dict]] = defaultdict(list)
+        for client_index in range(batch_start, min(clients, batch_start + batch_size)):
+            generator.client_rows(client_index, rows)
+        if batch_start == 0:
+            for account_index in range(debt_accounts):
+                generator.debt_rows(account_index, rows)
+
+        with engine.begin() as conn:
+            if is_sqlite:
+                # Safe for a throwaway load: a crash loses at most this batch
+                conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            _insert(conn, rows)
+        for table_name, table_rows in rows.items():
+            totals[table_name] += len(table_rows)
+
+        done = min(clients, batch_start + batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"   ✅ {done}/{clients} clients, {sum(totals.values()):,} rows ({sum(totals.values()) / elapsed:,.0f} rows/s)")
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            _fix_sequences(conn)
+
+    if rebuild_search:
+        from utils.crm_search import init_crm_search
+        print("   🔎 Rebuilding CRM search index...")
+        init_crm_search()
+
+    return dict(totals)
+
+
+def purge() -> int:
+    """Delete every synthetic client and all rows that reference them; returns clients deleted"""
+    client_ids = f"SELECT id FROM clients WHERE email LIKE '%@{SYNTHETIC_EMAIL_DOMAIN}'"
+    with engine.begin() as conn:
+        count = conn.execute(text(f"SELECT COUNT(*) FROM ({client_ids}) synthetic")).scalar()
+        conn.execute(text(f"DELETE FROM scope_sections WHERE scope_id IN (SELECT id FROM scope_of_work WHERE client_id IN ({client_ids}))"))
+        for table in ("invoice_items", "invoice_expenses", "invoices", "scope_of_work", "client_contacts",
+                      "client_notes", "client_timeline", "calendar_events"):
+            conn.execute(text(f"DELETE FROM {table} WHERE client_id IN ({client_ids})"))
+        debt_ids = "SELECT id FROM debt_accounts WHERE payment_terms = :terms"
+        conn.execute(text(f"DELETE FROM debt_payments WHERE debt_account_id IN ({debt_ids})"), {"terms": SYNTHETIC_DEBT_TERMS})
+        conn.execute(text(f"DELETE FROM debt_accounts WHERE id IN ({debt_ids})"), {"terms": SYNTHETIC_DEBT_TERMS})
+        conn.execute(text(f"DELETE FROM clients WHERE id IN ({client_ids})"))
+        bump_table_versions(conn, ["clients", "scope_sections", "invoice_items", "invoice_expenses", "invoices", "scope_of_work",
+                                   "client_contacts", "client_notes", "client_timeline", "calendar_events",
+                                   "debt_payments", "debt_accounts"])
+    from utils.crm_search import init_crm_search
+    init_crm_search()
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic CRM/invoicing data")
+    parser.add_argument("--clients", type=int, default=1000, help="Number of clients (default: 1000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--as-of", default=DEFAULT_AS_OF.strftime("%Y-%m-%d"), help="Reference 'today' for all dates (default: 2025-01-01)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Clients per transaction (default: 500)")
+    parser.add_argument("--debt-accounts", type=int, default=None, help="Debt accounts (default: clients / 50, at least 10)")
+    parser.add_argument("--skip-search-index", action="store_true", help="Don't rebuild the CRM search index afterwards")
+    parser.add_argument("--purge", action="store_true", help="Delete previously generated synthetic data and exit")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  Synthetic Data Generator")
+    print("=" * 70)
+    if args.purge:
+        print(f"🗑️  Deleted {purge()} synthetic client(s) and their data")
+    else:
+        started = time.perf_counter()
+        try:
+            totals = generate(
+                args.clients, seed=args.seed, as_of=datetime.strptime(args.as_of, "%Y-%m-%d"),
+                batch_size=args.batch_size, debt_accounts=args.debt_accounts, rebuild_search=not args.skip_search_index,
+            )
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+        print("=" * 70)
+        for table in TABLES:
+            print(f"   {table.name:20} {totals.get(table.name, 0):>10,}")
+        print(f"✅ {sum(totals.values()):,} rows in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,90 @@
+"""
+Import-time budget check for the API
+
+Times `import main` in fresh interpreters and fails (exit code 1) if the best of
+several runs takes more than the budget on top of importing the frameworks
+alone (FastAPI, Pydantic, SQLAlchemy - about a second by themselves, and most
+of what varies between machines). On failure it lists the slowest imports so
+the culprit is easy to find - usually an SDK imported at module level instead
+of through utils/providers.py (the OpenAI SDK alone costs ~900 ms).
+
+Usage:
+    python check_import_time.py
+    python check_import_time.py --budget-ms 500 --runs 5
+    IMPORT_TIME_BUDGET_MS=500 python check_import_time.py
+
+Run from the backend directory, e.g. in CI before deploying.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Milliseconds `import main` may take beyond the framework imports (~650 ms today)
+DEFAULT_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1200"))
+# Imported by every app module; timed on their own as the baseline
+FRAMEWORK_MODULES = "fastapi, fastapi.routing, pydantic, sqlalchemy.orm"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_import(module: str = "main") -> float:
+    """Wall-clock milliseconds to import a module (or comma-separated modules) in a fresh interpreter"""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str = "main", top: int = 15):
+    """(cumulative_ms, module) for the slowest imports, from python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self_us | cumulative_us | name" (name is indented by nesting depth)
+        _, cumulative_us, name = line.split("|")
+        timings.append((int(cumulative_us) / 1000, name.strip()))
+    timings.sort(reverse=True)
+    return timings[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if `import main` exceeds the import-time budget")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS,
+                        help=f"Budget in milliseconds on top of the framework imports (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to time; the fastest run counts (default: 3)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    baseline_timings = [time_import(FRAMEWORK_MODULES) for _ in range(args.runs)]
+    timings = [time_import() for _ in range(args.runs)]
+    baseline, best = min(baseline_timings), min(timings)
+    overhead = best - baseline
+
+    print(f"⏱️  frameworks: best {baseline:.0f} ms ({', '.join(f'{t:.0f}' for t in baseline_timings)} ms)")
+    print(f"⏱️  import main: best {best:.0f} ms over {args.runs} run(s) "
+          f"({', '.join(f'{t:.0f}' for t in timings)} ms)")
+    print(f"   app imports: {overhead:.0f} ms, budget {args.budget_ms} ms")
+
+    if overhead > args.budget_ms:
+        print(f"❌ Import-time budget exceeded by {overhead - args.budget_ms:.0f} ms. Slowest imports (cumulative):")
+        for cumulative_ms, name in slowest_imports():
+            print(f"   {cumulative_ms:8.1f} ms  {name}")
+        sys.exit(1)
+
+    print(f"✅ Within budget ({time.perf_counter() - started:.1f}s total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
+from contextvars import ContextVar
+from typing import Optional
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 from dotenv import load_dotenv
 
@@ -24,8 +26,17 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# Session handed to routes instead of a new one while set (POST /api/batch
+# sub-requests); whoever sets it owns its transaction and closes it
+shared_session: ContextVar[Optional[Session]] = ContextVar("shared_session", default=None)
+
+
 # Dependency to get DB session
 def get_db():
+    shared = shared_session.get()
+    if shared is not None:
+        yield shared
+        return
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,72 @@
+"""
+Backfill first-page thumbnails for existing client documents.
+
+Rendering is CPU-bound, so files are rendered in a process pool. Documents
+that share a stored file are rendered once. Already cached thumbnails are
+skipped unless --force is given.
+
+Usage:
+    python generate_thumbnails.py              # use all CPU cores
+    python generate_thumbnails.py --workers 4
+    python generate_thumbnails.py --force      # re-render existing thumbnails
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from database import SessionLocal
+from models import ClientDocument
+from utils.document_thumbnails import render_thumbnail, thumbnail_path, can_render
+
+
+def generate_thumbnails(workers: int = None, force: bool = False):
+    db = SessionLocal()
+    try:
+        documents = db.query(ClientDocument.file_path, ClientDocument.file_type).all()
+    finally:
+        db.close()
+
+    # One render per stored file, not per document
+    jobs = {}
+    skipped = 0
+    for file_path, file_type in documents:
+        if not can_render(file_type) or not os.path.exists(file_path):
+            skipped += 1
+            continue
+        if file_path in jobs:
+            continue
+        if os.path.exists(thumbnail_path(file_path)):
+            if not force:
+                skipped += 1
+                continue
+            os.remove(thumbnail_path(file_path))
+        jobs[file_path] = file_type
+
+    print(f"🖼️  {len(documents)} document(s), {len(jobs)} file(s) to render, {skipped} skipped")
+    if not jobs:
+        return
+
+    started = time.perf_counter()
+    rendered = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render_thumbnail, path, file_type): path for path, file_type in jobs.items()}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                if future.result():
+                    rendered += 1
+            except Exception as e:
+                failed += 1
+                print(f"   ❌ {path}: {e}")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Rendered {rendered} thumbnail(s) in {elapsed:.1f}s ({failed} failed)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill client document thumbnails")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render thumbnails that already exist")
+    args = parser.parse_args()
+    generate_thumbnails(workers=args.workers, force=args.force)
@@ -0,0 +1,238 @@
+"""
+Index audit: compare the queries the code issues with the indexes the database has
+
+Access patterns are collected from three places:
+- Foreign keys in models.py (joins, relationship loads, cascading deletes)
+- One-to-many relationships: the FK plus the relationship's order_by column
+  (e.g. Client.notes loads client_notes WHERE client_id = ? ORDER BY created_at)
+- Router/util source: db.query(...).filter(Model.col == ...) / .order_by(...)
+  and select(...).where(...).order_by(...) chains, parsed with ast, grouped
+  per function and model
+
+Each pattern is checked against the database's indexes (inspected live, so run
+it against a migrated database):
+    ✅  an index starts with the whole suggested column list (filter + sort)
+    ⚠️  an index starts with the filter column, but the sort needs a temp B-tree
+    ❌  no index starts with the filter column: every query scans the table
+    ➖  deliberately unindexed (see IGNORED)
+
+Usage:
+    python index_audit.py                 # report
+    python index_audit.py --missing-only  # only ❌ / ⚠️
+    python index_audit.py --strict        # exit 1 if any pattern is ❌ (for CI)
+"""
+import argparse
+import ast
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import Boolean, inspect
+from database import Base, engine
+import models  # noqa: F401  (registers the mappers)
+
+SOURCE_DIRS = ["routers", "utils"]
+RANGE_OPS = (ast.Gt, ast.GtE, ast.Lt, ast.LtE)
+EQUALITY_METHODS = {"is_", "isnot", "is_not", "in_"}
+ORDER_METHODS = {"asc", "desc"}
+# Query.filter() and Select.where() take the same criteria
+FILTER_METHODS = {"filter", "where"}
+
+# Patterns deliberately left unindexed: (table, filter column) -> reason
+IGNORED = {
+    ("debt_accounts", "owner"): "a handful of rows per household",
+    ("debt_accounts", "account_type"): "a handful of rows per household",
+    ("scope_of_work", "status"): "low cardinality, small table",
+    ("scope_of_work", "title"): "only checked when creating a SOW",
+    ("calendar_events", "status"): "always combined with client_id",
+}
+
+
+class Pattern(NamedTuple):
+    table: str
+    filter_columns: Tuple[str, ...]   # equality filters (must lead the index)
+    sort_column: Optional[str]        # ORDER BY / range column that should follow them
+    source: str
+
+
+def _model_tables() -> Dict[str, "Table"]:
+    return {mapper.class_.__name__: mapper.local_table for mapper in Base.registry.mappers}
+
+
+def _indexable(table, column_name: str) -> bool:
+    column = table.c.get(column_name)
+    # Primary keys are always indexed; booleans are too low-cardinality to be worth one
+    return column is not None and not column.primary_key and not isinstance(column.type, Boolean)
+
+
+def foreign_key_patterns(tables) -> List[Pattern]:
+    patterns = []
+    for table in tables.values():
+        for fk in table.foreign_keys:
+            patterns.append(Pattern(table.name, (fk.parent.name,), None, f"FK -> {fk.column.table.name}"))
+    return patterns
+
+
+def relationship_patterns() -> List[Pattern]:
+    patterns = []
+    for mapper in Base.registry.mappers:
+        for rel in mapper.relationships:
+            if rel.direction.name != "ONETOMANY":
+                continue
+            remote = tuple(remote.name for _, remote in rel.local_remote_pairs)
+            sort_column = None
+            if rel.order_by:
+                element = rel.order_by[0]
+                element = getattr(element, "element", element)  # unwrap .desc() / .asc()
+                sort_column = getattr(element, "name", None)
+            patterns.append(Pattern(rel.target.name, remote, sort_column,
+                                    f"{mapper.class_.__name__}.{rel.key} relationship"))
+    return patterns
+
+
+def _model_column(node, tables) -> Optional[Tuple[str, str]]:
+    """(Model, column) for an expression like Invoice.client_id"""
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id in tables:
+        return node.value.id, node.attr
+    return None
+
+
+def _filter_columns(node, tables, equality, ranges):
+    if isinstance(node, ast.Call):
+        func = node.func
+        if isinstance(func, ast.Name) and func.id in ("and_", "or_"):
+            for arg in node.args:
+                _filter_columns(arg, tables, equality, ranges)
+        elif isinstance(func, ast.Attribute) and func.attr in EQUALITY_METHODS:
+            target = _model_column(func.value, tables)
+            if target:
+                equality.append(target)
+    elif isinstance(node, ast.Compare) and len(node.ops) == 1:
+        target = _model_column(node.left, tables) or _model_column(node.comparators[0], tables)
+        if target and isinstance(node.ops[0], (ast.Eq, ast.Is)):
+            equality.append(target)
+        elif target and isinstance(node.ops[0], RANGE_OPS):
+            ranges.append(target)
+
+
+def _order_column(node, tables) -> Optional[Tuple[str, str]]:
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in ORDER_METHODS:
+        node = node.func.value
+    return _model_column(node, tables)
+
+
+def source_patterns(tables, base_dir: Path) -> List[Pattern]:
+    patterns = []
+    for directory in SOURCE_DIRS:
+        for path in sorted((base_dir / directory).glob("*.py")):
+            tree = ast.parse(path.read_text(), filename=str(path))
+            for function in ast.walk(tree):
+                if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                equality, ranges, orders = [], [], []
+                for node in ast.walk(function):
+                    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+                        continue
+                    if node.func.attr in FILTER_METHODS:
+                        for arg in node.args:
+                            _filter_columns(arg, tables, equality, ranges)
+                    elif node.func.attr == "order_by" and node.args:
+                        column = _order_column(node.args[0], tables)
+                        if column:
+                            orders.append(column)
+
+                source = f"{path.relative_to(base_dir)}:{function.name}()"
+                for model in dict.fromkeys(m for m, _ in equality + ranges + orders):
+                    table = tables[model]
+                    eq = [c for m, c in dict.fromkeys(equality) if m == model and _indexable(table, c)]
+                    rng = [c for m, c in dict.fromkeys(ranges) if m == model and _indexable(table, c)]
+                    order = [c for m, c in orders if m == model and _indexable(table, c)]
+                    sort_column = (rng or order or [None])[0]
+                    if eq:
+                        # Optional filters are alternatives (status=... or client_id=...), so each is its own path
+                        for column in eq:
+                            patterns.append(Pattern(table.name, (column,), sort_column, source))
+                    elif sort_column:
+                        patterns.append(Pattern(table.name, (), sort_column, source))
+    return patterns
+
+
+def existing_indexes(conn, table_name: str) -> List[Tuple[str, ...]]:
+    inspector = inspect(conn)
+    indexes = [tuple(ix["column_names"]) for ix in inspector.get_indexes(table_name)]
+    indexes += [tuple(uc["column_names"]) for uc in inspector.get_unique_constraints(table_name)]
+    pk = inspector.get_pk_constraint(table_name).get("constrained_columns")
+    if pk:
+        indexes.append(tuple(pk))
+    return indexes
+
+
+def check(pattern: Pattern, indexes: List[Tuple[str, ...]]) -> Tuple[str, Tuple[str, ...]]:
+    if pattern.filter_columns and (pattern.table, pattern.filter_columns[0]) in IGNORED:
+        return "➖", pattern.filter_columns
+    wanted = pattern.filter_columns + ((pattern.sort_column,) if pattern.sort_column
+                                       and pattern.sort_column not in pattern.filter_columns else ())
+    if any(index[:len(wanted)] == wanted for index in indexes):
+        return "✅", wanted
+    lead = pattern.filter_columns or wanted
+    if pattern.filter_columns and any(index[:len(lead)] == lead for index in indexes):
+        return "⚠️ ", wanted
+    return "❌", wanted
+
+
+def audit(base_dir: Path) -> List[dict]:
+    tables = _model_tables()
+    patterns = foreign_key_patterns(tables) + relationship_patterns() + source_patterns(tables, base_dir)
+
+    # Merge identical patterns found in several places
+    merged: Dict[tuple, List[str]] = defaultdict(list)
+    for pattern in patterns:
+        merged[(pattern.table, pattern.filter_columns, pattern.sort_column)].append(pattern.source)
+
+    results = []
+    with engine.connect() as conn:
+        index_cache = {}
+        for (table, filter_columns, sort_column), sources in sorted(merged.items(), key=lambda kv: (kv[0][0], kv[0][1], kv[0][2] or "")):
+            if table not in index_cache:
+                index_cache[table] = existing_indexes(conn, table) if inspect(conn).has_table(table) else []
+            status, wanted = check(Pattern(table, filter_columns, sort_column, ""), index_cache[table])
+            results.append({
+                "table": table, "filter": list(filter_columns), "sort": sort_column,
+                "status": status, "suggested_index": list(wanted), "sources": sorted(set(sources)),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare query patterns in the code with existing DB indexes")
+    parser.add_argument("--missing-only", action="store_true", help="Only show patterns without a full index")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 if any filter column is unindexed")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"  Index Audit ({engine.url.render_as_string(hide_password=True)})")
+    print("=" * 70)
+    results = audit(Path(__file__).resolve().parent)
+
+    current_table = None
+    for result in results:
+        if args.missing_only and result["status"] in ("✅", "➖"):
+            continue
+        if result["table"] != current_table:
+            current_table = result["table"]
+            print(f"\n{current_table}")
+        where = " AND ".join(f"{c} = ?" for c in result["filter"]) or "(all rows)"
+        order = f" ORDER BY {result['sort']}" if result["sort"] else ""
+        reason = IGNORED.get((result["table"], result["filter"][0])) if result["status"] == "➖" else None
+        print(f"  {result['status']} WHERE {where}{order}" + (f"  ({reason})" if reason else ""))
+        print(f"       index: ({', '.join(result['suggested_index'])})  <- {', '.join(result['sources'][:3])}"
+              + (f" +{len(result['sources']) - 3} more" if len(result["sources"]) > 3 else ""))
+
+    missing = [r for r in results if r["status"] == "❌"]
+    partial = [r for r in results if r["status"].startswith("⚠️")]
+    ignored = [r for r in results if r["status"] == "➖"]
+    covered = len(results) - len(missing) - len(partial) - len(ignored)
+    print("\n" + "=" * 70)
+    print(f"✅ {covered} covered   ⚠️  {len(partial)} filter-only   ❌ {len(missing)} unindexed   ➖ {len(ignored)} ignored")
+    if args.strict and missing:
+        sys.exit(1)
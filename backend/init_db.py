@@ -2,12 +2,13 @@
 Database initialization script.
 Run this to create the database tables and optionally seed with initial data.
 """
-from database import engine, Base
+from database import engine
 from models import Client, Invoice, InvoiceItem, ScopeOfWork, ScopeSection, UserProfile
+from migrations import run_migrations
 from sqlalchemy.orm import sessionmaker
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# Create all tables (and record the schema version)
+run_migrations()
 
 print("Database tables created successfully!")
 
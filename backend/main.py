@@ -1,17 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-from routers import clients, invoices, scope_of_work, profiles, client_contacts, client_notes, client_timeline, contracts, time_entries, expenses, client_documents, client_admin_accounts, client_tech_stack, debt_tracker
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-from database import SessionLocal
+from fastapi.responses import PlainTextResponse
+from routers import clients, invoices, scope_of_work, profiles, client_contacts, client_notes, client_timeline, contracts, time_entries, expenses, client_documents, client_admin_accounts, client_tech_stack, debt_tracker, search, admin, batch
+from database import SessionLocal, engine
+from utils.document_search import index_pending_documents
+from migrations import ensure_schema_current
+from utils.metrics import MetricsMiddleware, instrument_engine, render_prometheus
+from utils.slow_query_log import install_slow_query_log
 import atexit
 import logging
 import os
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="SLS Admin API",
     description="Backend API for SLS Admin company website",
@@ -30,8 +29,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag", "Last-Modified"],
 )
 
+# Per-route latency, DB query and external-call metrics (/metrics and Server-Timing header)
+instrument_engine(engine)
+install_slow_query_log(engine)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(clients.router)
 app.include_router(invoices.router)
@@ -47,6 +52,9 @@ app.include_router(client_documents.router)
 app.include_router(client_admin_accounts.router)
 app.include_router(client_tech_stack.router)
 app.include_router(debt_tracker.router)
+app.include_router(search.router)
+app.include_router(admin.router)
+app.include_router(batch.router)
 
 
 # Background scheduler for Google Calendar sync
@@ -70,30 +78,59 @@ def scheduled_calendar_sync():
         db.close()
 
 
-# Initialize scheduler
-scheduler = BackgroundScheduler()
-scheduler.add_job(
-    scheduled_calendar_sync,
-    trigger=IntervalTrigger(minutes=5),  # Run every 5 minutes
-    id='calendar_sync_job',
-    name='Sync Google Calendar Bookings',
-    replace_existing=True
-)
+def scheduled_document_indexing():
+    """Scheduled task to extract text from documents not yet in the search index"""
+    indexed = index_pending_documents()
+    if indexed:
+        print(f"[SCHEDULER] Indexed {indexed} document(s) for search")
+
+
+# The scheduler (and APScheduler itself) is only created when the app starts, so
+# `import main` stays cheap for --reload cycles and tooling that just needs the app
+scheduler = None
+
 
-# Start scheduler when app starts
+def create_scheduler():
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    background_scheduler = BackgroundScheduler()
+    background_scheduler.add_job(
+        scheduled_calendar_sync,
+        trigger=IntervalTrigger(minutes=5),  # Run every 5 minutes
+        id='calendar_sync_job',
+        name='Sync Google Calendar Bookings',
+        replace_existing=True
+    )
+    background_scheduler.add_job(
+        scheduled_document_indexing,
+        trigger=IntervalTrigger(minutes=2),  # Catch up on documents the upload task missed
+        id='document_index_job',
+        name='Index Client Documents for Search',
+        replace_existing=True
+    )
+    return background_scheduler
+
+
+# Check the schema version (migrating if needed) and start the scheduler when the app starts
 @app.on_event("startup")
 async def startup_event():
+    global scheduler
+    ensure_schema_current()
+
+    scheduler = create_scheduler()
     scheduler.start()
     print("✅ Background scheduler started - Calendar sync will run every 5 minutes")
 
 # Shutdown scheduler when app stops
 @app.on_event("shutdown")
 async def shutdown_event():
-    scheduler.shutdown()
+    if scheduler and scheduler.running:
+        scheduler.shutdown()
     print("⏹️  Background scheduler stopped")
 
 # Also register shutdown handler for atexit
-atexit.register(lambda: scheduler.shutdown() if scheduler.running else None)
+atexit.register(lambda: scheduler.shutdown() if scheduler and scheduler.running else None)
 
 
 @app.get("/")
@@ -106,9 +143,17 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics: per-route latency histograms, DB query count/time, external call time"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/scheduler/status")
 async def scheduler_status():
     """Check scheduler status"""
+    if scheduler is None:
+        return {"running": False, "jobs": []}
     return {
         "running": scheduler.running,
         "jobs": [
@@ -0,0 +1,34 @@
+"""
+Apply database schema migrations (see migrations/__init__.py)
+
+Usage:
+    python migrate.py              # apply all pending migrations
+    python migrate.py --status     # show applied and pending migrations
+    python migrate.py --to 5       # apply pending migrations up to version 5
+"""
+import argparse
+from migrations import applied_migrations, discover_migrations, run_migrations
+
+
+def show_status():
+    applied = {row["version"]: row for row in applied_migrations()}
+    print("=" * 70)
+    print("  Schema Migrations")
+    print("=" * 70)
+    for migration in discover_migrations():
+        row = applied.get(migration.version)
+        status = f"✅ applied {row['applied_at']}" if row else "⏳ pending"
+        print(f"  {migration.version:03d}  {migration.description[:45]:<45}  {status}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show applied and pending migrations")
+    parser.add_argument("--to", type=int, dest="target", help="Stop after this version")
+    args = parser.parse_args()
+
+    if args.status:
+        show_status()
+    else:
+        applied = run_migrations(target=args.target)
+        print(f"✅ {applied} migration(s) applied" if applied else "✅ Database schema is up to date")
@@ -0,0 +1,126 @@
+"""
+Migration script to move client documents into the content-addressed store.
+
+Every ClientDocument file is hashed and linked to uploads/objects/ab/cdef...;
+identical files uploaded for several clients end up as one blob. The old
+per-upload file is removed once no row references it any more.
+
+Safe to re-run: documents already in the store are skipped, and each document
+is committed individually so an interrupted run can simply be restarted.
+
+Usage:
+    python migrate_documents_to_objects.py            # migrate and report
+    python migrate_documents_to_objects.py --dry-run  # report only
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from database import SessionLocal
+from models import ClientDocument
+from utils.document_store import OBJECTS_DIR, object_path, hash_file, store_blob, release_blob
+
+
+def format_bytes(num: float) -> str:
+    for unit in ["B", "KB", "MB"]:
+        if abs(num) < 1024:
+            return f"{num:.1f} {unit}"
+        num /= 1024
+    return f"{num:.1f} GB"
+
+
+def migrate_documents(dry_run: bool = False):
+    db = SessionLocal()
+
+    stats = {
+        "documents": 0,
+        "already_migrated": 0,
+        "missing": 0,
+        "blobs_created": 0,
+        "deduplicated": 0,
+        "legacy_bytes_removed": 0,
+        "blob_bytes_written": 0,
+    }
+    seen_hashes = set()
+
+    try:
+        documents = db.query(ClientDocument).order_by(ClientDocument.id).all()
+        print(f"📄 Found {len(documents)} document(s)")
+
+        for doc in documents:
+            stats["documents"] += 1
+            source_path = doc.file_path
+
+            if not source_path or not os.path.exists(source_path):
+                print(f"   ⚠️  Document {doc.id}: file not found ({source_path})")
+                stats["missing"] += 1
+                continue
+
+            file_hash = hash_file(source_path)
+            target_path = object_path(file_hash)
+
+            if os.path.abspath(source_path) == os.path.abspath(target_path):
+                stats["already_migrated"] += 1
+                seen_hashes.add(file_hash)
+                continue
+
+            file_size = os.path.getsize(source_path)
+            blob_exists = os.path.exists(target_path) or (dry_run and file_hash in seen_hashes)
+            if blob_exists:
+                stats["deduplicated"] += 1
+                print(f"   ♻️  Document {doc.id}: duplicate of blob {file_hash[:12]}")
+            else:
+                stats["blobs_created"] += 1
+                stats["blob_bytes_written"] += file_size
+                print(f"   ➕ Document {doc.id}: new blob {file_hash[:12]} ({format_bytes(file_size)})")
+            seen_hashes.add(file_hash)
+
+            if dry_run:
+                stats["legacy_bytes_removed"] += file_size
+                continue
+
+            # Copy (not move) into the store so the row and file stay consistent
+            # if we're interrupted before the commit
+            if not blob_exists:
+                fd, temp_path = tempfile.mkstemp(dir=OBJECTS_DIR, prefix=".migrate-", suffix=".part")
+                os.close(fd)
+                shutil.copyfile(source_path, temp_path)
+                store_blob(temp_path, file_hash)
+
+            doc.file_path = target_path
+            doc.file_hash = file_hash
+            doc.file_size = file_size
+            db.commit()
+
+            if release_blob(db, source_path):
+                stats["legacy_bytes_removed"] += file_size
+
+        reclaimed = stats["legacy_bytes_removed"] - stats["blob_bytes_written"]
+
+        print("\n" + "=" * 60)
+        print(f"  Document store migration{' (dry run)' if dry_run else ''}")
+        print("=" * 60)
+        print(f"   Documents scanned:      {stats['documents']}")
+        print(f"   Already in store:       {stats['already_migrated']}")
+        print(f"   Missing files:          {stats['missing']}")
+        print(f"   New blobs:              {stats['blobs_created']}")
+        print(f"   Deduplicated:           {stats['deduplicated']}")
+        print(f"   Legacy bytes removed:   {format_bytes(stats['legacy_bytes_removed'])}")
+        print(f"   Blob bytes written:     {format_bytes(stats['blob_bytes_written'])}")
+        print(f"   Bytes reclaimed:        {format_bytes(reclaimed)}")
+        print("=" * 60)
+        return stats
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move client documents into the content-addressed store")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without touching files")
+    args = parser.parse_args()
+    migrate_documents(dry_run=args.dry_run)
@@ -0,0 +1,144 @@
+"""
+Versioned schema migrations
+
+Each migration is a module in this package named vNNN_<description>.py with an
+upgrade(conn) function. The runner applies pending migrations in version order,
+each in its own transaction, and records it in the schema_version table.
+
+At startup main.py calls ensure_schema_current(), which reads a single row
+(the highest applied version) instead of inspecting every table. If the schema
+is behind it applies the pending migrations, unless AUTO_MIGRATE=false, in which
+case it refuses to start and asks for `python migrate.py`.
+
+Writing a migration:
+- Add the next vNNN_*.py module with a docstring (shown in `migrate.py --status`)
+- Keep upgrade(conn) idempotent: databases created before this runner existed
+  (and fresh ones, via v001's create_all) may already have the change - use the
+  helpers in migrations.helpers
+- Never edit a migration that has shipped; add a new one
+"""
+import importlib
+import os
+import pkgutil
+import re
+from typing import List, NamedTuple, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from database import engine
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# Postgres advisory lock key, so workers booting together don't migrate concurrently
+MIGRATION_LOCK_ID = 4_815_162_342
+
+_MODULE_PATTERN = re.compile(r"^v(\d{3,})_\w+$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    description: str
+    upgrade: object
+
+
+def discover_migrations() -> List[Migration]:
+    """All migrations in this package, ordered by version"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_PATTERN.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        description = (module.__doc__ or module_info.name).strip().splitlines()[0]
+        migrations.append(Migration(int(match.group(1)), module_info.name, description, module.upgrade))
+
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+def latest_version() -> int:
+    migrations = discover_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def _create_version_table(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+
+
+def current_version(conn) -> int:
+    """Highest applied migration version (0 if the schema_version table doesn't exist yet)"""
+    try:
+        # Savepoint so that a missing table doesn't abort an outer Postgres transaction
+        with conn.begin_nested():
+            return conn.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar() or 0
+    except DBAPIError:
+        return 0
+
+
+def applied_migrations() -> List[dict]:
+    """Rows of the schema_version table, oldest first"""
+    with engine.begin() as conn:
+        _create_version_table(conn)
+        rows = conn.execute(text(
+            f"SELECT version, name, applied_at FROM {SCHEMA_VERSION_TABLE} ORDER BY version"
+        )).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def run_migrations(target: Optional[int] = None) -> int:
+    """
+    Apply pending migrations up to target (default: latest), one transaction each.
+
+    Returns:
+        Number of migrations applied
+    """
+    applied = 0
+    for migration in discover_migrations():
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_ID})
+            _create_version_table(conn)
+            # Re-read under the lock: another worker may have applied it meanwhile
+            if current_version(conn) >= migration.version:
+                continue
+            print(f"⏫ Applying migration {migration.version:03d}: {migration.description}")
+            migration.upgrade(conn)
+            conn.execute(
+                text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name) VALUES (:version, :name)"),
+                {"version": migration.version, "name": migration.name}
+            )
+        applied += 1
+    return applied
+
+
+def ensure_schema_current():
+    """
+    Startup check: one query for the schema version; migrate only if it's behind.
+
+    Raises:
+        RuntimeError: If the schema is behind and AUTO_MIGRATE is disabled
+    """
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    newest = latest_version()
+    if version >= newest:
+        return
+
+    if os.getenv("AUTO_MIGRATE", "true").lower() in ("false", "0", "no"):
+        raise RuntimeError(
+            f"Database schema is at version {version}, code expects {newest}. Run: python migrate.py"
+        )
+    applied = run_migrations()
+    print(f"✅ Database schema migrated to version {newest} ({applied} migration(s) applied)")
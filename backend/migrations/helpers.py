@@ -0,0 +1,40 @@
+"""
+Idempotent schema helpers for migrations
+"""
+from typing import Optional, Set
+from sqlalchemy import Column, inspect, text
+
+
+def table_exists(conn, table_name: str) -> bool:
+    return inspect(conn).has_table(table_name)
+
+
+def column_names(conn, table_name: str) -> Set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table_name)}
+
+
+def add_column(conn, column: Column, server_default: Optional[str] = None) -> bool:
+    """
+    Add a model column to its table if it isn't there yet.
+
+    The type comes from the model, so it matches what create_all would build.
+    NOT NULL isn't applied (existing rows would violate it).
+
+    Args:
+        server_default: SQL literal for existing and new rows, e.g. "'dark'" or "0"
+
+    Returns:
+        True if the column was added
+    """
+    table_name = column.table.name
+    if column.name in column_names(conn, table_name):
+        return False
+    column_type = column.type.compile(dialect=conn.dialect)
+    default_sql = f" DEFAULT {server_default}" if server_default is not None else ""
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}{default_sql}"))
+    print(f"   ✅ Added {table_name}.{column.name}")
+    return True
+
+
+def create_index(conn, name: str, table_name: str, columns: str):
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({columns})"))
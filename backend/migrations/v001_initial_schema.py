@@ -0,0 +1,13 @@
+"""
+Create all tables defined in models.py that don't exist yet
+
+Baseline for the versioned migrations. On a fresh database this builds the
+current schema; on a database created before the migration runner existed it
+only adds missing tables, and the following migrations fill in missing columns.
+"""
+from database import Base
+import models  # noqa: F401 - registers every model on Base.metadata
+
+
+def upgrade(conn):
+    Base.metadata.create_all(bind=conn)
@@ -0,0 +1,21 @@
+"""
+Add user_profiles.is_admin and mark the admin users
+
+Ported from add_admin_column.py.
+"""
+from sqlalchemy import text
+from models import UserProfile
+from migrations.helpers import add_column
+from utils.rate_limiter import ADMIN_EMAILS
+
+
+def upgrade(conn):
+    add_column(conn, UserProfile.__table__.c.is_admin, server_default="FALSE" if conn.dialect.name == "postgresql" else "0")
+
+    for email in ADMIN_EMAILS:
+        result = conn.execute(
+            text("UPDATE user_profiles SET is_admin = :is_admin WHERE lower(email) = :email"),
+            {"is_admin": True, "email": email.lower()}
+        )
+        if result.rowcount:
+            print(f"   ✅ Marked {email} as admin")
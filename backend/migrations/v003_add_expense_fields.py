@@ -0,0 +1,13 @@
+"""
+Add person, start_time, end_time and hours to invoice_expenses
+
+Ported from add_expense_fields.py.
+"""
+from models import InvoiceExpense
+from migrations.helpers import add_column
+
+
+def upgrade(conn):
+    columns = InvoiceExpense.__table__.c
+    for column in (columns.person, columns.start_time, columns.end_time, columns.hours):
+        add_column(conn, column)
@@ -0,0 +1,13 @@
+"""
+Add scope_of_work.version and default existing SOWs to version 1.0
+
+Ported from add_sow_version.py.
+"""
+from sqlalchemy import text
+from models import ScopeOfWork
+from migrations.helpers import add_column
+
+
+def upgrade(conn):
+    add_column(conn, ScopeOfWork.__table__.c.version)
+    conn.execute(text("UPDATE scope_of_work SET version = '1.0' WHERE version IS NULL"))
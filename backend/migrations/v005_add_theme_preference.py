@@ -0,0 +1,11 @@
+"""
+Add user_profiles.theme_preference (defaults to dark)
+
+Ported from add_theme_preference.py.
+"""
+from models import UserProfile
+from migrations.helpers import add_column
+
+
+def upgrade(conn):
+    add_column(conn, UserProfile.__table__.c.theme_preference, server_default="'dark'")
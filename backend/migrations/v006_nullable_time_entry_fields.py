@@ -0,0 +1,14 @@
+"""
+Make invoice_items start_time, end_time and hours nullable for manual time entries
+
+Ported from migrate_time_entry_fields.py. PostgreSQL only: SQLite columns added
+by create_all already allow NULL.
+"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    if conn.dialect.name != "postgresql":
+        return
+    for column_name in ("start_time", "end_time", "hours"):
+        conn.execute(text(f"ALTER TABLE invoice_items ALTER COLUMN {column_name} DROP NOT NULL"))
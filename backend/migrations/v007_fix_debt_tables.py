@@ -0,0 +1,33 @@
+"""
+Bring the debt tracker tables in line with models.py
+
+Ported from fix_debt_tables.py, which dropped and recreated the tables. That
+is still done when a table is empty, but tables holding data keep it and only
+get their missing columns added.
+"""
+from sqlalchemy import text
+from models import BankConnection, DebtAccount, DebtPayment
+from migrations.helpers import add_column, column_names, table_exists
+
+# Parents first: recreating a child needs its parent to exist
+DEBT_TABLES = [BankConnection.__table__, DebtAccount.__table__, DebtPayment.__table__]
+
+
+def upgrade(conn):
+    for table in DEBT_TABLES:
+        if not table_exists(conn, table.name):
+            table.create(bind=conn)
+            continue
+
+        missing = [column for column in table.columns if column.name not in column_names(conn, table.name)]
+        if not missing:
+            continue
+
+        row_count = conn.execute(text(f"SELECT COUNT(*) FROM {table.name}")).scalar()
+        if row_count == 0:
+            print(f"   ♻️  Recreating empty table {table.name}")
+            table.drop(bind=conn)
+            table.create(bind=conn)
+        else:
+            for column in missing:
+                add_column(conn, column)
@@ -0,0 +1,29 @@
+"""
+Add client_documents.file_hash and backfill it for existing uploads
+
+Ported from add_document_hash_column.py.
+"""
+import os
+from sqlalchemy import text
+from models import ClientDocument
+from migrations.helpers import add_column, create_index
+from utils.document_store import hash_file
+
+
+def upgrade(conn):
+    add_column(conn, ClientDocument.__table__.c.file_hash)
+    create_index(conn, "ix_client_documents_file_hash", "client_documents", "file_hash")
+
+    rows = conn.execute(text("SELECT id, file_path FROM client_documents WHERE file_hash IS NULL")).fetchall()
+    updated = 0
+    for doc_id, file_path in rows:
+        if not file_path or not os.path.exists(file_path):
+            print(f"   ⚠️  Document {doc_id}: file not found ({file_path})")
+            continue
+        conn.execute(
+            text("UPDATE client_documents SET file_hash = :h, file_size = :s WHERE id = :id"),
+            {"h": hash_file(file_path), "s": os.path.getsize(file_path), "id": doc_id}
+        )
+        updated += 1
+    if updated:
+        print(f"   ✅ Backfilled file_hash for {updated} document(s)")
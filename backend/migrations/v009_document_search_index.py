@@ -0,0 +1,10 @@
+"""
+Create the client document full-text search index
+
+Documents are indexed by the background sweep (index_pending_documents).
+"""
+from utils.document_search import create_document_search_tables
+
+
+def upgrade(conn):
+    create_document_search_tables(conn)
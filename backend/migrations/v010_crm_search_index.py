@@ -0,0 +1,15 @@
+"""
+Create and fill the unified CRM search index
+"""
+from sqlalchemy.orm import Session
+from utils.crm_search import create_crm_search_tables, rebuild_crm_index
+
+
+def upgrade(conn):
+    create_crm_search_tables(conn)
+    # Bound to the migration's connection, so the rebuild is part of its transaction
+    db = Session(bind=conn)
+    try:
+        print(f"   ✅ Indexed {rebuild_crm_index(db)} CRM record(s)")
+    finally:
+        db.close()
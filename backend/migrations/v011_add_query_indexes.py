@@ -0,0 +1,50 @@
+"""
+Index foreign keys and the filter/sort columns the routers query by
+
+Found with index_audit.py. Composite indexes put the equality filter first and
+the ORDER BY column second (e.g. invoice_items (invoice_id, date) serves both
+Invoice.items and WHERE invoice_id = ? lookups).
+"""
+from sqlalchemy import inspect
+from database import Base
+import models  # noqa: F401  (registers the tables)
+
+NEW_INDEXES = [
+    "ix_clients_created_at",
+    "ix_clients_status_created_at",
+    "ix_clients_contract_status_created_at",
+    "ix_invoices_contract_id",
+    "ix_invoices_issue_date",
+    "ix_invoices_client_id_issue_date",
+    "ix_invoices_status_issue_date",
+    "ix_invoice_items_invoice_id_date",
+    "ix_invoice_items_client_id_date",
+    "ix_invoice_expenses_invoice_id_date",
+    "ix_invoice_expenses_client_id_date",
+    "ix_scope_of_work_client_id",
+    "ix_scope_sections_scope_id_order",
+    "ix_client_contacts_client_id_order",
+    "ix_client_notes_client_id_created_at",
+    "ix_calendar_events_client_id_start_time",
+    "ix_client_timeline_client_id_event_date",
+    "ix_contracts_client_id",
+    "ix_contract_milestones_contract_id_order",
+    "ix_client_documents_file_path",
+    "ix_client_documents_client_id_created_at",
+    "ix_client_admin_accounts_client_id_service_name",
+    "ix_client_tech_stack_client_id_category",
+    "ix_debt_accounts_bank_connection_id",
+    "ix_debt_payments_debt_account_id_payment_date",
+]
+
+
+def upgrade(conn):
+    indexes = {index.name: index for table in Base.metadata.tables.values() for index in table.indexes}
+    inspector = inspect(conn)
+    for name in NEW_INDEXES:
+        index = indexes[name]
+        existing = {ix["name"] for ix in inspector.get_indexes(index.table.name)}
+        if name in existing:
+            continue
+        index.create(conn)
+        print(f"   ✅ Created {name}")
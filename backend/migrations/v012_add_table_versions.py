@@ -0,0 +1,12 @@
+"""
+Add table_versions (per-table write counters for HTTP ETags, see utils/table_versions.py)
+"""
+from models import TableVersion
+from migrations.helpers import table_exists
+
+
+def upgrade(conn):
+    if table_exists(conn, TableVersion.__tablename__):
+        return
+    TableVersion.__table__.create(conn)
+    print(f"   ✅ Created {TableVersion.__tablename__}")
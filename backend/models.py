@@ -1,20 +1,28 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from database import Base
 
+# Large Text columns left out of ORM loads until first accessed (one query loads
+# the whole group); routes whose response includes them use undefer_group(LONG_TEXT)
+LONG_TEXT = "long_text"
+
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        Index("ix_clients_status_created_at", "status", "created_at"),
+        Index("ix_clients_contract_status_created_at", "contract_status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(255), nullable=False)
     last_name = Column(String(255), nullable=False)
     email = Column(String(255), nullable=False, index=True)
     client_date = Column(DateTime(timezone=True), nullable=False)  # Date they became a client
-    description = Column(Text)  # Description of their idea
+    description = deferred(Column(Text), group=LONG_TEXT)  # Description of their idea
     hourly_rate = Column(Float)
-    notes_from_last_meeting = Column(Text)
+    notes_from_last_meeting = deferred(Column(Text), group=LONG_TEXT)
     timeline = Column(Text)  # Timeline on the contract
     contract_status = Column(String(50), default="No Contract")  # No Contract, Negotiation, Contract Signed, Not Heard Back
     contract_type = Column(String(50))  # Fixed Price, Milestone Based, Hourly, None
@@ -22,7 +30,7 @@ class Client(Base):
     status = Column(String(50), default="Active")  # Active, Inactive, Lead, Prospect
     company = Column(String(255))
     address = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
@@ -41,10 +49,14 @@ class Client(Base):
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        Index("ix_invoices_client_id_issue_date", "client_id", "issue_date"),
+        Index("ix_invoices_status_issue_date", "status", "issue_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
-    contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=True)  # Optional: link to contract
+    contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=True, index=True)  # Optional: link to contract
     invoice_number = Column(String(100), unique=True, nullable=False, index=True)
     amount = Column(Float, nullable=False)
     tax = Column(Float, default=0.0)
@@ -53,9 +65,9 @@ class Invoice(Base):
     finalized_date = Column(DateTime(timezone=True))  # When invoice was finalized
     archived_date = Column(DateTime(timezone=True))  # When invoice was archived
     due_date = Column(DateTime(timezone=True))
-    issue_date = Column(DateTime(timezone=True), server_default=func.now())
+    issue_date = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     paid_date = Column(DateTime(timezone=True))
-    notes = Column(Text)
+    notes = deferred(Column(Text), group=LONG_TEXT)
     project_name = Column(String(255))  # What the invoice is for (from contract or manual entry)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -69,6 +81,10 @@ class Invoice(Base):
 
 class InvoiceItem(Base):
     __tablename__ = "invoice_items"
+    __table_args__ = (
+        Index("ix_invoice_items_invoice_id_date", "invoice_id", "date"),
+        Index("ix_invoice_items_client_id_date", "client_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=True)  # Nullable for unbilled time entries
@@ -91,6 +107,10 @@ class InvoiceItem(Base):
 
 class InvoiceExpense(Base):
     __tablename__ = "invoice_expenses"
+    __table_args__ = (
+        Index("ix_invoice_expenses_invoice_id_date", "invoice_id", "date"),
+        Index("ix_invoice_expenses_client_id_date", "client_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=True)  # Nullable for unbilled expenses
@@ -115,12 +135,12 @@ class ScopeOfWork(Base):
     __tablename__ = "scope_of_work"
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     version = Column(String(50), default="1.0")
     status = Column(String(50), default="Draft")  # Draft, Sent, Approved, Rejected, In Progress, Completed
     description = Column(Text)
-    deliverables = Column(Text)
+    deliverables = deferred(Column(Text), group=LONG_TEXT)
     timeline = Column(String(255))
     budget = Column(Float)
     start_date = Column(DateTime(timezone=True))
@@ -137,6 +157,9 @@ class ScopeOfWork(Base):
 
 class ScopeSection(Base):
     __tablename__ = "scope_sections"
+    __table_args__ = (
+        Index("ix_scope_sections_scope_id_order", "scope_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     scope_id = Column(Integer, ForeignKey("scope_of_work.id"), nullable=False)
@@ -151,6 +174,9 @@ class ScopeSection(Base):
 
 class ClientContact(Base):
     __tablename__ = "client_contacts"
+    __table_args__ = (
+        Index("ix_client_contacts_client_id_order", "client_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
@@ -169,6 +195,9 @@ class ClientContact(Base):
 
 class ClientNote(Base):
     __tablename__ = "client_notes"
+    __table_args__ = (
+        Index("ix_client_notes_client_id_created_at", "client_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
@@ -186,13 +215,16 @@ class ClientNote(Base):
 
 class CalendarEvent(Base):
     __tablename__ = "calendar_events"
+    __table_args__ = (
+        Index("ix_calendar_events_client_id_start_time", "client_id", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=True, index=True)  # Nullable if not matched yet
     google_event_id = Column(String(255), unique=True, nullable=False, index=True)  # Google Calendar event ID
     calendar_id = Column(String(255), nullable=False)  # Which calendar the event is on
     event_title = Column(String(255))
-    event_description = Column(Text)
+    event_description = deferred(Column(Text), group=LONG_TEXT)
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
     timezone = Column(String(50), default="America/Los_Angeles")
@@ -210,6 +242,9 @@ class CalendarEvent(Base):
 
 class ClientTimeline(Base):
     __tablename__ = "client_timeline"
+    __table_args__ = (
+        Index("ix_client_timeline_client_id_event_date", "client_id", "event_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
@@ -228,7 +263,7 @@ class Contract(Base):
     __tablename__ = "contracts"
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     contract_type = Column(String(50), nullable=False)  # Fixed Price, Milestone Based
     title = Column(String(255), nullable=False)
     total_amount = Column(Float, nullable=False)
@@ -248,6 +283,9 @@ class Contract(Base):
 
 class ContractMilestone(Base):
     __tablename__ = "contract_milestones"
+    __table_args__ = (
+        Index("ix_contract_milestones_contract_id_order", "contract_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=False)
@@ -267,15 +305,19 @@ class ContractMilestone(Base):
 
 class ClientDocument(Base):
     __tablename__ = "client_documents"
+    __table_args__ = (
+        Index("ix_client_documents_client_id_created_at", "client_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     file_name = Column(String(500), nullable=False)
-    file_path = Column(String(1000), nullable=False)
+    file_path = Column(String(1000), nullable=False, index=True)
     file_type = Column(String(100))  # pdf, docx, etc.
     file_size = Column(Integer)  # in bytes
+    file_hash = Column(String(64), index=True)  # SHA-256 hex digest of the file contents
     document_type = Column(String(100))  # SOW, Contract, Other, etc.
     uploaded_by = Column(String(255))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -286,6 +328,9 @@ class ClientDocument(Base):
 
 class ClientAdminAccount(Base):
     __tablename__ = "client_admin_accounts"
+    __table_args__ = (
+        Index("ix_client_admin_accounts_client_id_service_name", "client_id", "service_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
@@ -304,6 +349,9 @@ class ClientAdminAccount(Base):
 
 class ClientTechStack(Base):
     __tablename__ = "client_tech_stack"
+    __table_args__ = (
+        Index("ix_client_tech_stack_client_id_category", "client_id", "category"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
@@ -355,7 +403,7 @@ class DebtAccount(Base):
     __tablename__ = "debt_accounts"
 
     id = Column(Integer, primary_key=True, index=True)
-    bank_connection_id = Column(Integer, ForeignKey("bank_connections.id"), nullable=True)
+    bank_connection_id = Column(Integer, ForeignKey("bank_connections.id"), nullable=True, index=True)
     owner = Column(String(50), nullable=False, default="user")  # Custom owner name (e.g., "John", "Jane", "You", "Wife")
     name = Column(String(255), nullable=False)
     account_type = Column(String(50), nullable=False)  # credit_card, loan, mortgage, line_of_credit
@@ -382,6 +430,9 @@ class DebtAccount(Base):
 
 class DebtPayment(Base):
     __tablename__ = "debt_payments"
+    __table_args__ = (
+        Index("ix_debt_payments_debt_account_id_payment_date", "debt_account_id", "payment_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     debt_account_id = Column(Integer, ForeignKey("debt_accounts.id"), nullable=False)
@@ -394,3 +445,12 @@ class DebtPayment(Base):
     # Relationships
     debt_account = relationship("DebtAccount", back_populates="payments")
 
+
+
+class TableVersion(Base):
+    """Write counter per table, bumped in the writing transaction (see utils/table_versions.py)"""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True))
@@ -0,0 +1,125 @@
+"""
+Re-encrypt every ClientAdminAccount password under the current primary key.
+
+Key rotation steps:
+    1. Generate a new key:
+       python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
+    2. Set ENCRYPTION_KEY=<new key> and ENCRYPTION_PREVIOUS_KEYS=<old key> (comma-separate several)
+       and restart the API - existing passwords keep working during the rotation
+    3. Run this script
+    4. Once it reports completion, remove the old key from ENCRYPTION_PREVIOUS_KEYS
+
+Accounts are processed in id order, in chunks; each chunk is one transaction.
+Progress is checkpointed to reencrypt_checkpoint.json after every chunk, so an
+interrupted run resumes where it stopped (as long as the primary key is unchanged).
+
+Usage:
+    python reencrypt_passwords.py
+    python reencrypt_passwords.py --batch-size 500
+    python reencrypt_passwords.py --restart   # ignore the checkpoint and start over
+"""
+import argparse
+import json
+import os
+import time
+from database import SessionLocal
+from models import ClientAdminAccount
+from utils.encryption import get_encryption_key, key_fingerprint, rotate_encrypted_password
+
+CHECKPOINT_FILE = "reencrypt_checkpoint.json"
+
+
+def load_checkpoint(fingerprint: str) -> int:
+    """Last processed account id for this primary key, or 0"""
+    if not os.path.exists(CHECKPOINT_FILE):
+        return 0
+    with open(CHECKPOINT_FILE, "r") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("key_fingerprint") != fingerprint:
+        print("ℹ️  Checkpoint belongs to a different primary key, starting over")
+        return 0
+    return checkpoint.get("last_id", 0)
+
+
+def save_checkpoint(fingerprint: str, last_id: int, done: bool = False):
+    temp_file = CHECKPOINT_FILE + ".tmp"
+    with open(temp_file, "w") as f:
+        json.dump({"key_fingerprint": fingerprint, "last_id": last_id, "done": done}, f)
+    os.replace(temp_file, CHECKPOINT_FILE)
+
+
+def reencrypt_passwords(batch_size: int = 200, restart: bool = False):
+    fingerprint = key_fingerprint(get_encryption_key())
+    last_id = 0 if restart else load_checkpoint(fingerprint)
+
+    db = SessionLocal()
+    try:
+        total = db.query(ClientAdminAccount).filter(
+            ClientAdminAccount.encrypted_password.isnot(None),
+            ClientAdminAccount.encrypted_password != ""
+        ).count()
+        remaining = db.query(ClientAdminAccount).filter(
+            ClientAdminAccount.id > last_id,
+            ClientAdminAccount.encrypted_password.isnot(None),
+            ClientAdminAccount.encrypted_password != ""
+        ).count()
+
+        print(f"🔑 Primary key fingerprint: {fingerprint}")
+        if last_id:
+            print(f"↩️  Resuming after account id {last_id}")
+        print(f"📦 {remaining} of {total} encrypted password(s) to process (batch size {batch_size})")
+
+        processed = 0
+        failed_ids = []
+        started = time.perf_counter()
+
+        while True:
+            batch = db.query(ClientAdminAccount).filter(
+                ClientAdminAccount.id > last_id
+            ).order_by(ClientAdminAccount.id).limit(batch_size).all()
+            if not batch:
+                break
+
+            for account in batch:
+                if account.encrypted_password:
+                    try:
+                        account.encrypted_password = rotate_encrypted_password(account.encrypted_password)
+                        processed += 1
+                    except Exception as e:
+                        # Leave it as-is; it's not readable with any configured key
+                        failed_ids.append(account.id)
+                        print(f"   ❌ Account {account.id}: {e}")
+
+            last_id = batch[-1].id
+            db.commit()
+            save_checkpoint(fingerprint, last_id)
+            db.expunge_all()
+
+            elapsed = time.perf_counter() - started
+            rate = processed / elapsed if elapsed > 0 else 0
+            print(f"   ✅ {processed}/{remaining} re-encrypted (up to id {last_id}, {rate:.0f}/s)")
+
+        save_checkpoint(fingerprint, last_id, done=True)
+        print("\n" + "=" * 60)
+        print(f"✅ Re-encryption complete: {processed} password(s) under key {fingerprint}")
+        if failed_ids:
+            print(f"⚠️  {len(failed_ids)} password(s) could not be decrypted with any key: {failed_ids}")
+        else:
+            print("   Old keys can now be removed from ENCRYPTION_PREVIOUS_KEYS")
+        print("=" * 60)
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        print("   Progress up to the last completed batch is saved; re-run to resume.")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-encrypt client admin account passwords under the current key")
+    parser.add_argument("--batch-size", type=int, default=200, help="Accounts per transaction (default: 200)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and process every account")
+    args = parser.parse_args()
+    reencrypt_passwords(batch_size=args.batch_size, restart=args.restart)
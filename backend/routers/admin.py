@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Optional
+from utils import query_cache, slow_query_log
+from utils.admin_auth import ADMIN_API_TOKEN, is_admin_request
+
+
+def require_admin(request: Request):
+    """Allow only requests carrying ADMIN_API_TOKEN in the X-Admin-Token header"""
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_API_TOKEN is not set)")
+    if not is_admin_request(request):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(100, ge=1, le=1000),
+    route: Optional[str] = None
+):
+    """
+    Recent slow queries (newest first) with their query plans, plus a summary
+    grouped by normalized statement (worst total time first)
+
+    - route: only queries issued by this route, e.g. "GET /api/clients/{client_id}"
+    """
+    return {
+        "threshold_ms": slow_query_log.SLOW_QUERY_THRESHOLD_MS,
+        "summary": slow_query_log.summarize_slow_queries(),
+        "queries": slow_query_log.get_slow_queries(limit=limit, route=route),
+    }
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    """Empty the slow-query log"""
+    slow_query_log.clear_slow_queries()
+    return {"message": "Slow-query log cleared"}
+
+
+@router.get("/query-cache")
+def get_query_cache_stats():
+    """Query cache size and hit / miss / eviction counts per route"""
+    return query_cache.get_stats()
+
+
+@router.delete("/query-cache")
+def clear_query_cache():
+    """Drop every cached query result"""
+    query_cache.clear_query_cache()
+    return {"message": "Query cache cleared"}
@@ -0,0 +1,206 @@
+"""
+Batch API: several API calls in one HTTP request
+
+POST /api/batch takes a list of sub-requests (method, path, query, JSON body)
+and dispatches each one in-process through the app's router, so it gets the
+same validation, dependencies, status codes and response models as a direct
+call, without another round trip, CORS preflight or middleware pass.
+
+Sub-requests run in order, except that consecutive GETs run concurrently (at
+most BATCH_MAX_CONCURRENCY at a time). A write is a barrier: the reads after
+it see its result. Writes use the batch's DB session; concurrent reads each
+get a session of their own (a Session can't be used from two threads at
+once). After every sub-request the session's transaction is ended, exactly
+as get_db() would when a normal request finishes.
+
+Each sub-request gets a result {id, status, headers, body}; one failing
+sub-request doesn't fail the batch.
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+from typing import List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+from fastapi import APIRouter, HTTPException, Request
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from database import SessionLocal, shared_session
+from schemas import BatchRequest, BatchResult, BatchSubRequest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "25"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+READ_METHODS = {"GET"}
+ALLOWED_METHODS = READ_METHODS | {"POST", "PUT", "PATCH", "DELETE"}
+
+# Outer request headers that describe the batch itself, not the sub-request
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"if-none-match", b"if-modified-since", b"accept-encoding"}
+
+# Router-level redirects (missing trailing slash) followed per sub-request
+MAX_REDIRECTS = 1
+
+
+def _param(value):
+    return str(value).lower() if isinstance(value, bool) else value  # true/false, not True/False
+
+
+def _query_string(sub: BatchSubRequest, inline: str) -> str:
+    if isinstance(sub.query, dict):
+        params = {key: [_param(v) for v in value] if isinstance(value, list) else _param(value)
+                  for key, value in sub.query.items() if value is not None}
+        query = urlencode(params, doseq=True)
+    else:
+        query = (sub.query or "").lstrip("?")
+    return "&".join(part for part in (inline, query) if part)
+
+
+def _sub_scope(request: Request, method: str, path: str, query: str, body: bytes) -> dict:
+    headers = [(name, value) for name, value in request.scope["headers"] if name not in _DROPPED_HEADERS]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    # Copy of the outer scope: app, client address, exception handlers, ...
+    scope = {key: value for key, value in request.scope.items() if key not in ("route", "endpoint", "path_params")}
+    scope.update(
+        method=method,
+        path=path,
+        raw_path=path.encode(),
+        query_string=query.encode(),
+        headers=headers,
+    )
+    return scope
+
+
+async def _call_app(app, scope: dict, body: bytes) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """Run one ASGI request against `app` and collect the response"""
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    never = asyncio.Event()
+    status, headers, chunks = 500, [], []
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # Nothing more to read; block like a client that stays connected
+        # (a disconnect here would cancel streaming responses)
+        await never.wait()
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status, headers = message["status"], message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except StarletteHTTPException as e:
+        # Raised by the router itself (unknown path, wrong method)
+        return e.status_code, [(b"content-type", b"application/json")], json.dumps({"detail": e.detail}).encode()
+    return status, headers, b"".join(chunks)
+
+
+def _result(sub: BatchSubRequest, status: int, raw_headers: List[Tuple[bytes, bytes]], body: bytes) -> dict:
+    headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in raw_headers if name != b"content-length"}
+    result = {"id": sub.id, "status": status, "headers": headers, "body": None}
+    content_type = headers.get("content-type", "")
+    if not body:
+        pass
+    elif content_type.startswith("application/json"):
+        result["body"] = json.loads(body)
+    elif content_type.startswith("text/"):
+        result["body"] = body.decode("utf-8", errors="replace")
+    else:
+        result["body_base64"] = base64.b64encode(body).decode()
+    return result
+
+
+def _error(sub: BatchSubRequest, status: int, detail: str) -> dict:
+    return {"id": sub.id, "status": status, "headers": {}, "body": {"detail": detail}}
+
+
+async def _dispatch(request: Request, sub: BatchSubRequest, db) -> dict:
+    """Run one sub-request with `db` as its session, then end the session's transaction"""
+    method = sub.method.upper()
+    if method not in ALLOWED_METHODS:
+        return _error(sub, 405, f"Method {sub.method} not allowed in a batch. Use: {', '.join(sorted(ALLOWED_METHODS))}")
+    url = urlsplit(sub.path)
+    if url.scheme or url.netloc or not url.path.startswith("/api/"):
+        return _error(sub, 400, "path must be an API path, e.g. /api/clients/1")
+    if url.path.rstrip("/") == router.prefix:
+        return _error(sub, 400, "Batches can't be nested")
+
+    body = json.dumps(sub.body).encode() if sub.body is not None else b""
+    path, query = url.path, _query_string(sub, url.query)
+    token = shared_session.set(db)
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            status, headers, content = await _call_app(request.app.router, _sub_scope(request, method, path, query, body), body)
+            location = dict(headers).get(b"location")
+            if status not in (307, 308) or not location:
+                break
+            redirect = urlsplit(location.decode("latin-1"))
+            path, query = redirect.path, redirect.query
+        return _result(sub, status, headers, content)
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", method, sub.path)
+        return _error(sub, 500, "Internal Server Error")
+    finally:
+        shared_session.reset(token)
+        db.close()
+
+
+async def _run_reads(request: Request, subs: List[Tuple[int, BatchSubRequest]], results: list, sessions: list):
+    """Run GET sub-requests concurrently, one session per worker"""
+    queue = list(reversed(subs))
+    workers = min(BATCH_MAX_CONCURRENCY, len(subs))
+    while len(sessions) < workers:
+        sessions.append(SessionLocal())
+
+    async def worker(db):
+        while queue:
+            index, sub = queue.pop()
+            results[index] = await _dispatch(request, sub, db)
+
+    await asyncio.gather(*(worker(db) for db in sessions[:workers]))
+
+
+@router.post("", response_model=List[BatchResult])
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    Run several API calls in one request
+
+    Body: {"requests": [{"id": "client", "method": "GET", "path": "/api/clients/12"},
+                        {"id": "notes", "path": "/api/client-notes/client/12", "query": {"limit": 20}}]}
+
+    Returns one {id, status, headers, body} per sub-request, in request order.
+    At most BATCH_MAX_REQUESTS sub-requests per batch; consecutive GETs run
+    concurrently, writes run one at a time in order.
+    """
+    if len(batch.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(batch.requests)} requests; the limit is {BATCH_MAX_REQUESTS}"
+        )
+
+    results: List[Optional[dict]] = [None] * len(batch.requests)
+    sessions = [SessionLocal()]  # sessions[0] is the batch session writes use
+    try:
+        reads = []
+        for index, sub in enumerate(batch.requests):
+            if sub.method.upper() in READ_METHODS:
+                reads.append((index, sub))
+                continue
+            if reads:
+                await _run_reads(request, reads, results, sessions)
+                reads = []
+            results[index] = await _dispatch(request, sub, sessions[0])
+        if reads:
+            await _run_reads(request, reads, results, sessions)
+    finally:
+        for db in sessions:
+            db.close()
+    return results
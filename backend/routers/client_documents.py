@@ -1,19 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database import get_db
 from models import Client, ClientDocument
 from models import ScopeOfWork
-from schemas import ClientDocumentCreate, ClientDocumentUpdate, ClientDocument as ClientDocumentSchema
+from schemas import ClientDocumentCreate, ClientDocumentUpdate, ClientDocument as ClientDocumentSchema, ClientDocumentSearchResult
+from utils.document_store import OBJECTS_DIR, object_path, store_blob, blob_lock, release_blob
+from utils import document_search
+from utils.document_thumbnails import thumbnail_path, can_render, generate_thumbnail_for_document
 import os
-import shutil
+import hashlib
+import tempfile
+import mimetypes
 from datetime import datetime
+from email.utils import formatdate
+from urllib.parse import quote
 
 router = APIRouter(prefix="/api/client-documents", tags=["client-documents"])
 
+# Legacy per-upload files; new uploads go to the content-addressed store (utils/document_store.py)
 UPLOAD_DIR = "uploads/documents"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Maximum accepted upload size (configurable via MAX_UPLOAD_SIZE_MB env var, default: 50 MB)
+MAX_UPLOAD_SIZE = int(float(os.getenv("MAX_UPLOAD_SIZE_MB", "50")) * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Read uploads 1 MB at a time
+
+# When running behind nginx, set to the internal location that maps to uploads/
+# (e.g. /protected-uploads) so nginx serves files with sendfile instead of Python
+DOCUMENT_ACCEL_REDIRECT_PREFIX = os.getenv("DOCUMENT_ACCEL_REDIRECT_PREFIX", "")
+
+
+@router.get("/search", response_model=List[ClientDocumentSearchResult])
+def search_documents(
+    q: str = Query(..., min_length=1, max_length=500),
+    client_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over document titles and contents, ranked, with highlighted snippets"""
+    return document_search.search_documents(db, q, client_id=client_id, limit=limit)
+
 
 @router.get("/client/{client_id}", response_model=List[ClientDocumentSchema])
 def get_client_documents(client_id: int, db: Session = Depends(get_db)):
@@ -26,41 +55,75 @@ def get_client_documents(client_id: int, db: Session = Depends(get_db)):
     return documents
 
 
-@router.post("/", response_model=ClientDocumentSchema)
-async def upload_document(
-    client_id: int = Form(...),
-    title: str = Form(...),
-    description: Optional[str] = Form(None),
-    document_type: str = Form("Other"),
-    uploaded_by: Optional[str] = Form(None),
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
-):
-    """Upload a document for a client"""
-    client = db.query(Client).filter(Client.id == client_id).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    # Save file
-    file_ext = os.path.splitext(file.filename)[1]
-    file_name = f"{client_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, file_name)
+async def save_upload_to_disk(file: UploadFile, dest_dir: str, max_size: int = MAX_UPLOAD_SIZE) -> tuple:
+    """
+    Stream an upload to a temp file in dest_dir, hashing it as it is written.
     
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    Returns (temp_path, file_size, sha256_hex). The caller is responsible for
+    moving the temp file into place (or removing it). Raises 413 if the upload
+    exceeds max_size; the partial temp file is removed in that case.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-", suffix=".part")
+    hasher = hashlib.sha256()
+    file_size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                file_size += len(chunk)
+                if file_size > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Maximum upload size is {max_size // (1024 * 1024)} MB"
+                    )
+                hasher.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+            await run_in_threadpool(os.fsync, buffer.fileno())
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
     
-    file_size = os.path.getsize(file_path)
-    file_type = file_ext[1:] if file_ext else None
-    
-    # Create document record
+    return temp_path, file_size, hasher.hexdigest()
+
+
+def create_document_record(db: Session, client_id: int, title: str, description: Optional[str],
+                           document_type: str, uploaded_by: Optional[str], original_name: str,
+                           temp_path: str, file_type: Optional[str], file_size: int, file_hash: str) -> ClientDocument:
+    """
+    Link the uploaded temp file into the object store and insert the ClientDocument
+    row (and SOW record for SOW uploads). Runs in the threadpool.
+    """
+    with blob_lock(object_path(file_hash)):
+        file_path, is_new_blob = store_blob(temp_path, file_hash)
+        try:
+            db_document = _insert_document(
+                db, client_id, title, description, document_type, uploaded_by,
+                original_name, file_path, file_type, file_size, file_hash
+            )
+        except Exception:
+            db.rollback()
+            # Don't leave an orphaned blob behind if the row couldn't be written
+            if is_new_blob:
+                release_blob(db, file_path)
+            raise
+    return db_document
+
+
+def _insert_document(db: Session, client_id: int, title: str, description: Optional[str],
+                     document_type: str, uploaded_by: Optional[str], original_name: str,
+                     file_path: str, file_type: Optional[str], file_size: int, file_hash: str) -> ClientDocument:
     db_document = ClientDocument(
         client_id=client_id,
         title=title,
         description=description,
-        file_name=file.filename,
+        file_name=original_name,
         file_path=file_path,
         file_type=file_type,
         file_size=file_size,
+        file_hash=file_hash,
         document_type=document_type,
         uploaded_by=uploaded_by
     )
@@ -78,24 +141,73 @@ async def upload_document(
         ).first()
         
         if existing_sow:
-            existing_sow.notes = f"Document uploaded: {file.filename}"
+            existing_sow.notes = f"Document uploaded: {original_name}"
         else:
             # Create new SOW record
             new_sow = ScopeOfWork(
                 client_id=client_id,
                 title=title,
                 status="Approved",
-                description=description or f"SOW document uploaded: {file.filename}",
-                notes=f"Document uploaded: {file.filename}",
+                description=description or f"SOW document uploaded: {original_name}",
+                notes=f"Document uploaded: {original_name}",
                 approved_date=datetime.now()
             )
             db.add(new_sow)
         
         db.commit()
+        db.refresh(db_document)
     
     return db_document
 
 
+def client_exists(db: Session, client_id: int) -> bool:
+    return db.query(Client.id).filter(Client.id == client_id).first() is not None
+
+
+@router.post("/", response_model=ClientDocumentSchema)
+async def upload_document(
+    background_tasks: BackgroundTasks,
+    client_id: int = Form(...),
+    title: str = Form(...),
+    description: Optional[str] = Form(None),
+    document_type: str = Form("Other"),
+    uploaded_by: Optional[str] = Form(None),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a document for a client
+    
+    The file is streamed to a temp file in chunks (never fully in memory),
+    hashed with SHA-256 on the way through, and atomically renamed into the
+    content-addressed store. Identical files are stored once.
+    Database work runs in the threadpool so the event loop is never blocked.
+    Text extraction for search and thumbnail rendering run as background
+    tasks after the response.
+    """
+    if not await run_in_threadpool(client_exists, db, client_id):
+        raise HTTPException(status_code=404, detail="Client not found")
+    
+    temp_path, file_size, file_hash = await save_upload_to_disk(file, OBJECTS_DIR)
+    
+    file_ext = os.path.splitext(file.filename or "")[1]
+    file_type = file_ext[1:] if file_ext else None
+    
+    try:
+        db_document = await run_in_threadpool(
+            create_document_record, db, client_id, title, description, document_type,
+            uploaded_by, file.filename, temp_path, file_type, file_size, file_hash
+        )
+        background_tasks.add_task(document_search.index_document_by_id, db_document.id)
+        if can_render(file_type):
+            background_tasks.add_task(generate_thumbnail_for_document, db_document.id)
+        return db_document
+    finally:
+        # store_blob() consumes the temp file; only left over if we failed before that
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
 @router.put("/{document_id}", response_model=ClientDocumentSchema)
 def update_document(document_id: int, document_update: ClientDocumentUpdate, db: Session = Depends(get_db)):
     """Update document metadata"""
@@ -107,6 +219,9 @@ def update_document(document_id: int, document_update: ClientDocumentUpdate, db:
     for field, value in update_data.items():
         setattr(db_document, field, value)
     
+    if "title" in update_data:
+        document_search.update_document_title(db, db_document)
+    
     db.commit()
     db.refresh(db_document)
     return db_document
@@ -119,66 +234,151 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
     if not db_document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Delete file
-    if os.path.exists(db_document.file_path):
-        os.remove(db_document.file_path)
-    
+    file_path = db_document.file_path
+    document_search.remove_document(db, document_id)
     db.delete(db_document)
     db.commit()
+    
+    # Delete file only if no other document shares it
+    release_blob(db, file_path)
     return {"message": "Document deleted successfully"}
 
 
-@router.get("/{document_id}/download")
-def download_document(document_id: int, db: Session = Depends(get_db)):
-    """Download a document file"""
-    from fastapi.responses import FileResponse
+def document_etag(db_document: ClientDocument, stat_result: os.stat_result) -> str:
+    """Strong ETag: the content hash when we have it, otherwise derived from mtime + size"""
+    if db_document.file_hash:
+        return f'"{db_document.file_hash}"'
+    return f'"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def if_range_matches(if_range: str, etag: str, stat_result: os.stat_result) -> bool:
+    """Check an If-Range header value: our strong ETag, or the exact Last-Modified date"""
+    if if_range.startswith("W/"):
+        return False
+    return if_range == etag or if_range == formatdate(stat_result.st_mtime, usegmt=True)
+
+
+def serve_document_file(request: Request, document_id: int, db: Session, disposition: str):
+    """
+    Serve a stored document without reading it into memory.
     
+    - Answers If-None-Match with 304 before touching the file contents
+    - Range requests get 206 partial responses (lets browser PDF viewers seek);
+      If-Range is checked against our ETag / Last-Modified
+    - Otherwise the file is streamed in chunks by FileResponse, or handed to the
+      reverse proxy's sendfile via X-Accel-Redirect when DOCUMENT_ACCEL_REDIRECT_PREFIX is set
+    """
     db_document = db.query(ClientDocument).filter(ClientDocument.id == document_id).first()
     if not db_document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    if not os.path.exists(db_document.file_path):
+    try:
+        stat_result = os.stat(db_document.file_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
     
+    etag = document_etag(db_document, stat_result)
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",  # Always revalidate; revalidation is a cheap 304
+    }
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+    
+    if disposition == "inline":
+        # Determine content type based on file extension
+        content_type, _ = mimetypes.guess_type(db_document.file_name)
+        if not content_type:
+            # Default to application/octet-stream if we can't determine
+            content_type = "application/octet-stream"
+    else:
+        content_type = "application/octet-stream"
+    
+    if DOCUMENT_ACCEL_REDIRECT_PREFIX:
+        # nginx serves the file itself (sendfile + Range), we only send headers
+        relative_path = os.path.relpath(db_document.file_path, "uploads").replace(os.sep, "/")
+        return Response(
+            media_type=content_type,
+            headers={
+                **cache_headers,
+                "X-Accel-Redirect": f"{DOCUMENT_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{relative_path}",
+                "Content-Disposition": f"{disposition}; filename*=utf-8''{quote(db_document.file_name)}",
+            }
+        )
+    
+    # FileResponse checks If-Range against its own (md5) ETag rather than ours, so
+    # evaluate it here and hide it: a match resumes with the Range, otherwise the
+    # Range is dropped too and the whole file is sent
+    if_range = request.headers.get("if-range")
+    if if_range is not None:
+        hidden = {b"if-range"} if if_range_matches(if_range, etag, stat_result) else {b"if-range", b"range"}
+        request.scope["headers"] = [(key, value) for key, value in request.scope["headers"] if key not in hidden]
+    
     return FileResponse(
         db_document.file_path,
-        media_type="application/octet-stream",
-        filename=db_document.file_name
+        media_type=content_type,
+        filename=db_document.file_name,
+        stat_result=stat_result,
+        content_disposition_type=disposition,
+        headers=cache_headers,
     )
 
 
+@router.get("/{document_id}/download")
+def download_document(document_id: int, request: Request, db: Session = Depends(get_db)):
+    """Download a document file (supports Range and If-None-Match)"""
+    return serve_document_file(request, document_id, db, disposition="attachment")
+
+
 @router.get("/{document_id}/view")
-def view_document(document_id: int, db: Session = Depends(get_db)):
-    """View a document file in browser"""
-    from fastapi.responses import FileResponse, Response
-    import mimetypes
+def view_document(document_id: int, request: Request, db: Session = Depends(get_db)):
+    """View a document file in browser (supports Range and If-None-Match)"""
+    return serve_document_file(request, document_id, db, disposition="inline")
+
+
+@router.get("/{document_id}/thumbnail")
+def get_document_thumbnail(document_id: int, request: Request, background_tasks: BackgroundTasks,
+                           db: Session = Depends(get_db)):
+    """
+    First-page thumbnail (WebP) for a document
     
+    The URL is keyed by document id, which SQLite can hand out again after a
+    delete, so thumbnails are revalidated against an ETag derived from the
+    content hash (a cheap 304) rather than cached as immutable. Returns 404 if
+    the file type has no preview; if the thumbnail just hasn't been rendered
+    yet, rendering is queued and 404 is returned until it's ready.
+    """
     db_document = db.query(ClientDocument).filter(ClientDocument.id == document_id).first()
     if not db_document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    if not os.path.exists(db_document.file_path):
-        raise HTTPException(status_code=404, detail="File not found")
+    thumb_path = thumbnail_path(db_document.file_path)
+    if not os.path.exists(thumb_path):
+        if can_render(db_document.file_type) and os.path.exists(db_document.file_path):
+            background_tasks.add_task(generate_thumbnail_for_document, document_id)
+            raise HTTPException(status_code=404, detail="Thumbnail is being generated")
+        raise HTTPException(status_code=404, detail="No thumbnail available for this document")
     
-    # Determine content type based on file extension
-    content_type, _ = mimetypes.guess_type(db_document.file_name)
-    if not content_type:
-        # Default to application/octet-stream if we can't determine
-        content_type = "application/octet-stream"
+    stat_result = os.stat(thumb_path)
+    etag = f'"{db_document.file_hash}-thumb"' if db_document.file_hash else document_etag(db_document, stat_result)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
     
-    # Read file content
-    with open(db_document.file_path, 'rb') as f:
-        file_content = f.read()
-    
-    # Return Response with inline content-disposition header
-    headers = {
-        "Content-Disposition": f"inline; filename=\"{db_document.file_name}\"",
-        "Content-Type": content_type,
-    }
-    
-    return Response(
-        content=file_content,
-        media_type=content_type,
-        headers=headers
+    return FileResponse(
+        thumb_path,
+        media_type="image/webp",
+        stat_result=stat_result,
+        headers=cache_headers,
     )
-
@@ -5,8 +5,9 @@ from pydantic import BaseModel
 from database import get_db
 from models import ClientTimeline, Client
 from schemas import ClientTimeline as ClientTimelineSchema, ClientTimelineCreate, ClientTimelineUpdate
-import os
 import json
+from utils.providers import get_openai_client
+from utils.metrics import track_external
 
 router = APIRouter(prefix="/api/client-timeline", tags=["client-timeline"])
 
@@ -87,16 +88,10 @@ def parse_timeline_with_ai(request: ParseTimelineRequest, db: Session = Depends(
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
+    client_ai = get_openai_client()
+    if not client_ai:
         raise HTTPException(status_code=400, detail="OpenAI API is not configured")
     
-    try:
-        from openai import OpenAI
-        client_ai = OpenAI(api_key=openai_api_key)
-    except ImportError:
-        raise HTTPException(status_code=500, detail="OpenAI package not installed")
-    
     prompt = f"""You are an expert at parsing project timelines and extracting structured milestone and sprint information.
 
 Parse the following timeline text and extract:
@@ -139,21 +134,22 @@ Important:
 - Return ONLY valid JSON, no markdown formatting or code blocks"""
 
     try:
-        response = client_ai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at parsing project timelines. Always return valid JSON only, no markdown or code blocks."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.3,
-            max_tokens=3000,
-        )
+        with track_external("openai"):
+            response = client_ai.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an expert at parsing project timelines. Always return valid JSON only, no markdown or code blocks."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.3,
+                max_tokens=3000,
+            )
         
         ai_content = response.choices[0].message.content.strip()
         
@@ -1,54 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, defaultload, selectinload, undefer_group
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, timedelta
 from database import get_db
-from models import Client, ClientContact, ClientNote, CalendarEvent
-from schemas import Client as ClientSchema, ClientList, ClientCreate, ClientUpdate
+from models import LONG_TEXT, Client, ClientContact, ClientNote, ClientTimeline, CalendarEvent, Contract, ContractMilestone, ScopeOfWork
+from schemas import Client as ClientSchema, ClientList, ClientCreate, ClientUpdate, ClientWorkspace
+from utils.providers import get_openai_client
+from utils.metrics import track_external
+from utils.rate_limiter import booking_rate_limiter
+from utils.http_cache import check_detail, check_list
+from utils.fast_list import ListSerializer, json_response
+from utils.query_cache import cached
 import os
-from collections import defaultdict
 
 router = APIRouter(prefix="/api/clients", tags=["clients"])
 
-# Initialize OpenAI client
-openai_client = None
-try:
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if openai_api_key:
-        from openai import OpenAI
-        openai_client = OpenAI(api_key=openai_api_key)
-        print("✅ OpenAI client initialized successfully")
-    else:
-        print("⚠️  WARNING: OPENAI_API_KEY not found in environment variables")
-except ImportError:
-    print("⚠️  WARNING: OpenAI package not installed. Run: pip install openai")
-    openai_client = None
-except Exception as e:
-    print(f"⚠️  WARNING: Error initializing OpenAI client: {e}")
-    openai_client = None
+CLIENT_LIST = ListSerializer(ClientList)
 
 
 @router.get("/", response_model=List[ClientList])
-def get_clients(skip: int = 0, limit: int = 100, status: str = None, contract_status: str = None, db: Session = Depends(get_db)):
-    """Get all clients with optional filtering, ordered by creation date (newest first)"""
-    query = db.query(Client)
-    
-    if status:
-        query = query.filter(Client.status == status)
-    
-    if contract_status:
-        query = query.filter(Client.contract_status == contract_status)
-    
-    # Order by created_at descending (newest first)
-    clients = query.order_by(Client.created_at.desc()).offset(skip).limit(limit).all()
-    return clients
+def get_clients(request: Request, response: Response, skip: int = 0, limit: int = 100, status: str = None, contract_status: str = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Get all clients with optional filtering, ordered by creation date (newest first)
+
+    - fields: optional comma-separated subset of the response fields (id is always included)
+    """
+    serializer = CLIENT_LIST.select_fields(fields)
+    not_modified = check_list(request, response, db, [Client])
+    if not_modified:
+        return not_modified
+
+    def load() -> bytes:
+        query = select(*serializer.columns(Client))
+        
+        if status:
+            query = query.filter(Client.status == status)
+        
+        if contract_status:
+            query = query.filter(Client.contract_status == contract_status)
+        
+        # Order by created_at descending (newest first)
+        rows = serializer.rows(db.execute(query.order_by(Client.created_at.desc()).offset(skip).limit(limit)))
+        return serializer.dump(rows)
+
+    params = (skip, limit, status, contract_status, tuple(serializer.fields))
+    return json_response(cached(db, "GET /api/clients/", params, [Client], load), response)
 
 
 @router.get("/{client_id}", response_model=ClientSchema)
-def get_client(client_id: int, db: Session = Depends(get_db)):
+def get_client(client_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get a specific client by ID with all relationships"""
-    client = db.query(Client).filter(Client.id == client_id).first()
+    not_modified = check_detail(request, response, db, Client, client_id,
+                                related=[ClientContact, ClientNote, ClientTimeline, Contract, ContractMilestone])
+    if not_modified:
+        return not_modified
+
+    client = db.query(Client).options(undefer_group(LONG_TEXT)).filter(Client.id == client_id).first()
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     return client
@@ -243,12 +252,13 @@ This meeting was scheduled through the Second Life Software booking system.
         }
         
         # Insert event
-        created_event = service.events().insert(
-            calendarId=calendar_id,
-            body=event,
-            conferenceDataVersion=1,
-            sendUpdates='all'  # Send invites to all attendees
-        ).execute()
+        with track_external("google"):
+            created_event = service.events().insert(
+                calendarId=calendar_id,
+                body=event,
+                conferenceDataVersion=1,
+                sendUpdates='all'  # Send invites to all attendees
+            ).execute()
         
         return {
             "message": "Calendar event created successfully",
@@ -296,6 +306,7 @@ class BookCallRequest(BaseModel):
 
 def summarize_project_description(description: str) -> str:
     """Use AI to create a detailed summary of the project description"""
+    openai_client = get_openai_client()
     if not openai_client:
         print("WARNING: OpenAI client not initialized. Check OPENAI_API_KEY in .env file.")
         # Fallback to original description if OpenAI is not available
@@ -306,21 +317,22 @@ def summarize_project_description(description: str) -> str:
     
     try:
         print(f"Calling OpenAI to enhance project description (length: {len(description)} chars)")
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at analyzing and enhancing project descriptions for software development companies. Your task is to take a client's project description and create a clear, detailed, professional, and well-organized summary that:\n\n1. Expands on key requirements and goals\n2. Clarifies technical needs and specifications\n3. Highlights important details that might be missing\n4. Organizes the information in a logical structure\n5. Makes it suitable for a client profile in a CRM system\n\nIMPORTANT: You must enhance and expand the description. Do NOT just return the original text. Add detail, clarity, and structure."
-                },
-                {
-                    "role": "user",
-                    "content": f"Please enhance and expand the following project description. Make it more detailed, clear, and professional. Add structure and clarify any ambiguous points:\n\n{description}\n\nReturn an enhanced version that is more detailed and better organized than the original."
-                }
-            ],
-            temperature=0.7,
-            max_tokens=1500,
-        )
+        with track_external("openai"):
+            response = openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an expert at analyzing and enhancing project descriptions for software development companies. Your task is to take a client's project description and create a clear, detailed, professional, and well-organized summary that:\n\n1. Expands on key requirements and goals\n2. Clarifies technical needs and specifications\n3. Highlights important details that might be missing\n4. Organizes the information in a logical structure\n5. Makes it suitable for a client profile in a CRM system\n\nIMPORTANT: You must enhance and expand the description. Do NOT just return the original text. Add detail, clarity, and structure."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Please enhance and expand the following project description. Make it more detailed, clear, and professional. Add structure and clarify any ambiguous points:\n\n{description}\n\nReturn an enhanced version that is more detailed and better organized than the original."
+                    }
+                ],
+                temperature=0.7,
+                max_tokens=1500,
+            )
         
         enhanced_description = response.choices[0].message.content.strip()
         print(f"AI enhancement successful. Original length: {len(description)}, Enhanced length: {len(enhanced_description)}")
@@ -339,41 +351,12 @@ def summarize_project_description(description: str) -> str:
         return description
 
 
-# Rate limiter for booking requests (prevent spam)
-booking_rate_limiter = defaultdict(list)
-
-def check_booking_rate_limit(identifier: str, max_requests: int = 3, window_minutes: int = 60) -> Tuple[bool, str]:
-    """
-    Check if booking request is within rate limit.
-    identifier: email or IP address
-    max_requests: maximum requests allowed in window
-    window_minutes: time window in minutes
-    Returns: (is_allowed, error_message)
-    """
-    now = datetime.now()
-    window_start = now - timedelta(minutes=window_minutes)
-    
-    # Clean old entries
-    booking_rate_limiter[identifier] = [
-        timestamp for timestamp in booking_rate_limiter[identifier]
-        if timestamp > window_start
-    ]
-    
-    # Check limit
-    if len(booking_rate_limiter[identifier]) >= max_requests:
-        return False, f"Too many booking requests. Please wait {window_minutes} minutes before submitting again."
-    
-    # Add current request
-    booking_rate_limiter[identifier].append(now)
-    return True, ""
-
-
 @router.post("/book-call")
-def book_call(request: BookCallRequest, db: Session = Depends(get_db)):
+def book_call(request: BookCallRequest, http_request: Request, db: Session = Depends(get_db)):
     """Handle booking form submission - creates a client with optional AI-summarized description"""
     try:
         # Check rate limit (by email)
-        is_allowed, error_message = check_booking_rate_limit(request.email, max_requests=3, window_minutes=60)
+        is_allowed, error_message = booking_rate_limiter.check_rate_limit(user_email=request.email, request=http_request)
         if not is_allowed:
             raise HTTPException(status_code=429, detail=error_message)
         
@@ -383,7 +366,7 @@ def book_call(request: BookCallRequest, db: Session = Depends(get_db)):
         # Use AI summarization only if user opted in
         if request.use_ai_summarization:
             print(f"[BOOK-CALL] AI summarization requested. Original description: {request.project_description[:100]}...")
-            if not openai_client:
+            if not get_openai_client():
                 print("[BOOK-CALL] ERROR: OpenAI client not initialized. Check OPENAI_API_KEY in backend/.env")
                 # Still proceed but use original description
                 summarized_description = request.project_description
@@ -510,7 +493,9 @@ def book_call(request: BookCallRequest, db: Session = Depends(get_db)):
             "ai_summarized_description": summarized_description if request.use_ai_summarization else None,
             "original_description": request.project_description
         }
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to process booking request: {str(e)}")
@@ -544,14 +529,15 @@ def sync_calendar_bookings(db: Session = Depends(get_db)):
         
         print(f"[CALENDAR-SYNC] Fetching events from {time_min} to {time_max}")
         
-        events_result = service.events().list(
-            calendarId=calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            maxResults=100,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
+        with track_external("google"):
+            events_result = service.events().list(
+                calendarId=calendar_id,
+                timeMin=time_min,
+                timeMax=time_max,
+                maxResults=100,
+                singleEvents=True,
+                orderBy='startTime'
+            ).execute()
         
         events = events_result.get('items', [])
         print(f"[CALENDAR-SYNC] Found {len(events)} events")
@@ -717,17 +703,8 @@ def get_calendar_events(
     return events
 
 
-@router.get("/{client_id}/upcoming-bookings")
-def get_upcoming_bookings(client_id: int, db: Session = Depends(get_db)):
-    """Check if client has any upcoming calendar bookings"""
-    from datetime import datetime
-    
-    # Verify client exists
-    db_client = db.query(Client).filter(Client.id == client_id).first()
-    if not db_client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    # Get upcoming events for this client
+def _upcoming_bookings(db: Session, client_id: int) -> dict:
+    """Confirmed calendar events for the client that haven't started yet"""
     now = datetime.now()
     upcoming_events = db.query(CalendarEvent).filter(
         CalendarEvent.client_id == client_id,
@@ -749,3 +726,89 @@ def get_upcoming_bookings(client_id: int, db: Session = Depends(get_db)):
         ]
     }
 
+
+@router.get("/{client_id}/upcoming-bookings")
+def get_upcoming_bookings(client_id: int, db: Session = Depends(get_db)):
+    """Check if client has any upcoming calendar bookings"""
+    # Verify client exists
+    db_client = db.query(Client).filter(Client.id == client_id).first()
+    if not db_client:
+        raise HTTPException(status_code=404, detail="Client not found")
+    
+    return _upcoming_bookings(db, client_id)
+
+
+# Workspace sections loaded from Client relationships (one selectinload query each)
+WORKSPACE_RELATIONSHIPS = {
+    "contacts": Client.contacts,
+    "notes": Client.notes,
+    "timeline": Client.timeline_events,
+    "contracts": Client.contracts,
+    "time_entries": Client.time_entries,
+    "expenses": Client.expenses,
+    "documents": Client.documents,
+    "admin_accounts": Client.admin_accounts,
+    "tech_stack": Client.tech_stack,
+    "scopes": Client.scopes,
+}
+WORKSPACE_SECTIONS = list(WORKSPACE_RELATIONSHIPS) + ["upcoming_bookings"]
+
+# Nested collections the section's schema includes
+WORKSPACE_NESTED = {
+    "contracts": Contract.milestones,
+    "scopes": ScopeOfWork.sections,
+}
+
+# Same order as the per-resource endpoints where the relationship has no (or a shorter) order_by
+WORKSPACE_SORT_KEYS = {
+    "contracts": (lambda contract: contract.id, False),
+    "time_entries": (lambda entry: (entry.date, entry.start_time or ""), True),
+    "documents": (lambda document: document.created_at, True),
+    "admin_accounts": (lambda account: account.service_name, False),
+    "tech_stack": (lambda tech: (tech.category is not None, tech.category or "", tech.technology), False),
+    "scopes": (lambda scope: scope.id, False),
+}
+
+
+@router.get("/{client_id}/workspace", response_model=ClientWorkspace, response_model_exclude_unset=True)
+def get_client_workspace(client_id: int, include: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Everything the client page needs in one request: the client plus the
+    sub-resources listed in include (comma-separated, default: all of them)
+
+    Sections: contacts, notes, timeline, contracts, time_entries, expenses,
+    documents, admin_accounts, tech_stack, scopes, upcoming_bookings.
+    Each collection is loaded with one batched selectinload query.
+    """
+    sections = [name.strip() for name in include.split(",") if name.strip()] if include else WORKSPACE_SECTIONS
+    unknown = [name for name in sections if name not in WORKSPACE_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include section(s): {', '.join(unknown)}. Valid: {', '.join(WORKSPACE_SECTIONS)}"
+        )
+
+    options = [undefer_group(LONG_TEXT)]
+    for name in sections:
+        if name in WORKSPACE_RELATIONSHIPS:
+            loader = selectinload(WORKSPACE_RELATIONSHIPS[name])
+            if name in WORKSPACE_NESTED:
+                loader = loader.selectinload(WORKSPACE_NESTED[name])
+            options.append(loader)
+            options.append(defaultload(WORKSPACE_RELATIONSHIPS[name]).undefer_group(LONG_TEXT))
+
+    client = db.query(Client).options(*options).filter(Client.id == client_id).first()
+    if not client:
+        raise HTTPException(status_code=404, detail="Client not found")
+
+    workspace = {"client": client}
+    for name in sections:
+        if name in WORKSPACE_RELATIONSHIPS:
+            items = getattr(client, WORKSPACE_RELATIONSHIPS[name].key)
+            if name in WORKSPACE_SORT_KEYS:
+                key, reverse = WORKSPACE_SORT_KEYS[name]
+                items = sorted(items, key=key, reverse=reverse)
+            workspace[name] = items
+    if "upcoming_bookings" in sections:
+        workspace["upcoming_bookings"] = _upcoming_bookings(db, client_id)
+    return workspace
@@ -1,50 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-import os
 from database import get_db
 from models import DebtAccount, BankConnection, DebtPayment
+from utils.providers import get_openai_client, get_plaid_client
+from utils.metrics import track_external
+from utils.fast_list import ListSerializer, json_response
+from utils.query_cache import cached
 
 router = APIRouter(prefix="/api/debt-tracker", tags=["debt-tracker"])
 
-# Initialize Plaid client
-plaid_client = None
-try:
-    if os.getenv("PLAID_CLIENT_ID") and os.getenv("PLAID_SECRET"):
-        import plaid
-        from plaid.api import plaid_api
-        from plaid.configuration import Configuration
-        from plaid.api_client import ApiClient
-        
-        configuration = Configuration(
-            host=plaid.Environment.sandbox if os.getenv("PLAID_ENV") == "sandbox" else plaid.Environment.development,
-            api_key={
-                'clientId': os.getenv("PLAID_CLIENT_ID"),
-                'secret': os.getenv("PLAID_SECRET")
-            }
-        )
-        api_client = ApiClient(configuration)
-        plaid_client = plaid_api.PlaidApi(api_client)
-except ImportError:
-    plaid_client = None
-except Exception as e:
-    print(f"Error initializing Plaid: {e}")
-    plaid_client = None
-
-# Initialize OpenAI for AI suggestions
-openai_client = None
-try:
-    if os.getenv("OPENAI_API_KEY"):
-        from openai import OpenAI
-        openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except ImportError:
-    openai_client = None
-except Exception as e:
-    print(f"Error initializing OpenAI: {e}")
-    openai_client = None
-
 
 # Request/Response Models
 class ExchangePublicTokenRequest(BaseModel):
@@ -135,6 +104,9 @@ class DebtAccountResponse(BaseModel):
         from_attributes = True
 
 
+DEBT_ACCOUNT_LIST = ListSerializer(DebtAccountResponse)
+
+
 class PaymentCreate(BaseModel):
     payment_amount: float
     payment_type: str = "manual"  # minimum, custom, manual, plaid_sync
@@ -158,6 +130,7 @@ class PaymentResponse(BaseModel):
 @router.get("/link-token")
 def create_link_token(user_id: Optional[str] = None):
     """Create a Plaid Link token for connecting bank accounts."""
+    plaid_client = get_plaid_client()
     if not plaid_client:
         raise HTTPException(
             status_code=503,
@@ -181,7 +154,8 @@ def create_link_token(user_id: Optional[str] = None):
             webhook='https://your-webhook-url.com'
         )
         
-        response = plaid_client.link_token_create(request_body=request_body)
+        with track_external("plaid"):
+            response = plaid_client.link_token_create(request_body=request_body)
         return {
             "link_token": response['link_token'],
             "expiration": response['expiration']
@@ -193,6 +167,7 @@ def create_link_token(user_id: Optional[str] = None):
 @router.post("/exchange-public-token")
 def exchange_public_token(request: ExchangePublicTokenRequest, db: Session = Depends(get_db)):
     """Exchange a public token for an access token and store the bank connection."""
+    plaid_client = get_plaid_client()
     if not plaid_client:
         raise HTTPException(status_code=503, detail="Plaid is not configured.")
     
@@ -201,7 +176,8 @@ def exchange_public_token(request: ExchangePublicTokenRequest, db: Session = Dep
         from plaid.model.accounts_get_request import AccountsGetRequest
         
         exchange_request = ItemPublicTokenExchangeRequest(public_token=request.public_token)
-        exchange_response = plaid_client.item_public_token_exchange(exchange_request)
+        with track_external("plaid"):
+            exchange_response = plaid_client.item_public_token_exchange(exchange_request)
         access_token = exchange_response['access_token']
         item_id = exchange_response['item_id']
         
@@ -217,7 +193,8 @@ def exchange_public_token(request: ExchangePublicTokenRequest, db: Session = Dep
         db.refresh(bank_connection)
         
         accounts_request = AccountsGetRequest(access_token=access_token)
-        accounts_response = plaid_client.accounts_get(accounts_request)
+        with track_external("plaid"):
+            accounts_response = plaid_client.accounts_get(accounts_request)
         
         debt_accounts = []
         for account in accounts_response['accounts']:
@@ -251,103 +228,93 @@ def get_debt_accounts(
     owner: Optional[str] = None, 
     account_type: Optional[str] = None,
     include_paid_off: bool = False,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all debt accounts, optionally filtered by owner and account type"""
-    query = db.query(DebtAccount)
-    
-    if not include_paid_off:
-        query = query.filter(DebtAccount.is_paid_off == False)
-    
-    if owner:
-        query = query.filter(DebtAccount.owner == owner)
-    
-    if account_type:
-        # Support filtering by category
-        if account_type == "credit_cards":
-            query = query.filter(DebtAccount.account_type == "credit_card")
-        elif account_type == "personal_loans":
-            # Personal loans are loans that aren't car or student loans
-            from sqlalchemy import and_, not_, or_
-            query = query.filter(
-                DebtAccount.account_type == "loan",
-                ~DebtAccount.name.ilike("%car%"),
-                ~DebtAccount.name.ilike("%auto%"),
-                ~DebtAccount.name.ilike("%vehicle%"),
-                ~DebtAccount.name.ilike("%student%"),
-                ~DebtAccount.name.ilike("%education%")
-            )
-        elif account_type == "car_loans":
-            query = query.filter(
-                DebtAccount.account_type == "loan",
-                or_(
-                    DebtAccount.name.ilike("%car%"),
-                    DebtAccount.name.ilike("%auto%"),
-                    DebtAccount.name.ilike("%vehicle%")
+    """
+    Get all debt accounts, optionally filtered by owner and account type
+
+    - fields: optional comma-separated subset of the response fields (id is always included)
+    """
+    serializer = DEBT_ACCOUNT_LIST.select_fields(fields)
+
+    def load() -> bytes:
+        query = select(*serializer.columns(DebtAccount))
+        
+        if not include_paid_off:
+            query = query.filter(DebtAccount.is_paid_off == False)
+        
+        if owner:
+            query = query.filter(DebtAccount.owner == owner)
+        
+        if account_type:
+            # Support filtering by category
+            if account_type == "credit_cards":
+                query = query.filter(DebtAccount.account_type == "credit_card")
+            elif account_type == "personal_loans":
+                # Personal loans are loans that aren't car or student loans
+                query = query.filter(
+                    DebtAccount.account_type == "loan",
+                    ~DebtAccount.name.ilike("%car%"),
+                    ~DebtAccount.name.ilike("%auto%"),
+                    ~DebtAccount.name.ilike("%vehicle%"),
+                    ~DebtAccount.name.ilike("%student%"),
+                    ~DebtAccount.name.ilike("%education%")
                 )
-            )
-        elif account_type == "mortgages":
-            query = query.filter(
-                or_(
-                    DebtAccount.account_type == "mortgage",
-                    DebtAccount.name.ilike("%mortgage%"),
-                    DebtAccount.name.ilike("%home loan%")
+            elif account_type == "car_loans":
+                query = query.filter(
+                    DebtAccount.account_type == "loan",
+                    or_(
+                        DebtAccount.name.ilike("%car%"),
+                        DebtAccount.name.ilike("%auto%"),
+                        DebtAccount.name.ilike("%vehicle%")
+                    )
                 )
-            )
-        elif account_type == "student_loans":
-            query = query.filter(
-                or_(
-                    DebtAccount.account_type == "student_loan",
-                    DebtAccount.name.ilike("%student%"),
-                    DebtAccount.name.ilike("%education%"),
-                    DebtAccount.name.ilike("%federal student%")
+            elif account_type == "mortgages":
+                query = query.filter(
+                    or_(
+                        DebtAccount.account_type == "mortgage",
+                        DebtAccount.name.ilike("%mortgage%"),
+                        DebtAccount.name.ilike("%home loan%")
+                    )
                 )
-            )
-        elif account_type == "tax_debt":
-            query = query.filter(
-                or_(
-                    DebtAccount.account_type == "tax",
-                    DebtAccount.name.ilike("%tax%"),
-                    DebtAccount.name.ilike("%irs%")
+            elif account_type == "student_loans":
+                query = query.filter(
+                    or_(
+                        DebtAccount.account_type == "student_loan",
+                        DebtAccount.name.ilike("%student%"),
+                        DebtAccount.name.ilike("%education%"),
+                        DebtAccount.name.ilike("%federal student%")
+                    )
                 )
-            )
-        elif account_type == "business_debt":
-            query = query.filter(
-                or_(
-                    DebtAccount.account_type == "business",
-                    DebtAccount.name.ilike("%business%"),
-                    DebtAccount.name.ilike("%sba%")
+            elif account_type == "tax_debt":
+                query = query.filter(
+                    or_(
+                        DebtAccount.account_type == "tax",
+                        DebtAccount.name.ilike("%tax%"),
+                        DebtAccount.name.ilike("%irs%")
+                    )
                 )
-            )
-        else:
-            query = query.filter(DebtAccount.account_type == account_type)
-    
-    accounts = query.all()
-    # Convert datetime to string for due_date
-    return [
-        DebtAccountResponse(
-            id=acc.id,
-            owner=acc.owner,
-            name=acc.name,
-            account_type=acc.account_type,
-            institution_name=acc.institution_name,
-            original_balance=acc.original_balance,
-            current_balance=acc.current_balance,
-            interest_rate=acc.interest_rate,
-            minimum_payment=acc.minimum_payment,
-            suggested_minimum_payment=acc.suggested_minimum_payment,
-            payment_terms=acc.payment_terms,
-            payment_link=acc.payment_link,
-            monthly_payment=acc.monthly_payment,
-            due_date=acc.due_date.isoformat() if acc.due_date else None,
-            plaid_account_id=acc.plaid_account_id,
-            is_paid_off=acc.is_paid_off,
-            paid_off_date=acc.paid_off_date,
-            created_at=acc.created_at,
-            updated_at=acc.updated_at
-        )
-        for acc in accounts
-    ]
+            elif account_type == "business_debt":
+                query = query.filter(
+                    or_(
+                        DebtAccount.account_type == "business",
+                        DebtAccount.name.ilike("%business%"),
+                        DebtAccount.name.ilike("%sba%")
+                    )
+                )
+            else:
+                query = query.filter(DebtAccount.account_type == account_type)
+        
+        accounts = serializer.rows(db.execute(query))
+        # due_date is sent as an ISO string
+        for account in accounts:
+            if account.get("due_date"):
+                account["due_date"] = account["due_date"].isoformat()
+        return serializer.dump(accounts)
+
+    params = (owner, account_type, include_paid_off, tuple(serializer.fields))
+    return json_response(cached(db, "GET /api/debt-tracker/accounts", params, [DebtAccount], load))
 
 
 @router.get("/accounts/{account_id}", response_model=DebtAccountResponse)
@@ -465,6 +432,7 @@ def sync_account_balance(account_id: int, db: Session = Depends(get_db)):
     if not account.plaid_account_id or not account.bank_connection:
         raise HTTPException(status_code=400, detail="Account is not connected to Plaid")
     
+    plaid_client = get_plaid_client()
     if not plaid_client:
         raise HTTPException(status_code=503, detail="Plaid is not configured")
     
@@ -472,7 +440,8 @@ def sync_account_balance(account_id: int, db: Session = Depends(get_db)):
         from plaid.model.accounts_get_request import AccountsGetRequest
         
         accounts_request = AccountsGetRequest(access_token=account.bank_connection.access_token)
-        accounts_response = plaid_client.accounts_get(accounts_request)
+        with track_external("plaid"):
+            accounts_response = plaid_client.accounts_get(accounts_request)
         
         for plaid_account in accounts_response['accounts']:
             if plaid_account['account_id'] == account.plaid_account_id:
@@ -508,6 +477,7 @@ def sync_account_balance(account_id: int, db: Session = Depends(get_db)):
 @router.post("/ai/suggest-payment-strategy")
 def ai_suggest_payment_strategy(db: Session = Depends(get_db)):
     """Use AI to suggest which debt to pay off first and payment strategy"""
+    openai_client = get_openai_client()
     if not openai_client:
         raise HTTPException(status_code=503, detail="OpenAI is not configured")
     
@@ -558,15 +528,16 @@ Provide a JSON response with:
 Format as valid JSON only."""
 
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a financial advisor. Always respond with valid JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
+        with track_external("openai"):
+            response = openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a financial advisor. Always respond with valid JSON only."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=1000
+            )
         
         import json
         ai_response = json.loads(response.choices[0].message.content)
@@ -586,6 +557,7 @@ Format as valid JSON only."""
 @router.post("/ai/estimate-minimum-payment/{account_id}")
 def ai_estimate_minimum_payment(account_id: int, db: Session = Depends(get_db)):
     """Use AI to estimate minimum payment for an account"""
+    openai_client = get_openai_client()
     if not openai_client:
         raise HTTPException(status_code=503, detail="OpenAI is not configured")
     
@@ -610,15 +582,16 @@ Based on standard practices for {account.account_type} accounts, estimate what t
 Respond with ONLY a number (the estimated minimum payment amount). No text, just the number."""
 
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a financial calculator. Respond with only numbers."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=50
-        )
+        with track_external("openai"):
+            response = openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a financial calculator. Respond with only numbers."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=50
+            )
         
         estimated_payment = float(response.choices[0].message.content.strip().replace('$', '').replace(',', ''))
         
@@ -640,51 +613,54 @@ Respond with ONLY a number (the estimated minimum payment amount). No text, just
 @router.get("/summary")
 def get_debt_summary(db: Session = Depends(get_db)):
     """Get comprehensive debt summary"""
-    accounts = db.query(DebtAccount).filter(DebtAccount.is_paid_off == False).all()
-    
-    total_debt = sum(account.current_balance for account in accounts)
-    total_original = sum(account.original_balance for account in accounts)
-    total_paid = total_original - total_debt
-    
-    # Group accounts by owner dynamically
-    accounts_by_owner = {}
-    debt_by_owner = {}
-    for acc in accounts:
-        if acc.owner not in accounts_by_owner:
-            accounts_by_owner[acc.owner] = []
-            debt_by_owner[acc.owner] = 0
-        accounts_by_owner[acc.owner].append(acc)
-        debt_by_owner[acc.owner] += acc.current_balance
-    
-    total_minimum_payments = sum(acc.minimum_payment or 0 for acc in accounts)
-    total_suggested_minimum = sum(acc.suggested_minimum_payment or acc.minimum_payment or 0 for acc in accounts)
-    
-    return {
-        "total_debt": total_debt,
-        "total_original_debt": total_original,
-        "total_paid_off": total_paid,
-        "debt_by_owner": debt_by_owner,  # Dynamic owner debt breakdown
-        "accounts_by_owner": {owner: len(accs) for owner, accs in accounts_by_owner.items()},
-        "total_minimum_payments": total_minimum_payments,
-        "total_suggested_minimum_payments": total_suggested_minimum,
-        "account_count": len(accounts),
-        "by_institution": {
-            inst: sum(acc.current_balance for acc in accounts if acc.institution_name == inst)
-            for inst in set(acc.institution_name for acc in accounts)
-        },
-        "accounts": [
-            {
-                "id": acc.id,
-                "name": acc.name,
-                "owner": acc.owner,
-                "institution": acc.institution_name,
-                "balance": acc.current_balance,
-                "original_balance": acc.original_balance,
-                "type": acc.account_type,
-                "interest_rate": acc.interest_rate,
-                "minimum_payment": acc.minimum_payment,
-                "suggested_minimum_payment": acc.suggested_minimum_payment
-            }
-            for acc in accounts
-        ]
-    }
+    def load() -> bytes:
+        accounts = db.query(DebtAccount).filter(DebtAccount.is_paid_off == False).all()
+        
+        total_debt = sum(account.current_balance for account in accounts)
+        total_original = sum(account.original_balance for account in accounts)
+        total_paid = total_original - total_debt
+        
+        # Group accounts by owner dynamically
+        accounts_by_owner = {}
+        debt_by_owner = {}
+        for acc in accounts:
+            if acc.owner not in accounts_by_owner:
+                accounts_by_owner[acc.owner] = []
+                debt_by_owner[acc.owner] = 0
+            accounts_by_owner[acc.owner].append(acc)
+            debt_by_owner[acc.owner] += acc.current_balance
+        
+        total_minimum_payments = sum(acc.minimum_payment or 0 for acc in accounts)
+        total_suggested_minimum = sum(acc.suggested_minimum_payment or acc.minimum_payment or 0 for acc in accounts)
+        
+        return JSONResponse({
+            "total_debt": total_debt,
+            "total_original_debt": total_original,
+            "total_paid_off": total_paid,
+            "debt_by_owner": debt_by_owner,  # Dynamic owner debt breakdown
+            "accounts_by_owner": {owner: len(accs) for owner, accs in accounts_by_owner.items()},
+            "total_minimum_payments": total_minimum_payments,
+            "total_suggested_minimum_payments": total_suggested_minimum,
+            "account_count": len(accounts),
+            "by_institution": {
+                inst: sum(acc.current_balance for acc in accounts if acc.institution_name == inst)
+                for inst in set(acc.institution_name for acc in accounts)
+            },
+            "accounts": [
+                {
+                    "id": acc.id,
+                    "name": acc.name,
+                    "owner": acc.owner,
+                    "institution": acc.institution_name,
+                    "balance": acc.current_balance,
+                    "original_balance": acc.original_balance,
+                    "type": acc.account_type,
+                    "interest_rate": acc.interest_rate,
+                    "minimum_payment": acc.minimum_payment,
+                    "suggested_minimum_payment": acc.suggested_minimum_payment
+                }
+                for acc in accounts
+            ]
+        }).body
+
+    return json_response(cached(db, "GET /api/debt-tracker/summary", (), [DebtAccount], load))
@@ -1,11 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from database import get_db
 from models import InvoiceExpense, Client, Invoice
 from schemas import InvoiceExpenseCreate, InvoiceExpenseUpdate, InvoiceExpense as InvoiceExpenseSchema
+from utils.fast_list import ListSerializer, json_response
+from utils.query_cache import cached
 
 router = APIRouter(prefix="/api/expenses", tags=["expenses"])
 
+EXPENSE_LIST = ListSerializer(InvoiceExpenseSchema)
+
 
 @router.get("/", response_model=list[InvoiceExpenseSchema])
 def get_expenses(
@@ -13,22 +19,33 @@ def get_expenses(
     invoice_id: int = None,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all expenses, optionally filtered by client or invoice"""
-    query = db.query(InvoiceExpense)
-    
-    if client_id:
-        query = query.filter(InvoiceExpense.client_id == client_id)
-    if invoice_id:
-        query = query.filter(InvoiceExpense.invoice_id == invoice_id)
-    else:
-        # If no invoice_id specified, show unbilled expenses (invoice_id is None)
-        # This allows filtering for unbilled expenses
-        pass
-    
-    expenses = query.order_by(InvoiceExpense.date.desc()).offset(skip).limit(limit).all()
-    return expenses
+    """
+    Get all expenses, optionally filtered by client or invoice
+
+    - fields: optional comma-separated subset of the response fields (id is always included)
+    """
+    serializer = EXPENSE_LIST.select_fields(fields)
+
+    def load() -> bytes:
+        query = select(*serializer.columns(InvoiceExpense))
+        
+        if client_id:
+            query = query.filter(InvoiceExpense.client_id == client_id)
+        if invoice_id:
+            query = query.filter(InvoiceExpense.invoice_id == invoice_id)
+        else:
+            # If no invoice_id specified, show unbilled expenses (invoice_id is None)
+            # This allows filtering for unbilled expenses
+            pass
+        
+        rows = serializer.rows(db.execute(query.order_by(InvoiceExpense.date.desc()).offset(skip).limit(limit)))
+        return serializer.dump(rows)
+
+    params = (client_id, invoice_id, skip, limit, tuple(serializer.fields))
+    return json_response(cached(db, "GET /api/expenses/", params, [InvoiceExpense], load))
 
 
 @router.get("/{expense_id}", response_model=InvoiceExpenseSchema)
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer_group
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
@@ -9,56 +10,90 @@ import os
 import base64
 from io import StringIO, BytesIO
 from database import get_db
-from models import Invoice, InvoiceItem, InvoiceExpense, Client, Contract
-from schemas import Invoice as InvoiceSchema, InvoiceCreate, InvoiceUpdate, InvoiceGenerateRequest
+from models import LONG_TEXT, Invoice, InvoiceItem, InvoiceExpense, Client, Contract
+from schemas import Invoice as InvoiceSchema, InvoiceCreate, InvoiceUpdate, InvoiceGenerateRequest, InvoiceItem as InvoiceItemSchema, InvoiceExpense as InvoiceExpenseSchema
 from utils.invoice_number import get_next_invoice_number
-from utils.pdf_generator import generate_invoice_pdf
-
-# Initialize Resend email client
-resend_client = None
-try:
-    resend_api_key = os.getenv("RESEND_API_KEY")
-    if resend_api_key:
-        import resend
-        resend.api_key = resend_api_key
-        resend_client = resend
-except ImportError:
-    resend_client = None
-except Exception as e:
-    print(f"⚠️  WARNING: Error initializing Resend client: {e}")
-    resend_client = None
+from utils.providers import get_resend_client
+from utils.metrics import track_external
+from utils.http_cache import check_detail, check_list
+from utils.fast_list import ListSerializer, json_response
+from utils.query_cache import cached
 
 router = APIRouter(prefix="/api/invoices", tags=["invoices"])
 
+INVOICE_LIST = ListSerializer(InvoiceSchema)
+ITEM_LIST = ListSerializer(InvoiceItemSchema)
+EXPENSE_LIST = ListSerializer(InvoiceExpenseSchema)
+
 
 @router.get("/", response_model=List[InvoiceSchema])
-def get_invoices(skip: int = 0, limit: int = 100, client_id: int = None, status: str = None, archived: bool = None, db: Session = Depends(get_db)):
-    """Get all invoices with optional filtering"""
-    query = db.query(Invoice)
-    
-    if client_id:
-        query = query.filter(Invoice.client_id == client_id)
-    if status:
-        query = query.filter(Invoice.status == status)
-    if archived is not None:
-        if archived:
-            query = query.filter(Invoice.status == 'Archived')
-        else:
-            query = query.filter(Invoice.status != 'Archived')
-    
-    invoices = query.order_by(Invoice.issue_date.desc()).offset(skip).limit(limit).all()
-    return invoices
+def get_invoices(request: Request, response: Response, skip: int = 0, limit: int = 100, client_id: int = None, status: str = None, archived: bool = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Get all invoices with optional filtering
+
+    - fields: optional comma-separated subset of the response fields (id is always
+      included); leave out items / expenses to skip loading them
+    """
+    serializer = INVOICE_LIST.select_fields(fields)
+    not_modified = check_list(request, response, db, [Invoice, InvoiceItem, InvoiceExpense])
+    if not_modified:
+        return not_modified
+
+    def load() -> bytes:
+        query = select(*serializer.columns(Invoice))
+        
+        if client_id:
+            query = query.filter(Invoice.client_id == client_id)
+        if status:
+            query = query.filter(Invoice.status == status)
+        if archived is not None:
+            if archived:
+                query = query.filter(Invoice.status == 'Archived')
+            else:
+                query = query.filter(Invoice.status != 'Archived')
+        
+        invoices = serializer.rows(db.execute(query.order_by(Invoice.issue_date.desc()).offset(skip).limit(limit)))
+
+        # Items and expenses of the whole page in one query each (same order as the relationships)
+        by_id = {invoice["id"]: invoice for invoice in invoices}
+        if "items" in serializer.fields:
+            for invoice in invoices:
+                invoice["items"] = []
+            if by_id:
+                items = db.execute(
+                    select(*ITEM_LIST.columns(InvoiceItem)).where(InvoiceItem.invoice_id.in_(by_id))
+                    .order_by(InvoiceItem.date.asc(), InvoiceItem.id)
+                )
+                for item in ITEM_LIST.rows(items):
+                    by_id[item["invoice_id"]]["items"].append(item)
+        if "expenses" in serializer.fields:
+            for invoice in invoices:
+                invoice["expenses"] = []
+            if by_id:
+                expenses = db.execute(
+                    select(*EXPENSE_LIST.columns(InvoiceExpense)).where(InvoiceExpense.invoice_id.in_(by_id))
+                    .order_by(InvoiceExpense.date.asc(), InvoiceExpense.id)
+                )
+                for expense in EXPENSE_LIST.rows(expenses):
+                    by_id[expense["invoice_id"]]["expenses"].append(expense)
+        return serializer.dump(invoices)
+
+    params = (skip, limit, client_id, status, archived, tuple(serializer.fields))
+    return json_response(cached(db, "GET /api/invoices/", params, [Invoice, InvoiceItem, InvoiceExpense], load), response)
 
 
 @router.get("/{invoice_id}", response_model=InvoiceSchema)
-def get_invoice(invoice_id: int, db: Session = Depends(get_db)):
+def get_invoice(invoice_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get a specific invoice by ID with all related items and expenses"""
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    not_modified = check_detail(request, response, db, Invoice, invoice_id, related=[InvoiceItem, InvoiceExpense])
+    if not_modified:
+        return not_modified
+
+    invoice = db.query(Invoice).options(undefer_group(LONG_TEXT)).filter(Invoice.id == invoice_id).first()
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
     # Load related items and expenses
-    from models import InvoiceItem, InvoiceExpense
     invoice.items = db.query(InvoiceItem).filter(
         InvoiceItem.invoice_id == invoice_id
     ).order_by(InvoiceItem.date.asc(), InvoiceItem.start_time.asc()).all()
@@ -307,7 +342,8 @@ def generate_invoice_pdf_endpoint(invoice_id: int, db: Session = Depends(get_db)
         ClientContact.client_id == client.id
     ).order_by(ClientContact.order).all()
     
-    # Generate PDF
+    # Generate PDF (reportlab is imported on first use, not at startup)
+    from utils.pdf_generator import generate_invoice_pdf
     pdf_buffer = generate_invoice_pdf(invoice, client, time_entries, expenses)
     
     # Return PDF as response
@@ -460,12 +496,14 @@ def send_invoice_email(invoice_id: int, request: SendEmailRequest, db: Session =
         ClientContact.client_id == client.id
     ).order_by(ClientContact.order).all()
     
-    # Generate PDF
+    # Generate PDF (reportlab is imported on first use, not at startup)
+    from utils.pdf_generator import generate_invoice_pdf
     pdf_buffer = generate_invoice_pdf(invoice, client, time_entries, expenses)
     pdf_buffer.seek(0)
     pdf_data = pdf_buffer.read()
     
     # Send email using Resend
+    resend_client = get_resend_client()
     if not resend_client:
         raise HTTPException(
             status_code=500,
@@ -542,7 +580,8 @@ def send_invoice_email(invoice_id: int, request: SendEmailRequest, db: Session =
             ],
         }
         
-        email_response = resend_client.Emails.send(params)
+        with track_external("resend"):
+            email_response = resend_client.Emails.send(params)
         
         return {
             "message": f"Invoice {invoice.invoice_number} sent successfully to {request.to_email}",
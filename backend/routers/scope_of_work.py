@@ -1,37 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload, undefer_group
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from pydantic import BaseModel
 import os
 from database import get_db
-from models import ScopeOfWork, ScopeSection, Client
-from schemas import ScopeOfWork as ScopeOfWorkSchema, ScopeOfWorkCreate, ScopeOfWorkUpdate
+from models import LONG_TEXT, ScopeOfWork, ScopeSection, Client
+from schemas import ScopeOfWork as ScopeOfWorkSchema, ScopeOfWorkCreate, ScopeOfWorkUpdate, ScopeSection as ScopeSectionSchema
 from utils.sow_templates import SOW_SECTIONS
-from utils.sow_pdf_generator import generate_sow_pdf
-from utils.rate_limiter import sow_ai_rate_limiter
+from utils.sow_parser import SECTION_TITLES, parse_sow_sections
+from utils.sow_structured import STRUCTURED_OUTPUT_FORMAT, add_usage, generate_structured_sow
+from utils.admin_auth import is_admin_request
+from utils.rate_limiter import sow_ai_rate_limiter, sow_ai_section_rate_limiter
+from utils.providers import get_openai_client
+from utils.metrics import track_external
+from utils.http_cache import check_detail, check_list, check_static
+from utils.fast_list import ListSerializer, json_response
+from utils.query_cache import cached
 
 router = APIRouter(prefix="/api/scope-of-work", tags=["scope-of-work"])
 
+SCOPE_LIST = ListSerializer(ScopeOfWorkSchema)
+SECTION_LIST = ListSerializer(ScopeSectionSchema)
+
+# Fewer sections than this parsed from an AI response means the format wasn't recognized
+MIN_PARSED_SECTIONS = 5
+
+# OpenAI calls in flight at once for one regenerate-sections request
+SOW_AI_SECTION_CONCURRENCY = int(os.getenv("SOW_AI_SECTION_CONCURRENCY", "4"))
+
+SOW_SYSTEM_PROMPT = "You are an expert at writing professional Statements of Work (SOW) for software development projects. Generate comprehensive, legally-sound SOW content based on the provided context."
+
 
 @router.get("/", response_model=List[ScopeOfWorkSchema])
-def get_scopes(skip: int = 0, limit: int = 100, client_id: int = None, status: str = None, db: Session = Depends(get_db)):
-    """Get all scope of work documents with optional filtering"""
-    query = db.query(ScopeOfWork)
-    
-    if client_id:
-        query = query.filter(ScopeOfWork.client_id == client_id)
-    if status:
-        query = query.filter(ScopeOfWork.status == status)
-    
-    scopes = query.offset(skip).limit(limit).all()
-    return scopes
+def get_scopes(request: Request, response: Response, skip: int = 0, limit: int = 100, client_id: int = None, status: str = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Get all scope of work documents with optional filtering
+
+    - fields: optional comma-separated subset of the response fields (id is always
+      included); leave out sections to skip loading them
+    """
+    serializer = SCOPE_LIST.select_fields(fields)
+    not_modified = check_list(request, response, db, [ScopeOfWork, ScopeSection])
+    if not_modified:
+        return not_modified
+
+    def load() -> bytes:
+        query = select(*serializer.columns(ScopeOfWork))
+        
+        if client_id:
+            query = query.filter(ScopeOfWork.client_id == client_id)
+        if status:
+            query = query.filter(ScopeOfWork.status == status)
+        
+        scopes = serializer.rows(db.execute(query.offset(skip).limit(limit)))
+
+        # Sections of the whole page in one query (same order as the relationship)
+        if "sections" in serializer.fields:
+            by_id = {}
+            for scope in scopes:
+                scope["sections"] = []
+                by_id[scope["id"]] = scope
+            if by_id:
+                sections = db.execute(
+                    select(*SECTION_LIST.columns(ScopeSection)).where(ScopeSection.scope_id.in_(by_id))
+                    .order_by(ScopeSection.order, ScopeSection.id)
+                )
+                for section in SECTION_LIST.rows(sections):
+                    by_id[section["scope_id"]]["sections"].append(section)
+        return serializer.dump(scopes)
+
+    params = (skip, limit, client_id, status, tuple(serializer.fields))
+    return json_response(cached(db, "GET /api/scope-of-work/", params, [ScopeOfWork, ScopeSection], load), response)
 
 
 @router.get("/{scope_id}", response_model=ScopeOfWorkSchema)
-def get_scope(scope_id: int, db: Session = Depends(get_db)):
+def get_scope(scope_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get a specific scope of work by ID"""
-    scope = db.query(ScopeOfWork).filter(ScopeOfWork.id == scope_id).first()
+    not_modified = check_detail(request, response, db, ScopeOfWork, scope_id, related=[ScopeSection])
+    if not_modified:
+        return not_modified
+
+    scope = db.query(ScopeOfWork).options(undefer_group(LONG_TEXT)).filter(ScopeOfWork.id == scope_id).first()
     if not scope:
         raise HTTPException(status_code=404, detail="Scope of work not found")
     return scope
@@ -111,27 +164,113 @@ def delete_scope(scope_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/templates/sections")
-def get_sow_section_templates():
+def get_sow_section_templates(request: Request, response: Response):
     """Get all SOW section templates"""
+    not_modified = check_static(request, response, "sow_section_templates", SOW_SECTIONS)
+    if not_modified:
+        return not_modified
     return SOW_SECTIONS
 
 
 @router.get("/ai/rate-limit-status")
-def get_rate_limit_status():
-    """Get current rate limit status for AI SOW generation"""
-    status = sow_ai_rate_limiter.get_status()
+def get_rate_limit_status(http_request: Request, user_email: Optional[str] = None):
+    """Get the caller's current rate limit status for AI SOW generation"""
+    status = sow_ai_rate_limiter.get_status(user_email=user_email, request=http_request)
     return status
 
 
+class AIRegenerateSectionRequest(BaseModel):
+    scope_id: int
+    section_title: str
+
+
+class AIRegenerateSectionsRequest(BaseModel):
+    section_titles: List[str]
+
+
+def build_section_prompt(scope: ScopeOfWork, client_context: dict, existing_sections: list, section_title: str) -> str:
+    """Prompt to regenerate one section of an existing SOW"""
+    return f"""Regenerate ONLY the following section for an existing Statement of Work (SOW):
+
+EXISTING SOW CONTEXT:
+- Title: {scope.title}
+- Start Date: {scope.start_date.strftime('%Y-%m-%d') if scope.start_date else 'Not specified'}
+- End Date: {scope.end_date.strftime('%Y-%m-%d') if scope.end_date else 'Not specified'}
+
+CLIENT INFORMATION:
+- Name: {client_context['name']}
+- Company: {client_context['company']}
+- Project Description: {client_context['description']}
+
+TECHNICAL STACK:
+{chr(10).join(f"- {tech}" for tech in client_context['tech_stack']) if client_context['tech_stack'] else "- Not specified"}
+
+EXISTING SECTIONS (for context):
+{chr(10).join(f"- {s.title}: {(s.content or '')[:200]}..." for s in existing_sections[:5])}
+
+SECTION TO REGENERATE:
+{section_title}
+
+INSTRUCTIONS:
+- Regenerate ONLY the section specified above
+- Use the existing SOW context and client information provided
+- Ensure the regenerated section aligns with the overall SOW structure
+- Make it professional, comprehensive, and legally sound
+
+Return ONLY the content for this section:
+SECTION: {section_title}
+CONTENT: [regenerated content]
+"""
+
+
+def regenerate_section_content(client_ai, section_prompt: str) -> str:
+    """One OpenAI call for a section prompt; returns the content after CONTENT:"""
+    with track_external("openai"):
+        response = client_ai.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert at writing professional Statements of Work (SOW) sections. Regenerate the specified section based on the provided context."
+                },
+                {
+                    "role": "user",
+                    "content": section_prompt
+                }
+            ],
+            temperature=0.7,
+            max_tokens=2000,
+        )
+    
+    ai_content = response.choices[0].message.content
+    lines = ai_content.split('\n')
+    content_lines = []
+    in_content = False
+    
+    for line in lines:
+        if line.startswith('SECTION:'):
+            continue
+        elif line.startswith('CONTENT:'):
+            in_content = True
+            content_line = line.replace('CONTENT:', '').strip()
+            if content_line:
+                content_lines.append(content_line)
+        elif in_content and line.strip():
+            content_lines.append(line)
+    
+    return '\n'.join(content_lines).strip()
+
+
 @router.post("/ai/regenerate-section")
 def regenerate_section_with_ai(
-    request: dict,
+    request: AIRegenerateSectionRequest,
+    http_request: Request,
     db: Session = Depends(get_db),
     user_email: Optional[str] = None
 ):
     """Regenerate a specific section of an existing SOW using AI"""
-    # Check rate limit (admin users bypass)
-    is_allowed, error_message = sow_ai_rate_limiter.check_rate_limit(user_email=user_email)
+    # Check rate limit: one section token (admin users bypass)
+    is_allowed, error_message = sow_ai_section_rate_limiter.check_rate_limit(user_email=user_email, request=http_request)
     if not is_allowed:
         raise HTTPException(status_code=429, detail=error_message)
     
@@ -170,79 +309,13 @@ def regenerate_section_with_ai(
     # Get existing sections for context
     existing_sections = db.query(ScopeSection).filter(ScopeSection.scope_id == request.scope_id).order_by(ScopeSection.order).all()
     
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
+    client_ai = get_openai_client()
+    if not client_ai:
         raise HTTPException(status_code=400, detail="OpenAI API is not configured")
     
     try:
-        from openai import OpenAI
-        client_ai = OpenAI(api_key=openai_api_key)
-        
-        section_prompt = f"""Regenerate ONLY the following section for an existing Statement of Work (SOW):
-
-EXISTING SOW CONTEXT:
-- Title: {scope.title}
-- Start Date: {scope.start_date.strftime('%Y-%m-%d') if scope.start_date else 'Not specified'}
-- End Date: {scope.end_date.strftime('%Y-%m-%d') if scope.end_date else 'Not specified'}
-
-CLIENT INFORMATION:
-- Name: {client_context['name']}
-- Company: {client_context['company']}
-- Project Description: {client_context['description']}
-
-TECHNICAL STACK:
-{chr(10).join(f"- {tech}" for tech in client_context['tech_stack']) if client_context['tech_stack'] else "- Not specified"}
-
-EXISTING SECTIONS (for context):
-{chr(10).join(f"- {s.title}: {s.content[:200]}..." for s in existing_sections[:5])}
-
-SECTION TO REGENERATE:
-{request.section_title}
-
-INSTRUCTIONS:
-- Regenerate ONLY the section specified above
-- Use the existing SOW context and client information provided
-- Ensure the regenerated section aligns with the overall SOW structure
-- Make it professional, comprehensive, and legally sound
-
-Return ONLY the content for this section:
-SECTION: {request.section_title}
-CONTENT: [regenerated content]
-"""
-        
-        response = client_ai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at writing professional Statements of Work (SOW) sections. Regenerate the specified section based on the provided context."
-                },
-                {
-                    "role": "user",
-                    "content": section_prompt
-                }
-            ],
-            temperature=0.7,
-            max_tokens=2000,
-        )
-        
-        ai_content = response.choices[0].message.content
-        lines = ai_content.split('\n')
-        content_lines = []
-        in_content = False
-        
-        for line in lines:
-            if line.startswith('SECTION:'):
-                continue
-            elif line.startswith('CONTENT:'):
-                in_content = True
-                content_line = line.replace('CONTENT:', '').strip()
-                if content_line:
-                    content_lines.append(content_line)
-            elif in_content and line.strip():
-                content_lines.append(line)
-        
-        regenerated_content = '\n'.join(content_lines).strip()
+        section_prompt = build_section_prompt(scope, client_context, existing_sections, request.section_title)
+        regenerated_content = regenerate_section_content(client_ai, section_prompt)
         
         return {
             "section_title": request.section_title,
@@ -257,15 +330,11 @@ CONTENT: [regenerated content]
 @router.post("/{scope_id}/ai/regenerate-full")
 def regenerate_full_sow_with_ai(
     scope_id: int,
+    http_request: Request,
     db: Session = Depends(get_db),
     user_email: Optional[str] = None
 ):
-    """Regenerate the entire SOW for an existing scope using AI"""
-    # Check rate limit (admin users bypass)
-    is_allowed, error_message = sow_ai_rate_limiter.check_rate_limit(user_email=user_email)
-    if not is_allowed:
-        raise HTTPException(status_code=429, detail=error_message)
-    
+    """Regenerate the entire SOW for an existing scope using AI (rate limited by generate_sow_with_ai)"""
     # Get existing SOW
     scope = db.query(ScopeOfWork).filter(ScopeOfWork.id == scope_id).first()
     if not scope:
@@ -288,7 +357,117 @@ def regenerate_full_sow_with_ai(
     )
     
     # Use the existing generation function
-    return generate_sow_with_ai(ai_request, db)
+    return generate_sow_with_ai(ai_request, http_request, db=db, user_email=user_email)
+
+
+def _load_scope_for_regeneration(db: Session, scope_id: int) -> Optional[ScopeOfWork]:
+    """The SOW with its client (incl. description), tech stack and sections, loaded once"""
+    return (
+        db.query(ScopeOfWork)
+        .options(
+            joinedload(ScopeOfWork.client).undefer_group(LONG_TEXT),
+            joinedload(ScopeOfWork.client).selectinload(Client.tech_stack),
+            selectinload(ScopeOfWork.sections),
+        )
+        .filter(ScopeOfWork.id == scope_id)
+        .first()
+    )
+
+
+def _save_regenerated_sections(db: Session, scope: ScopeOfWork, sections: list, contents: list):
+    for section, content in zip(sections, contents):
+        section.content = content
+    scope.updated_at = func.now()
+    ids = [section.id for section in sections]
+    db.commit()
+    # Reload the (expired) sections in one query rather than one per section
+    db.query(ScopeSection).filter(ScopeSection.id.in_(ids)).all()
+
+
+@router.post("/{scope_id}/ai/regenerate-sections")
+async def regenerate_sections_with_ai(
+    scope_id: int,
+    request: AIRegenerateSectionsRequest,
+    http_request: Request,
+    db: Session = Depends(get_db),
+    user_email: Optional[str] = None
+):
+    """
+    Regenerate several sections of an existing SOW using AI
+    
+    The SOW, client and sections are loaded once and shared by every
+    section's prompt; one OpenAI call per section, up to
+    SOW_AI_SECTION_CONCURRENCY at a time, so a few sections take about as
+    long as one. The new content is saved in one commit - or, if any section
+    fails, not at all.
+    
+    Rate Limited: each section takes one token from the section limiter (as
+    /ai/regenerate-section does), so a request can name at most
+    SOW_AI_SECTION_RATE_LIMIT sections (default 8).
+    """
+    titles = list(dict.fromkeys(request.section_titles))  # duplicates dropped
+    if not titles:
+        raise HTTPException(status_code=400, detail="section_titles must not be empty")
+    if len(titles) > sow_ai_section_rate_limiter.capacity and not is_admin_request(http_request):
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {sow_ai_section_rate_limiter.capacity} sections can be regenerated per request"
+        )
+    
+    scope = await run_in_threadpool(_load_scope_for_regeneration, db, scope_id)
+    if not scope:
+        raise HTTPException(status_code=404, detail="Scope of work not found")
+    if not scope.client:
+        raise HTTPException(status_code=404, detail="Client not found")
+    
+    # Requested titles -> the SOW's sections
+    by_title = {section.title: section for section in scope.sections}
+    unknown = [title for title in titles if title not in by_title]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown section(s): {', '.join(unknown)}")
+    
+    client_ai = get_openai_client()
+    if not client_ai:
+        raise HTTPException(status_code=400, detail="OpenAI API is not configured")
+    
+    # Check rate limit once the request can run: one token per OpenAI call (admin users bypass)
+    is_allowed, error_message = sow_ai_section_rate_limiter.check_rate_limit(
+        user_email=user_email, request=http_request, cost=len(titles)
+    )
+    if not is_allowed:
+        raise HTTPException(status_code=429, detail=error_message)
+    
+    client = scope.client
+    client_context = {
+        "name": f"{client.first_name} {client.last_name}",
+        "company": client.company or "",
+        "description": client.description or "",
+        "tech_stack": [f"{t.technology} ({t.category})" for t in client.tech_stack],
+    }
+    existing_sections = list(scope.sections)
+    
+    semaphore = asyncio.Semaphore(max(1, SOW_AI_SECTION_CONCURRENCY))
+    
+    async def regenerate(title: str) -> str:
+        async with semaphore:
+            prompt = build_section_prompt(scope, client_context, existing_sections, title)
+            content = await asyncio.to_thread(regenerate_section_content, client_ai, prompt)
+        if not content:
+            raise ValueError("empty response")
+        return content
+    
+    results = await asyncio.gather(*(regenerate(title) for title in titles), return_exceptions=True)
+    failed = [f"{title} ({result})" for title, result in zip(titles, results) if isinstance(result, Exception)]
+    if failed:
+        raise HTTPException(status_code=500, detail=f"AI regeneration failed for: {'; '.join(failed)}")
+    
+    sections = [by_title[title] for title in titles]
+    await run_in_threadpool(_save_regenerated_sections, db, scope, sections, results)
+    return {
+        "scope_id": scope_id,
+        "sections": [ScopeSectionSchema.model_validate(section) for section in sections],
+        "ai_available": True
+    }
 
 
 @router.get("/{scope_id}/generate-pdf")
@@ -318,7 +497,8 @@ def generate_sow_pdf_endpoint(scope_id: int, db: Session = Depends(get_db)):
         "address": client.address,
     }
     
-    # Generate PDF
+    # Generate PDF (reportlab is imported on first use, not at startup)
+    from utils.sow_pdf_generator import generate_sow_pdf
     pdf_buffer = generate_sow_pdf(scope, client_info, sections)
     
     # Return PDF as response
@@ -388,7 +568,8 @@ def preview_sow_pdf(request: SOWPreviewRequest):
         for section in sorted(request.sections, key=lambda x: x.order)
     ]
     
-    # Generate PDF
+    # Generate PDF (reportlab is imported on first use, not at startup)
+    from utils.sow_pdf_generator import generate_sow_pdf
     pdf_buffer = generate_sow_pdf(temp_scope, client_info, temp_sections)
     
     # Return PDF as response (inline for preview, not attachment)
@@ -417,6 +598,7 @@ class AIGenerateSOWRequest(BaseModel):
 @router.post("/ai/generate-sow")
 def generate_sow_with_ai(
     request: AIGenerateSOWRequest,
+    http_request: Request,
     db: Session = Depends(get_db),
     user_email: Optional[str] = None
 ):
@@ -426,12 +608,16 @@ def generate_sow_with_ai(
     This makes ONE comprehensive API call to OpenAI with all client context.
     No RAG needed - we pass all structured data in the prompt.
     
-    Rate Limited: 3 uses, then 5-minute cooldown
+    SOW_AI_OUTPUT_MODE=structured (default) asks for JSON sections and
+    re-requests only missing or invalid ones (utils/sow_structured.py);
+    "text" asks for SECTION:/CONTENT: blocks (utils/sow_parser.py).
+    
+    Rate Limited: 3 uses per IP (and per user), refilling one every 100 seconds
     
     Returns all 19 sections with AI-generated content.
     """
     # Check rate limit (admin users bypass)
-    is_allowed, error_message = sow_ai_rate_limiter.check_rate_limit(user_email=user_email)
+    is_allowed, error_message = sow_ai_rate_limiter.check_rate_limit(user_email=user_email, request=http_request)
     if not is_allowed:
         raise HTTPException(status_code=429, detail=error_message)
     
@@ -492,10 +678,10 @@ def generate_sow_with_ai(
     # Get max_tokens from environment or use default
     max_tokens = int(os.getenv("SOW_AI_MAX_TOKENS", "8000"))
     
-    # Check if OpenAI is configured
-    openai_api_key = os.getenv("OPENAI_API_KEY")
+    # Check if OpenAI is configured (and installed)
+    client_ai = get_openai_client()
     
-    if not openai_api_key:
+    if not client_ai:
         # Fallback: Use enhanced templates
         result = generate_sow_with_templates(request, client_context, db)
         result["ai_available"] = False
@@ -503,16 +689,18 @@ def generate_sow_with_ai(
         return result
     
     try:
-        # Import OpenAI (will fail if not installed)
-        try:
-            from openai import OpenAI
-        except ImportError:
-            raise HTTPException(
-                status_code=500,
-                detail="OpenAI package not installed. Run: pip install openai"
-            )
-        
-        client_ai = OpenAI(api_key=openai_api_key)
+        # Structured output (default): JSON schema, only missing/invalid sections re-requested
+        if os.getenv("SOW_AI_OUTPUT_MODE", "structured").lower() == "structured":
+            prompt = build_sow_prompt(request, client_context, structured=True)
+            parsed, suggestions, usage = generate_structured_sow(client_ai, SOW_SYSTEM_PROMPT, prompt, max_tokens)
+            sections, suggestions = layout_sections(parsed, suggestions, request)
+            return {
+                "sections": sections,
+                "suggestions": suggestions,
+                "ai_available": True,
+                "ai_usage": usage,
+                "note": "SOW generated using AI. Please review and customize as needed."
+            }
         
         # Build comprehensive prompt
         prompt = build_sow_prompt(request, client_context)
@@ -522,21 +710,22 @@ def generate_sow_with_ai(
         # - "gpt-4o-mini" (recommended): Best balance of quality and cost for SOW generation
         # - "gpt-4o": Premium option for highest quality
         # - "gpt-3.5-turbo": Budget option, fastest
-        response = client_ai.chat.completions.create(
-            model="gpt-4o-mini",  # Recommended: Best balance for SOW generation
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at writing professional Statements of Work (SOW) for software development projects. Generate comprehensive, legally-sound SOW content based on the provided context."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.7,
-            max_tokens=max_tokens,  # Configurable via SOW_AI_MAX_TOKENS env var (default: 8000)
-        )
+        with track_external("openai"):
+            response = client_ai.chat.completions.create(
+                model="gpt-4o-mini",  # Recommended: Best balance for SOW generation
+                messages=[
+                    {
+                        "role": "system",
+                        "content": SOW_SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.7,
+                max_tokens=max_tokens,  # Configurable via SOW_AI_MAX_TOKENS env var (default: 8000)
+            )
         
         # Parse AI response into sections and suggestions
         ai_content = response.choices[0].message.content
@@ -548,6 +737,7 @@ def generate_sow_with_ai(
             "sections": sections,
             "suggestions": suggestions,
             "ai_available": True,
+            "ai_usage": add_usage({}, response),
             "note": "SOW generated using AI. Please review and customize as needed."
         }
         
@@ -561,8 +751,81 @@ def generate_sow_with_ai(
         return result
 
 
-def build_sow_prompt(request: AIGenerateSOWRequest, client_context: dict) -> str:
-    """Build comprehensive prompt for AI to generate all SOW sections"""
+TEXT_OUTPUT_FORMAT = """CRITICAL FORMATTING REQUIREMENTS:
+- You MUST generate ALL 19 sections listed above
+- Each section MUST start with exactly: "SECTION: [section number]. [section title]"
+- Follow immediately with: "CONTENT: [your generated content]"
+- Do NOT use markdown headers (###) in the section titles
+- Do NOT include "SECTION:" or "CONTENT:" markers inside the content itself
+- Generate comprehensive, project-specific content for EVERY section
+- Do NOT skip any sections or use placeholders
+
+Return the content in the following EXACT format (no markdown, no ###):
+SECTION: 1. Executive Summary / Purpose
+CONTENT: [generated content - multiple paragraphs as needed]
+
+SECTION: 2. Definitions & Terminology
+CONTENT: [generated content - multiple paragraphs as needed]
+
+SECTION: 3. Scope of Work (Core Section)
+CONTENT: [generated content - include In-Scope and Out-of-Scope subsections]
+
+SECTION: 4. Deliverables
+CONTENT: [generated content]
+
+SECTION: 5. Milestones & Timeline
+CONTENT: [generated content with specific milestones]
+
+SECTION: 6. Technical Architecture
+CONTENT: [generated content - MUST include tech stack details]
+
+SECTION: 7. Roles & Responsibilities
+CONTENT: [generated content - MUST include client and vendor responsibilities]
+
+SECTION: 8. Acceptance Criteria & Review Process
+CONTENT: [generated content - MUST include acceptance criteria and review process]
+
+SECTION: 9. Change Management
+CONTENT: [generated content - MUST include change request process]
+
+SECTION: 10. Pricing & Payment Terms
+CONTENT: [generated content - MUST include budget and payment schedule]
+
+SECTION: 11. IP Ownership & Licensing
+CONTENT: [generated content - MUST include IP ownership details]
+
+SECTION: 12. Confidentiality & Data Handling
+CONTENT: [generated content - MUST include confidentiality terms]
+
+SECTION: 13. Security & Compliance
+CONTENT: [generated content - MUST include security requirements]
+
+SECTION: 14. Testing & QA
+CONTENT: [generated content - MUST include testing requirements]
+
+SECTION: 15. Deployment & Handoff
+CONTENT: [generated content - MUST include deployment and handoff process]
+
+SECTION: 16. Support, Maintenance & Warranty
+CONTENT: [generated content - MUST include warranty and support terms]
+
+SECTION: 17. Assumptions & Constraints
+CONTENT: [generated content - MUST include assumptions and constraints]
+
+SECTION: 18. Termination & Exit
+CONTENT: [generated content - MUST include termination terms]
+
+SECTION: 19. Legal Boilerplate (Often Referenced)
+CONTENT: [generated content - MUST include legal terms]
+
+SUGGESTIONS:
+[Provide suggestions for improvements, missing information, potential issues, or recommendations based on the client context and project details]
+"""
+
+
+def build_sow_prompt(request: AIGenerateSOWRequest, client_context: dict, structured: bool = False) -> str:
+    """Build comprehensive prompt for AI to generate all SOW sections (as JSON if structured)"""
+    output_format = STRUCTURED_OUTPUT_FORMAT if structured else TEXT_OUTPUT_FORMAT
     
     # Determine pricing structure
     pricing_type = request.pricing_type.lower() if request.pricing_type else "milestones"
@@ -850,283 +1113,40 @@ ALL SECTIONS:
 - Use budget, timeline, dates, and all provided context to inform content
 - After generating all sections, provide SUGGESTIONS for improvements, missing information, or potential issues
 
-CRITICAL FORMATTING REQUIREMENTS:
-- You MUST generate ALL 19 sections listed above
-- Each section MUST start with exactly: "SECTION: [section number]. [section title]"
-- Follow immediately with: "CONTENT: [your generated content]"
-- Do NOT use markdown headers (###) in the section titles
-- Do NOT include "SECTION:" or "CONTENT:" markers inside the content itself
-- Generate comprehensive, project-specific content for EVERY section
-- Do NOT skip any sections or use placeholders
-
-Return the content in the following EXACT format (no markdown, no ###):
-SECTION: 1. Executive Summary / Purpose
-CONTENT: [generated content - multiple paragraphs as needed]
-
-SECTION: 2. Definitions & Terminology
-CONTENT: [generated content - multiple paragraphs as needed]
-
-SECTION: 3. Scope of Work (Core Section)
-CONTENT: [generated content - include In-Scope and Out-of-Scope subsections]
-
-SECTION: 4. Deliverables
-CONTENT: [generated content]
-
-SECTION: 5. Milestones & Timeline
-CONTENT: [generated content with specific milestones]
-
-SECTION: 6. Technical Architecture
-CONTENT: [generated content - MUST include tech stack details]
-
-SECTION: 7. Roles & Responsibilities
-CONTENT: [generated content - MUST include client and vendor responsibilities]
-
-SECTION: 8. Acceptance Criteria & Review Process
-CONTENT: [generated content - MUST include acceptance criteria and review process]
-
-SECTION: 9. Change Management
-CONTENT: [generated content - MUST include change request process]
-
-SECTION: 10. Pricing & Payment Terms
-CONTENT: [generated content - MUST include budget and payment schedule]
-
-SECTION: 11. IP Ownership & Licensing
-CONTENT: [generated content - MUST include IP ownership details]
-
-SECTION: 12. Confidentiality & Data Handling
-CONTENT: [generated content - MUST include confidentiality terms]
-
-SECTION: 13. Security & Compliance
-CONTENT: [generated content - MUST include security requirements]
-
-SECTION: 14. Testing & QA
-CONTENT: [generated content - MUST include testing requirements]
-
-SECTION: 15. Deployment & Handoff
-CONTENT: [generated content - MUST include deployment and handoff process]
-
-SECTION: 16. Support, Maintenance & Warranty
-CONTENT: [generated content - MUST include warranty and support terms]
-
-SECTION: 17. Assumptions & Constraints
-CONTENT: [generated content - MUST include assumptions and constraints]
-
-SECTION: 18. Termination & Exit
-CONTENT: [generated content - MUST include termination terms]
-
-SECTION: 19. Legal Boilerplate (Often Referenced)
-CONTENT: [generated content - MUST include legal terms]
-
-SUGGESTIONS:
-[Provide suggestions for improvements, missing information, potential issues, or recommendations based on the client context and project details]
-"""
+{output_format}"""
     return prompt
 
 
 def parse_ai_response_to_sections(ai_content: str, request: AIGenerateSOWRequest) -> tuple:
-    """Parse AI response into structured sections and suggestions"""
-    sections = []
-    suggestions = []
-    current_section = None
-    current_content = []
-    in_suggestions = False
-    
-    lines = ai_content.split('\n')
-    
-    # Expected section titles (for matching)
-    expected_sections = [
-        "1. Executive Summary / Purpose",
-        "2. Definitions & Terminology",
-        "3. Scope of Work (Core Section)",
-        "4. Deliverables",
-        "5. Milestones & Timeline",
-        "6. Technical Architecture",
-        "7. Roles & Responsibilities",
-        "8. Acceptance Criteria & Review Process",
-        "9. Change Management",
-        "10. Pricing & Payment Terms",
-        "11. IP Ownership & Licensing",
-        "12. Confidentiality & Data Handling",
-        "13. Security & Compliance",
-        "14. Testing & QA",
-        "15. Deployment & Handoff",
-        "16. Support, Maintenance & Warranty",
-        "17. Assumptions & Constraints",
-        "18. Termination & Exit",
-        "19. Legal Boilerplate (Often Referenced)",
-    ]
-    
-    for line in lines:
-        line_stripped = line.strip()
-        line_upper = line_stripped.upper()
-        
-        # Check for suggestions section
-        if 'SUGGESTIONS' in line_upper and ':' in line:
-            in_suggestions = True
-            continue
-        elif in_suggestions:
-            if line_stripped:
-                suggestions.append(line_stripped)
-            continue
-        
-        # Check for section header - more flexible matching
-        section_found = False
-        # Handle ### SECTION: format (markdown headers)
-        if line_stripped.startswith('### SECTION:') or line_stripped.startswith('## SECTION:'):
-            # Markdown format: ### SECTION: 1. Title
-            section_text = line_stripped.replace('### SECTION:', '').replace('## SECTION:', '').replace('SECTION:', '').strip()
-            section_found = True
-        elif line_stripped.startswith('SECTION:'):
-            # Standard format: SECTION: 1. Title
-            section_text = line_stripped.replace('SECTION:', '').strip()
-            section_found = True
-        elif line_stripped.startswith('###') and any(exp in line_stripped for exp in expected_sections):
-            # Markdown format: ### 6. Technical Architecture
-            section_text = line_stripped.replace('###', '').strip()
-            section_found = True
-        elif any(line_stripped.startswith(exp) for exp in expected_sections):
-            # Direct section title match
-            section_text = line_stripped
-            section_found = True
-        elif line_stripped and any(exp in line_stripped for exp in expected_sections):
-            # Partial match - find the matching section
-            for exp in expected_sections:
-                if exp in line_stripped:
-                    section_text = exp
-                    section_found = True
-                    break
-        
-        if section_found:
-            # Save previous section
-            if current_section and current_content:
-                # Clean up previous section title
-                cleaned_prev_title = current_section
-                if cleaned_prev_title.startswith('###'):
-                    cleaned_prev_title = cleaned_prev_title.replace('###', '').strip()
-                if cleaned_prev_title.startswith('##'):
-                    cleaned_prev_title = cleaned_prev_title.replace('##', '').strip()
-                if cleaned_prev_title.startswith('SECTION:'):
-                    cleaned_prev_title = cleaned_prev_title.replace('SECTION:', '').strip()
-                
-                # Clean up content
-                cleaned_prev_content = []
-                for line in current_content:
-                    line_stripped = line.strip()
-                    if line_stripped in ['SECTION:', 'CONTENT:'] or line_stripped.startswith('### SECTION:') or line_stripped.startswith('## SECTION:'):
-                        continue
-                    if line_stripped.startswith('SECTION: ') and len(line_stripped) > 10:
-                        cleaned_prev_content.append(line.replace('SECTION: ', ''))
-                    elif line_stripped.startswith('CONTENT: ') and len(line_stripped) > 10:
-                        cleaned_prev_content.append(line.replace('CONTENT: ', ''))
-                    else:
-                        cleaned_prev_content.append(line)
-                
-                sections.append({
-                    "title": cleaned_prev_title,
-                    "content": '\n'.join(cleaned_prev_content).strip(),
-                    "order": len(sections) + 1
-                })
-            # Start new section
-            current_section = section_text
-            current_content = []
-            continue
-        
-        # Check for content marker
-        if line_stripped.startswith('CONTENT:'):
-            content_line = line_stripped.replace('CONTENT:', '').strip()
-            if content_line:
-                current_content.append(content_line)
-            continue
-        
-        # Skip lines that look like section headers in content (clean up)
-        if current_section and (line_stripped.startswith('### SECTION:') or line_stripped.startswith('## SECTION:') or 
-                               (line_stripped.startswith('SECTION:') and not line_stripped.startswith('SECTION: '))):
-            continue
-        
-        # Continue content if we're in a section
-        if current_section:
-            # Skip empty lines only if we haven't started content yet
-            if line_stripped or current_content:
-                # Clean up any remaining SECTION: or CONTENT: markers in content
-                cleaned_line = line
-                if line_stripped.startswith('SECTION:') and 'CONTENT:' not in line:
-                    continue  # Skip standalone SECTION: lines in content
-                current_content.append(cleaned_line)
-    
-    # Save last section
-    if current_section and current_content:
-        # Clean up content - remove any SECTION: or CONTENT: markers that might be in the content
-        cleaned_content = []
-        for line in current_content:
-            line_stripped = line.strip()
-            # Skip lines that are just markers
-            if line_stripped in ['SECTION:', 'CONTENT:'] or line_stripped.startswith('### SECTION:') or line_stripped.startswith('## SECTION:'):
-                continue
-            # Remove SECTION: or CONTENT: prefixes if they appear in the middle of content
-            if line_stripped.startswith('SECTION: ') and len(line_stripped) > 10:
-                cleaned_content.append(line.replace('SECTION: ', ''))
-            elif line_stripped.startswith('CONTENT: ') and len(line_stripped) > 10:
-                cleaned_content.append(line.replace('CONTENT: ', ''))
-            else:
-                cleaned_content.append(line)
-        
-        # Clean up section title - remove any markdown formatting
-        cleaned_title = current_section
-        if cleaned_title.startswith('###'):
-            cleaned_title = cleaned_title.replace('###', '').strip()
-        if cleaned_title.startswith('##'):
-            cleaned_title = cleaned_title.replace('##', '').strip()
-        # Remove SECTION: prefix if it somehow got into the title
-        if cleaned_title.startswith('SECTION:'):
-            cleaned_title = cleaned_title.replace('SECTION:', '').strip()
-        
-        # Final cleanup of content - remove any remaining markers
-        final_content = '\n'.join(cleaned_content).strip()
-        # Remove any SECTION: or CONTENT: lines that might be in the middle
-        final_lines = []
-        for line in final_content.split('\n'):
-            line_stripped = line.strip()
-            # Skip lines that are just markers
-            if line_stripped in ['SECTION:', 'CONTENT:', '### SECTION:', '## SECTION:']:
-                continue
-            # Remove SECTION: or CONTENT: prefixes if they appear
-            if line_stripped.startswith('SECTION: '):
-                final_lines.append(line.replace('SECTION: ', ''))
-            elif line_stripped.startswith('CONTENT: '):
-                final_lines.append(line.replace('CONTENT: ', ''))
-            elif line_stripped.startswith('### SECTION: '):
-                final_lines.append(line.replace('### SECTION: ', ''))
-            elif line_stripped.startswith('## SECTION: '):
-                final_lines.append(line.replace('## SECTION: ', ''))
-            else:
-                final_lines.append(line)
-        
-        sections.append({
-            "title": cleaned_title,
-            "content": '\n'.join(final_lines).strip(),
-            "order": len(sections) + 1
-        })
+    """Parse AI response into structured sections and suggestions (utils/sow_parser.py)"""
+    parsed, suggestions = parse_sow_sections(ai_content)
+    if sum(1 for title in SECTION_TITLES if title in parsed) < MIN_PARSED_SECTIONS:
+        print(f"First 500 chars of AI response: {ai_content[:500]}")
+    return layout_sections(parsed, suggestions, request)
+
+
+def layout_sections(parsed: dict, suggestions: list, request: AIGenerateSOWRequest) -> tuple:
+    """The SOW sections in order from AI content by title, with templates for missing ones"""
+    found = [title for title in SECTION_TITLES if title in parsed]
     
-    # If we got some sections but not all, that's okay - return what we have
     # Only fallback to templates if we got very few sections (likely parsing failure)
-    if len(sections) < 5:
-        print(f"Warning: Only parsed {len(sections)} sections from AI response. Falling back to templates.")
-        print(f"First 500 chars of AI response: {ai_content[:500]}")
+    if len(found) < MIN_PARSED_SECTIONS:
+        print(f"Warning: Only got {len(found)} sections from AI response. Falling back to templates.")
         template_result = generate_sow_with_templates(request, {}, None)["sections"]
         return template_result, []
     
     # If we have sections but not all 19, pad with templates for missing ones
-    if len(sections) < 19:
-        print(f"Warning: Parsed {len(sections)} sections, expected 19. Some sections may be missing.")
-        # Get template sections to fill in gaps
-        template_sections = generate_sow_with_templates(request, {}, None)["sections"]
-        existing_titles = {s["title"] for s in sections}
-        
-        # Add missing sections from templates
-        for template_section in template_sections:
-            if template_section["title"] not in existing_titles:
-                sections.append(template_section)
+    templates = {}
+    if len(found) < len(SECTION_TITLES):
+        print(f"Warning: Got {len(found)} sections, expected {len(SECTION_TITLES)}. Missing sections use templates.")
+        templates = {section["title"]: section["content"] for section in generate_sow_with_templates(request, {}, None)["sections"]}
     
+    # Sections in SOW order, then any extra sections the AI added
+    titles = SECTION_TITLES + [title for title in parsed if title not in SECTION_TITLES]
+    sections = [
+        {"title": title, "content": parsed[title] if title in parsed else templates[title], "order": order}
+        for order, title in enumerate(titles, start=1)
+    ]
     return sections, suggestions
 
 
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from database import get_db
+from schemas import SearchResult
+from utils import crm_search
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("/", response_model=List[SearchResult])
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = None,
+    client_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Search clients, contacts, notes and timeline events in one query
+    
+    - Every word is prefix-matched ("acm" finds "Acme"), misspelled words are
+      matched against the closest indexed spellings
+    - types: optional comma-separated filter (client, contact, note, timeline)
+    - client_id: optionally scope results to one client
+    """
+    type_list = None
+    if types:
+        type_list = [t.strip() for t in types.split(",") if t.strip()]
+        invalid = [t for t in type_list if t not in crm_search.ENTITY_CODES]
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid type(s): {', '.join(invalid)}. Use: {', '.join(crm_search.ENTITY_CODES)}"
+            )
+    
+    return crm_search.search(db, q, types=type_list, client_id=client_id, limit=limit)
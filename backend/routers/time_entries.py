@@ -3,26 +3,14 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
-import os
 from database import get_db
 from models import InvoiceItem, Client
 from schemas import InvoiceItem as InvoiceItemSchema, InvoiceItemCreate, InvoiceItemUpdate
+from utils.providers import get_openai_client
+from utils.metrics import track_external
 
 router = APIRouter(prefix="/api/time-entries", tags=["time-entries"])
 
-# Initialize OpenAI client for description enhancement
-openai_client = None
-try:
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if openai_api_key:
-        from openai import OpenAI
-        openai_client = OpenAI(api_key=openai_api_key)
-except ImportError:
-    openai_client = None
-except Exception as e:
-    print(f"⚠️  WARNING: Error initializing OpenAI client: {e}")
-    openai_client = None
-
 
 class DescriptionEnhancementRequest(BaseModel):
     description: str
@@ -189,26 +177,28 @@ def enhance_description(request: DescriptionEnhancementRequest):
     if not request.description or not request.description.strip():
         raise HTTPException(status_code=400, detail="Description is required")
     
+    openai_client = get_openai_client()
     if not openai_client:
         # Return original if OpenAI is not configured
         return DescriptionEnhancementResponse(enhanced_description=request.description)
     
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a professional time entry description editor. Your task is to improve time entry descriptions to be clear, concise, professional, and exactly 30 words or less. Fix grammar, improve clarity, and ensure professional formatting. Return ONLY the enhanced description, nothing else."
-                },
-                {
-                    "role": "user",
-                    "content": f"Enhance this time entry description to be professional, clear, and exactly 30 words or less:\n\n{request.description}"
-                }
-            ],
-            max_tokens=100,
-            temperature=0.3,
-        )
+        with track_external("openai"):
+            response = openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a professional time entry description editor. Your task is to improve time entry descriptions to be clear, concise, professional, and exactly 30 words or less. Fix grammar, improve clarity, and ensure professional formatting. Return ONLY the enhanced description, nothing else."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Enhance this time entry description to be professional, clear, and exactly 30 words or less:\n\n{request.description}"
+                    }
+                ],
+                max_tokens=100,
+                temperature=0.3,
+            )
         
         enhanced = response.choices[0].message.content.strip()
         
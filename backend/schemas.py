@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Union
 from datetime import datetime
 
 
@@ -481,6 +481,7 @@ class ClientDocumentBase(BaseModel):
     file_path: str
     file_type: Optional[str] = None
     file_size: Optional[int] = None
+    file_hash: Optional[str] = None  # SHA-256 hex digest
     document_type: str = "Other"  # SOW, Contract, Other
     uploaded_by: Optional[str] = None
 
@@ -505,6 +506,17 @@ class ClientDocument(ClientDocumentBase):
         from_attributes = True
 
 
+class ClientDocumentSearchResult(BaseModel):
+    document_id: int
+    client_id: int
+    title: str
+    file_name: str
+    file_type: Optional[str] = None
+    document_type: Optional[str] = None
+    snippet: Optional[str] = None  # Matched text with hits wrapped in <mark></mark>
+    rank: float  # Higher is more relevant
+
+
 # Client Admin Account Schemas
 class ClientAdminAccountBase(BaseModel):
     service_name: str
@@ -573,3 +585,65 @@ class ClientTechStack(ClientTechStackBase):
 # Password Reveal Request
 class PasswordRevealRequest(BaseModel):
     user_password: str  # Admin's password for authentication
+
+
+# Unified CRM Search Schemas
+class SearchResult(BaseModel):
+    type: str  # client, contact, note, timeline
+    id: int
+    client_id: int
+    client_name: Optional[str] = None
+    title: str
+    snippet: Optional[str] = None  # Matched text with hits wrapped in <mark></mark>
+    rank: float  # Higher is more relevant
+
+
+# Client Workspace Schemas (GET /api/clients/{id}/workspace)
+class UpcomingBooking(BaseModel):
+    id: int
+    title: Optional[str] = None
+    start_time: str  # ISO format datetime
+    end_time: str  # ISO format datetime
+    hangout_link: Optional[str] = None
+
+
+class UpcomingBookings(BaseModel):
+    has_upcoming_bookings: bool
+    upcoming_events: List[UpcomingBooking] = []
+
+
+class ClientWorkspace(BaseModel):
+    """The client plus the sub-resources named in ?include= (the others are left out)"""
+    client: ClientList
+    contacts: List[ClientContact] = []
+    notes: List[ClientNote] = []
+    timeline: List[ClientTimeline] = []
+    contracts: List[Contract] = []
+    time_entries: List[InvoiceItem] = []
+    expenses: List[InvoiceExpense] = []
+    documents: List[ClientDocument] = []
+    admin_accounts: List[ClientAdminAccount] = []
+    tech_stack: List[ClientTechStack] = []
+    scopes: List[ScopeOfWork] = []
+    upcoming_bookings: Optional[UpcomingBookings] = None
+
+
+# Batch Schemas (POST /api/batch)
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None  # Echoed back in the result, for matching results to requests
+    method: str = "GET"
+    path: str  # e.g. /api/clients/12
+    query: Optional[Union[str, Dict[str, Any]]] = None  # "a=1&b=2" or {"a": 1, "b": [2, 3]}
+    body: Optional[Any] = None  # JSON body for POST / PUT / PATCH
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
+
+
+class BatchResult(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None  # Parsed JSON, text, or None for empty responses
+    body_base64: Optional[str] = None  # Binary responses (PDFs, files)
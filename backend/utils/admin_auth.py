@@ -0,0 +1,27 @@
+"""
+Admin API authentication
+
+The API has no user sessions (the frontend signs users in with Firebase, but
+requests carry no verified identity), so a `user_email` query parameter can't
+gate anything. Admin-only operations require the shared secret ADMIN_API_TOKEN
+in an X-Admin-Token header instead; while it is unset, nothing is treated as
+admin.
+"""
+import hmac
+import os
+from typing import Optional
+
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Constant-time check of a presented token against ADMIN_API_TOKEN"""
+    if not ADMIN_API_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_API_TOKEN.encode())
+
+
+def is_admin_request(request) -> bool:
+    """Whether a Starlette request carries the admin token"""
+    return request is not None and is_admin_token(request.headers.get(ADMIN_TOKEN_HEADER))
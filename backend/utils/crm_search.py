@@ -0,0 +1,340 @@
+"""
+Unified CRM search index over clients, contacts, notes and timeline events
+
+- SQLite: FTS5 table crm_search_fts (rowid encodes entity type + id) with prefix
+  indexes, plus an fts5vocab view used for typo-tolerant term correction
+- PostgreSQL: crm_search_index table with a generated tsvector (GIN) and a
+  pg_trgm index on titles for fuzzy matching
+
+The index is kept up to date by an after_flush hook on SessionLocal, so any
+router (or script) that writes these models through the ORM updates it in the
+same transaction. The structures are created (and first filled) by a schema
+migration. Writers that bypass the ORM (bulk Core inserts such as
+benchmarks/synthetic_data.py, raw SQL imports) must call init_crm_search()
+afterwards; nothing rebuilds the index at startup.
+"""
+import re
+from typing import Dict, List, Optional
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session, undefer_group
+from database import engine, SessionLocal
+from models import LONG_TEXT, Client, ClientContact, ClientNote, ClientTimeline
+from utils.search_snippets import MATCH_END, MATCH_START, render_snippet
+
+IS_POSTGRES = engine.dialect.name == "postgresql"
+
+# Entity type name -> small integer code (SQLite rowid = entity_id * 4 + code)
+ENTITY_CODES = {"client": 0, "contact": 1, "note": 2, "timeline": 3}
+MODEL_TYPES = {Client: "client", ClientContact: "contact", ClientNote: "note", ClientTimeline: "timeline"}
+
+# Whether pg_trgm is available for fuzzy title matching (checked on first search)
+PG_TRGM_AVAILABLE = None
+
+# Longest edit distance we accept when correcting a misspelled query term
+MAX_TYPO_DISTANCE = 2
+
+
+def _digits(value: Optional[str]) -> str:
+    return re.sub(r"\D", "", value or "")
+
+
+def _join(*parts) -> str:
+    return "\n".join(str(part) for part in parts if part)
+
+
+def build_document(entity_type: str, obj) -> dict:
+    """Flatten a model instance into the (title, body) text that gets indexed"""
+    if entity_type == "client":
+        client_id = obj.id
+        title = _join(f"{obj.first_name} {obj.last_name}", obj.company).replace("\n", " — ")
+        body = _join(obj.email, obj.company, obj.status, obj.contract_status, obj.address,
+                     obj.description, obj.notes_from_last_meeting, obj.timeline)
+    elif entity_type == "contact":
+        client_id = obj.client_id
+        title = obj.name
+        # Index phone digits too, so "5551234567" finds "(555) 123-4567"
+        body = _join(obj.email, obj.phone, _digits(obj.phone), obj.title, obj.notes)
+    elif entity_type == "note":
+        client_id = obj.client_id
+        title = obj.title or f"{obj.note_type or 'General'} note"
+        body = _join(obj.note_type, obj.content, obj.created_by)
+    else:
+        client_id = obj.client_id
+        title = obj.title
+        body = _join(obj.event_type, obj.description, obj.next_steps)
+    return {
+        "entity_type": entity_type,
+        "entity_id": obj.id,
+        "client_id": client_id,
+        "title": title or "",
+        "body": body,
+    }
+
+
+def _rowid(entity_type: str, entity_id: int) -> int:
+    return entity_id * 4 + ENTITY_CODES[entity_type]
+
+
+def create_crm_search_tables(conn):
+    """Create the index structures if they don't exist (idempotent)"""
+    trgm_available = False
+    if IS_POSTGRES:
+        try:
+            # Savepoint, so a missing extension doesn't abort the caller's transaction
+            with conn.begin_nested():
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            trgm_available = True
+        except Exception as e:
+            print(f"⚠️  WARNING: Could not enable pg_trgm ({e}); fuzzy CRM search disabled")
+
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS crm_search_index (
+                entity_type VARCHAR(20) NOT NULL,
+                entity_id INTEGER NOT NULL,
+                client_id INTEGER NOT NULL,
+                title TEXT NOT NULL DEFAULT '',
+                body TEXT NOT NULL DEFAULT '',
+                search_vector TSVECTOR GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', title), 'A') ||
+                    setweight(to_tsvector('simple', body), 'B')
+                ) STORED,
+                PRIMARY KEY (entity_type, entity_id)
+            )
+        """))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_crm_search_index_vector ON crm_search_index USING GIN (search_vector)"
+        ))
+        if trgm_available:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_crm_search_index_title_trgm "
+                "ON crm_search_index USING GIN (lower(title) gin_trgm_ops)"
+            ))
+    else:
+        conn.execute(text("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS crm_search_fts USING fts5(
+                title,
+                body,
+                entity_type UNINDEXED,
+                entity_id UNINDEXED,
+                client_id UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        """))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS crm_search_vocab USING fts5vocab(crm_search_fts, 'row')"
+        ))
+
+
+def init_crm_search():
+    """
+    Create the index structures if needed and rebuild the index if its row count
+    no longer matches the indexed tables. Not run at startup: call it after
+    writing these tables without the ORM (the after_flush hook doesn't see that).
+    """
+    with engine.begin() as conn:
+        create_crm_search_tables(conn)
+
+    db = SessionLocal()
+    try:
+        index_table = "crm_search_index" if IS_POSTGRES else "crm_search_fts"
+        indexed = db.execute(text(f"SELECT COUNT(*) FROM {index_table}")).scalar()
+        expected = sum(db.query(model).count() for model in MODEL_TYPES)
+        if indexed != expected:
+            rebuilt = rebuild_crm_index(db)
+            print(f"✅ CRM search index rebuilt ({rebuilt} records)")
+    finally:
+        db.close()
+
+
+def _pg_trgm_available(db: Session) -> bool:
+    global PG_TRGM_AVAILABLE
+    if PG_TRGM_AVAILABLE is None:
+        PG_TRGM_AVAILABLE = db.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first() is not None
+    return PG_TRGM_AVAILABLE
+
+
+def _upsert(conn, doc: dict):
+    if IS_POSTGRES:
+        conn.execute(text("""
+            INSERT INTO crm_search_index (entity_type, entity_id, client_id, title, body)
+            VALUES (:entity_type, :entity_id, :client_id, :title, :body)
+            ON CONFLICT (entity_type, entity_id) DO UPDATE
+            SET client_id = EXCLUDED.client_id, title = EXCLUDED.title, body = EXCLUDED.body
+        """), doc)
+    else:
+        params = {**doc, "rowid": _rowid(doc["entity_type"], doc["entity_id"])}
+        conn.execute(text("DELETE FROM crm_search_fts WHERE rowid = :rowid"), params)
+        conn.execute(text("""
+            INSERT INTO crm_search_fts (rowid, title, body, entity_type, entity_id, client_id)
+            VALUES (:rowid, :title, :body, :entity_type, :entity_id, :client_id)
+        """), params)
+
+
+def _delete(conn, entity_type: str, entity_id: int):
+    if IS_POSTGRES:
+        conn.execute(text("DELETE FROM crm_search_index WHERE entity_type = :t AND entity_id = :id"),
+                     {"t": entity_type, "id": entity_id})
+    else:
+        conn.execute(text("DELETE FROM crm_search_fts WHERE rowid = :rowid"),
+                     {"rowid": _rowid(entity_type, entity_id)})
+
+
+def rebuild_crm_index(db: Session) -> int:
+    """Re-index every client, contact, note and timeline event. Returns the record count."""
+    conn = db.connection()
+    conn.execute(text("DELETE FROM crm_search_index" if IS_POSTGRES else "DELETE FROM crm_search_fts"))
+    count = 0
+    for model, entity_type in MODEL_TYPES.items():
+        # Client.description / notes_from_last_meeting are deferred; load them with the rows
+        for obj in db.query(model).options(undefer_group(LONG_TEXT)).yield_per(500):
+            _upsert(conn, build_document(entity_type, obj))
+            count += 1
+    db.commit()
+    return count
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _sync_crm_index(session: Session, flush_context):
+    """Write hook: mirror inserts/updates/deletes of indexed models into the search index"""
+    changed = [obj for obj in list(session.new) + list(session.dirty) if type(obj) in MODEL_TYPES]
+    deleted = [obj for obj in session.deleted if type(obj) in MODEL_TYPES]
+    if not changed and not deleted:
+        return
+
+    # Deferred / expired columns the documents need: one query per model, not a lazy load per row
+    for model in {type(obj) for obj in changed}:
+        ids = [obj.id for obj in changed if type(obj) is model and obj not in session.new and inspect(obj).unloaded]
+        if ids:
+            session.query(model).options(undefer_group(LONG_TEXT)).filter(model.id.in_(ids)).all()
+
+    conn = session.connection()
+    for obj in deleted:
+        _delete(conn, MODEL_TYPES[type(obj)], obj.id)
+    for obj in changed:
+        if session.is_modified(obj, include_collections=False) or obj in session.new:
+            _upsert(conn, build_document(MODEL_TYPES[type(obj)], obj))
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up early once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _typo_candidates(db: Session, term: str, max_candidates: int = 3) -> List[str]:
+    """Indexed terms within a small edit distance of a term that matched nothing"""
+    limit = 1 if len(term) <= 4 else MAX_TYPO_DISTANCE
+    # Assume the first letter is right; keeps the vocabulary scan to one range of terms
+    rows = db.execute(text("""
+        SELECT term, doc FROM crm_search_vocab
+        WHERE term >= :lo AND term < :hi AND length(term) BETWEEN :min_len AND :max_len
+    """), {
+        "lo": term[0], "hi": chr(ord(term[0]) + 1),
+        "min_len": len(term) - limit, "max_len": len(term) + limit,
+    }).all()
+    scored = []
+    for candidate, doc_count in rows:
+        distance = _edit_distance(term, candidate, limit)
+        if distance <= limit:
+            scored.append((distance, -doc_count, candidate))
+    return [candidate for _, _, candidate in sorted(scored)[:max_candidates]]
+
+
+def _has_prefix_match(db: Session, term: str) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM crm_search_vocab WHERE term >= :lo AND term < :hi LIMIT 1"),
+        {"lo": term, "hi": term + "\U0010ffff"}
+    ).first() is not None
+
+
+def _fts5_query(db: Session, q: str) -> str:
+    """
+    Free text -> FTS5 query: every term is prefix-matched and required; terms
+    with no prefix match in the index are widened to their nearest spellings.
+    """
+    clauses = []
+    for term in re.findall(r"\w+", q.lower()):
+        if _has_prefix_match(db, term):
+            clauses.append(f'"{term}"*')
+            continue
+        alternatives = [f'"{term}"*'] + [f'"{candidate}"' for candidate in _typo_candidates(db, term)]
+        clauses.append("(" + " OR ".join(alternatives) + ")")
+    return " ".join(clauses)
+
+
+def search(db: Session, q: str, types: Optional[List[str]] = None, client_id: Optional[int] = None,
+           limit: int = 20) -> List[Dict]:
+    """
+    Ranked, typed search results across clients, contacts, notes and timeline events.
+
+    Returns:
+        List of dicts with type, id, client_id, client_name, title, snippet (HTML-escaped,
+        matches wrapped in <mark>) and rank (higher is better)
+    """
+    params = {"limit": limit, "client_id": client_id}
+    filters = []
+    if types:
+        params.update({f"type_{i}": t for i, t in enumerate(types)})
+        placeholders = ", ".join(f":type_{i}" for i in range(len(types)))
+        filters.append(f"s.entity_type IN ({placeholders})")
+    if client_id is not None:
+        filters.append("s.client_id = :client_id")
+    extra_filters = "".join(f" AND {f}" for f in filters)
+
+    if IS_POSTGRES:
+        terms = re.findall(r"\w+", q.lower())
+        if not terms:
+            return []
+        params["tsquery"] = " & ".join(f"{term}:*" for term in terms)
+        params["q"] = q.lower()
+        # Full-text prefix match, plus trigram similarity on titles to tolerate typos
+        trgm_available = _pg_trgm_available(db)
+        fuzzy_rank = " + similarity(lower(s.title), :q)" if trgm_available else ""
+        fuzzy_match = " OR lower(s.title) % :q" if trgm_available else ""
+        sql = f"""
+            SELECT s.entity_type AS type, s.entity_id AS id, s.client_id,
+                   c.first_name || ' ' || c.last_name AS client_name, s.title,
+                   ts_headline('simple', s.body, to_tsquery('simple', :tsquery),
+                               'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxWords=16, MinWords=4') AS snippet,
+                   rank
+            FROM (
+                SELECT s.*, ts_rank_cd(s.search_vector, to_tsquery('simple', :tsquery)){fuzzy_rank} AS rank
+                FROM crm_search_index s
+                WHERE (s.search_vector @@ to_tsquery('simple', :tsquery){fuzzy_match}){extra_filters}
+                ORDER BY rank DESC
+                LIMIT :limit
+            ) s
+            JOIN clients c ON c.id = s.client_id
+            ORDER BY rank DESC
+        """
+    else:
+        params["q"] = _fts5_query(db, q)
+        if not params["q"]:
+            return []
+        # bm25() is lower-is-better; title hits count 4x body hits
+        sql = f"""
+            SELECT s.entity_type AS type, s.entity_id AS id, s.client_id,
+                   c.first_name || ' ' || c.last_name AS client_name, s.title,
+                   snippet(crm_search_fts, 1, '{MATCH_START}', '{MATCH_END}', '…', 12) AS snippet,
+                   -bm25(crm_search_fts, 4.0, 1.0) AS rank
+            FROM crm_search_fts s
+            JOIN clients c ON c.id = s.client_id
+            WHERE crm_search_fts MATCH :q{extra_filters}
+            ORDER BY rank DESC
+            LIMIT :limit
+        """
+
+    rows = db.execute(text(sql), params).mappings().all()
+    return [{**row, "snippet": render_snippet(row["snippet"])} for row in rows]
@@ -0,0 +1,246 @@
+"""
+Full-text search index over client document contents
+
+- SQLite: FTS5 virtual table (client_documents_fts, rowid = document id) ranked with bm25()
+- PostgreSQL: client_document_texts table with a generated tsvector column + GIN index
+
+Text is extracted off the request path: uploads schedule a background task, and a
+periodic sweep (index_pending_documents) picks up anything that was missed,
+including documents uploaded before the index existed.
+"""
+import re
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from database import engine, SessionLocal
+from models import ClientDocument
+from utils.document_text import extract_text
+from utils.search_snippets import MATCH_END, MATCH_START, render_snippet
+
+IS_POSTGRES = engine.dialect.name == "postgresql"
+
+
+def init_document_search():
+    """Create the search index structures if they don't exist (idempotent)"""
+    with engine.begin() as conn:
+        create_document_search_tables(conn)
+
+
+def create_document_search_tables(conn):
+    """Create the search index structures on an open connection (idempotent)"""
+    if IS_POSTGRES:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS client_document_texts (
+                document_id INTEGER PRIMARY KEY REFERENCES client_documents(id) ON DELETE CASCADE,
+                client_id INTEGER NOT NULL,
+                title TEXT,
+                content TEXT NOT NULL DEFAULT '',
+                search_vector TSVECTOR GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', content), 'B')
+                ) STORED,
+                indexed_at TIMESTAMPTZ DEFAULT now()
+            )
+        """))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_client_document_texts_search "
+            "ON client_document_texts USING GIN (search_vector)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_client_document_texts_client_id "
+            "ON client_document_texts (client_id)"
+        ))
+    else:
+        conn.execute(text("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS client_documents_fts USING fts5(
+                title,
+                content,
+                client_id UNINDEXED,
+                tokenize = 'porter unicode61'
+            )
+        """))
+
+
+def _upsert(db: Session, document: ClientDocument, content: str):
+    params = {
+        "document_id": document.id,
+        "client_id": document.client_id,
+        "title": document.title or "",
+        "content": content,
+    }
+    if IS_POSTGRES:
+        db.execute(text("""
+            INSERT INTO client_document_texts (document_id, client_id, title, content, indexed_at)
+            VALUES (:document_id, :client_id, :title, :content, now())
+            ON CONFLICT (document_id) DO UPDATE
+            SET client_id = EXCLUDED.client_id, title = EXCLUDED.title,
+                content = EXCLUDED.content, indexed_at = now()
+        """), params)
+    else:
+        # FTS5 tables have no upsert; replace the row by rowid
+        db.execute(text("DELETE FROM client_documents_fts WHERE rowid = :document_id"), params)
+        db.execute(text("""
+            INSERT INTO client_documents_fts (rowid, title, content, client_id)
+            VALUES (:document_id, :title, :content, :client_id)
+        """), params)
+
+
+def _indexed_content_for_hash(db: Session, document: ClientDocument) -> Optional[str]:
+    """Reuse text already extracted for an identical file (same blob) if there is one"""
+    if not document.file_hash:
+        return None
+    table = "client_document_texts" if IS_POSTGRES else "client_documents_fts"
+    key = "document_id" if IS_POSTGRES else "rowid"
+    row = db.execute(text(f"""
+        SELECT t.content FROM {table} t
+        JOIN client_documents d ON d.id = t.{key}
+        WHERE d.file_hash = :file_hash AND d.id != :document_id
+        LIMIT 1
+    """), {"file_hash": document.file_hash, "document_id": document.id}).first()
+    return row[0] if row else None
+
+
+def index_document(db: Session, document: ClientDocument):
+    """Extract text for one document and write it to the index (caller commits)"""
+    content = _indexed_content_for_hash(db, document)
+    if content is None:
+        try:
+            content = extract_text(document.file_path, document.file_type)
+        except Exception as e:
+            # Still index title-only so we don't retry a broken file on every sweep
+            print(f"[DOC-INDEX] Text extraction failed for document {document.id}: {e}")
+            content = ""
+    _upsert(db, document, content)
+
+
+def update_document_title(db: Session, document: ClientDocument):
+    """Keep the indexed title in sync after metadata edits (caller commits)"""
+    if IS_POSTGRES:
+        db.execute(text("UPDATE client_document_texts SET title = :title WHERE document_id = :document_id"),
+                   {"title": document.title or "", "document_id": document.id})
+    else:
+        db.execute(text("UPDATE client_documents_fts SET title = :title WHERE rowid = :document_id"),
+                   {"title": document.title or "", "document_id": document.id})
+
+
+def remove_document(db: Session, document_id: int):
+    """Drop a document from the index (caller commits)"""
+    if IS_POSTGRES:
+        db.execute(text("DELETE FROM client_document_texts WHERE document_id = :document_id"),
+                   {"document_id": document_id})
+    else:
+        db.execute(text("DELETE FROM client_documents_fts WHERE rowid = :document_id"),
+                   {"document_id": document_id})
+
+
+def index_document_by_id(document_id: int):
+    """Background task entry point: index one document in its own session"""
+    db = SessionLocal()
+    try:
+        document = db.query(ClientDocument).filter(ClientDocument.id == document_id).first()
+        if not document:
+            return
+        index_document(db, document)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"[DOC-INDEX] Error indexing document {document_id}: {e}")
+    finally:
+        db.close()
+
+
+def index_pending_documents(batch_size: int = 50) -> int:
+    """
+    Index documents that aren't in the search index yet.
+    Called periodically by the scheduler; also works as a backfill.
+
+    Returns:
+        Number of documents indexed
+    """
+    db = SessionLocal()
+    indexed = 0
+    try:
+        if IS_POSTGRES:
+            pending_sql = """
+                SELECT d.id FROM client_documents d
+                LEFT JOIN client_document_texts t ON t.document_id = d.id
+                WHERE t.document_id IS NULL ORDER BY d.id LIMIT :limit
+            """
+        else:
+            pending_sql = """
+                SELECT d.id FROM client_documents d
+                WHERE d.id NOT IN (SELECT rowid FROM client_documents_fts)
+                ORDER BY d.id LIMIT :limit
+            """
+        while True:
+            pending_ids = [row[0] for row in db.execute(text(pending_sql), {"limit": batch_size})]
+            if not pending_ids:
+                break
+            documents = db.query(ClientDocument).filter(ClientDocument.id.in_(pending_ids)).all()
+            for document in documents:
+                index_document(db, document)
+            db.commit()
+            indexed += len(documents)
+        return indexed
+    except Exception as e:
+        db.rollback()
+        print(f"[DOC-INDEX] Error indexing pending documents: {e}")
+        return indexed
+    finally:
+        db.close()
+
+
+def _fts5_query(q: str) -> str:
+    """Turn free text into a safe FTS5 query: every word quoted and prefix-matched, all required"""
+    terms = re.findall(r"\w+", q)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_documents(db: Session, q: str, client_id: Optional[int] = None, limit: int = 20) -> List[dict]:
+    """
+    Ranked full-text search over document titles and contents.
+
+    Returns:
+        List of dicts with document_id, client_id, title, file_name, file_type,
+        document_type, snippet (HTML-escaped, matches wrapped in <mark>) and rank (higher is better)
+    """
+    params = {"q": q, "client_id": client_id, "limit": limit}
+    client_filter = "AND d.client_id = :client_id" if client_id is not None else ""
+
+    if IS_POSTGRES:
+        # Rank and limit first, then build headlines only for the rows we return
+        sql = f"""
+            SELECT top.document_id, d.client_id, d.title, d.file_name, d.file_type, d.document_type,
+                   ts_headline('english', top.content, top.query,
+                               'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxFragments=2, MaxWords=20, MinWords=5') AS snippet,
+                   top.rank
+            FROM (
+                SELECT t.document_id, t.content, query, ts_rank_cd(t.search_vector, query) AS rank
+                FROM client_document_texts t
+                JOIN client_documents d ON d.id = t.document_id,
+                     websearch_to_tsquery('english', :q) query
+                WHERE t.search_vector @@ query {client_filter}
+                ORDER BY rank DESC
+                LIMIT :limit
+            ) top
+            JOIN client_documents d ON d.id = top.document_id
+            ORDER BY top.rank DESC
+        """
+    else:
+        params["q"] = _fts5_query(q)
+        if not params["q"]:
+            return []
+        # bm25() is lower-is-better; title matches weigh 5x content matches
+        sql = f"""
+            SELECT f.rowid AS document_id, d.client_id, d.title, d.file_name, d.file_type, d.document_type,
+                   snippet(client_documents_fts, -1, '{MATCH_START}', '{MATCH_END}', '…', 16) AS snippet,
+                   -bm25(client_documents_fts, 5.0, 1.0) AS rank
+            FROM client_documents_fts f
+            JOIN client_documents d ON d.id = f.rowid
+            WHERE client_documents_fts MATCH :q {client_filter}
+            ORDER BY rank DESC
+            LIMIT :limit
+        """
+
+    rows = db.execute(text(sql), params).mappings().all()
+    return [{**row, "snippet": render_snippet(row["snippet"])} for row in rows]
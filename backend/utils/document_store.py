@@ -0,0 +1,134 @@
+"""
+Content-addressed storage for client documents
+Layout: uploads/objects/ab/cdef... (first 2 hex chars of the SHA-256 as a fan-out dir)
+
+Identical files are stored once no matter how many ClientDocument rows point
+at them. A blob's reference count is the number of ClientDocument rows whose
+file_path points at it, so deleting a document only removes the blob once the
+last reference is gone.
+"""
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from sqlalchemy.orm import Session
+from models import ClientDocument
+from utils.document_thumbnails import thumbnail_path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, fall back to a per-process lock
+    fcntl = None
+
+OBJECTS_DIR = os.path.join("uploads", "objects")
+os.makedirs(OBJECTS_DIR, exist_ok=True)
+# One lock file per fan-out directory (at most 256 for blobs), shared by every
+# worker process: store_blob() creating a directory and release_blob() removing
+# it hold the same lock
+LOCKS_DIR = os.path.join(OBJECTS_DIR, ".locks")
+os.makedirs(LOCKS_DIR, exist_ok=True)
+
+_process_lock = threading.RLock()
+_held = threading.local()
+
+
+@contextmanager
+def blob_lock(file_path: str):
+    """
+    Serialize "link new blob" vs "release last reference" for a stored file,
+    across threads and uvicorn worker processes (flock on a lock file).
+
+    Hold it across store_blob() and the commit of the row that references the
+    blob, so the blob can't be released in between. Re-entrant within a thread.
+    """
+    if fcntl is None:
+        with _process_lock:
+            yield
+        return
+    # The fan-out prefix for blobs ("ab"); legacy upload paths share their directory's lock
+    stripe = os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+    held = getattr(_held, "stripes", None)
+    if held is None:
+        held = _held.stripes = {}
+    if stripe in held:
+        held[stripe] += 1
+        try:
+            yield
+        finally:
+            held[stripe] -= 1
+        return
+    # flock locks belong to the open file, so threads of one process exclude each other too
+    with open(os.path.join(LOCKS_DIR, f"{stripe}.lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        held[stripe] = 1
+        try:
+            yield
+        finally:
+            del held[stripe]
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def object_path(file_hash: str) -> str:
+    """Path of the blob for a SHA-256 hex digest"""
+    return os.path.join(OBJECTS_DIR, file_hash[:2], file_hash[2:])
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def store_blob(temp_path: str, file_hash: str) -> tuple:
+    """
+    Move a fully written temp file into the object store.
+
+    temp_path must be on the same filesystem as OBJECTS_DIR (the rename is atomic).
+    If a blob with the same hash already exists the temp file is discarded.
+
+    Returns:
+        (blob_path, is_new)
+    """
+    blob_path = object_path(file_hash)
+    with blob_lock(blob_path):
+        if os.path.exists(blob_path):
+            os.remove(temp_path)
+            return blob_path, False
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.replace(temp_path, blob_path)
+        return blob_path, True
+
+
+def reference_count(db: Session, file_path: str) -> int:
+    """Number of documents that reference a stored file"""
+    return db.query(ClientDocument).filter(ClientDocument.file_path == file_path).count()
+
+
+def release_blob(db: Session, file_path: str) -> bool:
+    """
+    Remove a stored file if no document references it any more.
+    Call after the owning row has been deleted and committed.
+
+    Returns:
+        True if the file was removed from disk
+    """
+    with blob_lock(file_path):
+        if reference_count(db, file_path) > 0:
+            return False
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            # Derived files cached next to the blob go with it
+            if os.path.exists(thumbnail_path(file_path)):
+                os.remove(thumbnail_path(file_path))
+            # Drop the empty fan-out dir, but never the store root itself
+            parent = os.path.dirname(file_path)
+            if os.path.abspath(os.path.dirname(parent)) == os.path.abspath(OBJECTS_DIR):
+                try:
+                    os.rmdir(parent)
+                except OSError:
+                    pass
+            return True
+        return False
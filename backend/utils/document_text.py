@@ -0,0 +1,84 @@
+"""
+Plain-text extraction for uploaded client documents (PDF, DOCX, text)
+Used to feed the document full-text search index
+"""
+import os
+import re
+import zipfile
+from typing import Optional
+from xml.etree import ElementTree
+
+# Cap stored text per document; contracts rarely need more to be findable
+MAX_EXTRACTED_CHARS = 2_000_000
+
+TEXT_EXTENSIONS = {"txt", "md", "csv", "rtf", "html", "htm", "json"}
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def extract_pdf_text(path: str) -> str:
+    """Extract text from a PDF (requires pypdf)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        print("⚠️  WARNING: pypdf not installed, skipping PDF text extraction. Run: pip install pypdf")
+        return ""
+
+    reader = PdfReader(path)
+    parts = []
+    total = 0
+    for page in reader.pages:
+        page_text = page.extract_text() or ""
+        parts.append(page_text)
+        total += len(page_text)
+        if total >= MAX_EXTRACTED_CHARS:
+            break
+    return "\n".join(parts)
+
+
+def extract_docx_text(path: str) -> str:
+    """Extract text from a DOCX by reading word/document.xml directly (no extra dependency)"""
+    with zipfile.ZipFile(path) as archive:
+        with archive.open("word/document.xml") as xml_file:
+            tree = ElementTree.parse(xml_file)
+
+    paragraphs = []
+    for paragraph in tree.iter(f"{_WORD_NS}p"):
+        runs = [node.text for node in paragraph.iter(f"{_WORD_NS}t") if node.text]
+        if runs:
+            paragraphs.append("".join(runs))
+    return "\n".join(paragraphs)
+
+
+def extract_plain_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read(MAX_EXTRACTED_CHARS)
+
+
+def extract_text(path: str, file_type: Optional[str] = None) -> str:
+    """
+    Extract searchable text from a stored document.
+
+    Args:
+        path: Path to the file on disk
+        file_type: Extension without the dot (pdf, docx, ...). Stored files in the
+            object store have no extension, so pass ClientDocument.file_type.
+
+    Returns:
+        Normalized text, or "" for unsupported types
+    """
+    file_type = (file_type or os.path.splitext(path)[1].lstrip(".")).lower()
+
+    if file_type == "pdf":
+        text = extract_pdf_text(path)
+    elif file_type == "docx":
+        text = extract_docx_text(path)
+    elif file_type in TEXT_EXTENSIONS:
+        text = extract_plain_text(path)
+    else:
+        return ""
+
+    # Collapse runs of whitespace left over from PDF layout
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    return text.strip()[:MAX_EXTRACTED_CHARS]
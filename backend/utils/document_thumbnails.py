@@ -0,0 +1,113 @@
+"""
+First-page thumbnail generation for client documents
+Thumbnails are cached next to the stored file as <file>.thumb.webp, so every
+document sharing a blob shares its thumbnail.
+
+PDF rendering uses PyMuPDF (optional); images are resized with Pillow.
+Documents we can't render (DOCX, etc.) simply have no thumbnail and the
+frontend falls back to the generic file icon.
+"""
+import io
+import os
+import tempfile
+from typing import Optional
+
+THUMBNAIL_SUFFIX = ".thumb.webp"
+THUMBNAIL_MAX_SIZE = (320, 320)  # Bounding box in pixels, aspect ratio is kept
+THUMBNAIL_QUALITY = 80
+
+IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp", "bmp", "tif", "tiff"}
+
+
+def thumbnail_path(file_path: str) -> str:
+    """Where the cached thumbnail for a stored file lives"""
+    return file_path + THUMBNAIL_SUFFIX
+
+
+def can_render(file_type: Optional[str]) -> bool:
+    return (file_type or "").lower() in IMAGE_EXTENSIONS | {"pdf"}
+
+
+def _open_pdf_first_page(file_path: str):
+    """Render page 1 of a PDF to a PIL image (requires PyMuPDF)"""
+    try:
+        import pymupdf
+    except ImportError:
+        print("⚠️  WARNING: PyMuPDF not installed, skipping PDF thumbnails. Run: pip install pymupdf")
+        return None
+    from PIL import Image
+
+    with pymupdf.open(file_path) as pdf:
+        if pdf.page_count == 0:
+            return None
+        page = pdf[0]
+        # Render just large enough to fill the thumbnail box, not the full page resolution
+        zoom = min(
+            THUMBNAIL_MAX_SIZE[0] * 2 / max(page.rect.width, 1),
+            THUMBNAIL_MAX_SIZE[1] * 2 / max(page.rect.height, 1),
+        )
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+        return Image.open(io.BytesIO(pixmap.tobytes("png")))
+
+
+def _open_image(file_path: str):
+    from PIL import Image
+
+    image = Image.open(file_path)
+    image.draft("RGB", THUMBNAIL_MAX_SIZE)  # Lets JPEG decode at reduced size
+    return image
+
+
+def render_thumbnail(file_path: str, file_type: Optional[str]) -> Optional[str]:
+    """
+    Render and cache the thumbnail for a stored file.
+
+    Top-level and free of DB access so it can run in a process pool.
+
+    Returns:
+        Path to the thumbnail, or None if this file type can't be rendered
+    """
+    target = thumbnail_path(file_path)
+    if os.path.exists(target):
+        return target
+    if not can_render(file_type) or not os.path.exists(file_path):
+        return None
+
+    if file_type.lower() == "pdf":
+        image = _open_pdf_first_page(file_path)
+    else:
+        image = _open_image(file_path)
+    if image is None:
+        return None
+
+    image = image.convert("RGB")
+    image.thumbnail(THUMBNAIL_MAX_SIZE)
+
+    # Write to a temp file and rename so readers never see a partial thumbnail
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", prefix=".thumb-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, format="WEBP", quality=THUMBNAIL_QUALITY)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return target
+
+
+def generate_thumbnail_for_document(document_id: int):
+    """Background task entry point: render the thumbnail for one document"""
+    from database import SessionLocal
+    from models import ClientDocument
+
+    db = SessionLocal()
+    try:
+        document = db.query(ClientDocument).filter(ClientDocument.id == document_id).first()
+        if not document:
+            return
+        render_thumbnail(document.file_path, document.file_type)
+    except Exception as e:
+        print(f"[THUMBNAILS] Error rendering thumbnail for document {document_id}: {e}")
+    finally:
+        db.close()
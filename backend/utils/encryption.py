@@ -1,12 +1,26 @@
 """
 Password encryption utilities for client admin accounts
+
+Keys:
+- ENCRYPTION_KEY (or encryption_key.key) is the primary key; all new values are encrypted with it
+- ENCRYPTION_PREVIOUS_KEYS (comma-separated) are older keys still accepted for decryption,
+  so a key can be rotated without downtime (see reencrypt_passwords.py)
+
+The key material and MultiFernet instance are built once per process and cached.
 """
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
+import hashlib
 import os
+import threading
+from typing import List, Optional
 
 # Store the key in a file for consistency
 KEY_FILE = "encryption_key.key"
 
+_fernet: Optional[MultiFernet] = None
+_fernet_lock = threading.Lock()
+
+
 def get_encryption_key():
     """Get or generate encryption key"""
     # Try to load from environment first
@@ -16,38 +30,71 @@ def get_encryption_key():
             return key.encode()
         elif isinstance(key, bytes) and len(key) == 44:
             return key
-    
+
     # Try to load from file
     if os.path.exists(KEY_FILE):
         with open(KEY_FILE, 'rb') as f:
             key = f.read()
         if len(key) == 44:
             return key
-    
+
     # Generate new key and save it
     key = Fernet.generate_key()
     with open(KEY_FILE, 'wb') as f:
         f.write(key)
     return key
 
+
+def get_previous_keys() -> List[bytes]:
+    """Older keys that can still decrypt existing values (ENCRYPTION_PREVIOUS_KEYS)"""
+    raw = os.getenv('ENCRYPTION_PREVIOUS_KEYS', '')
+    return [key.strip().encode() for key in raw.split(',') if len(key.strip()) == 44]
+
+
+def key_fingerprint(key: bytes) -> str:
+    """Short, non-reversible identifier for a key (safe to log or store)"""
+    return hashlib.sha256(key).hexdigest()[:16]
+
+
+def get_fernet() -> MultiFernet:
+    """Cached MultiFernet: encrypts with the primary key, decrypts with any configured key"""
+    global _fernet
+    if _fernet is None:
+        with _fernet_lock:
+            if _fernet is None:
+                keys = [get_encryption_key()] + get_previous_keys()
+                _fernet = MultiFernet([Fernet(key) for key in keys])
+    return _fernet
+
+
+def reset_fernet_cache():
+    """Drop the cached keys (e.g. after changing ENCRYPTION_KEY in-process)"""
+    global _fernet
+    with _fernet_lock:
+        _fernet = None
+
+
 def encrypt_password(password: str) -> str:
     """Encrypt a password"""
     if not password:
         return ""
-    key = get_encryption_key()
-    f = Fernet(key)
-    encrypted = f.encrypt(password.encode())
+    encrypted = get_fernet().encrypt(password.encode())
     return encrypted.decode()
 
+
 def decrypt_password(encrypted_password: str) -> str:
     """Decrypt a password"""
     if not encrypted_password:
         return ""
     try:
-        key = get_encryption_key()
-        f = Fernet(key)
-        decrypted = f.decrypt(encrypted_password.encode())
+        decrypted = get_fernet().decrypt(encrypted_password.encode())
         return decrypted.decode()
     except Exception as e:
         raise ValueError(f"Failed to decrypt password: {str(e)}")
 
+
+def rotate_encrypted_password(encrypted_password: str) -> str:
+    """Re-encrypt a value under the primary key (decrypts with whichever key matches)"""
+    if not encrypted_password:
+        return encrypted_password
+    return get_fernet().rotate(encrypted_password.encode()).decode()
@@ -0,0 +1,119 @@
+"""
+Fast read path for list endpoints
+
+The ORM path for a list route loads every row into the identity map, then
+FastAPI validates each object against the response_model, dumps it to Python
+and json.dumps the result. For a few thousand rows nearly all of that time is
+Pydantic validation of data that just came out of our own database.
+
+List routes use a ListSerializer instead:
+
+- select only the columns the response schema has, with Core (plain tuples)
+- zip them into dicts (nested lists are loaded with one query each and
+  attached by the route)
+- serialize the whole list in one call with a TypeAdapter compiled once per
+  schema over a TypedDict mirror of it, so the JSON is the same as the
+  response_model's (ints in float fields come out as floats, datetimes in the
+  same format) but rows are not validated
+
+The route returns the bytes as a Response, so FastAPI skips its own
+validation; keep the response_model on the route for the OpenAPI docs.
+
+Sparse fieldsets: ?fields=id,first_name,email narrows both the SELECT and
+the JSON to those fields (id is always included). select_fields() returns a
+ListSerializer for the subset, compiled once per distinct set of fields.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Union, get_args, get_origin
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+_row_types: Dict[type, type] = {}
+
+# Distinct ?fields= subsets compiled and kept per serializer
+MAX_FIELD_SUBSETS = 64
+
+
+def _row_annotation(annotation):
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return row_type(annotation)
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin is list and args:
+        return List[_row_annotation(args[0])]
+    if origin is Union:
+        return Union[tuple(_row_annotation(arg) for arg in args)]
+    return annotation
+
+
+def row_type(schema: type, fields: Optional[Sequence[str]] = None) -> type:
+    """
+    TypedDict with the fields (and field types) of a Pydantic schema, or only
+    `fields` of them; nested schemas become TypedDicts too
+    """
+    if fields is None and schema in _row_types:
+        return _row_types[schema]
+    names = list(fields) if fields is not None else list(schema.model_fields)
+    row = TypedDict(
+        f"{schema.__name__}Row",
+        {name: _row_annotation(schema.model_fields[name].annotation) for name in names},
+    )
+    if fields is None:
+        _row_types[schema] = row
+    return row
+
+
+class ListSerializer:
+    """Columns to select and a compiled serializer for a list of `schema` rows (or some of its fields)"""
+    def __init__(self, schema: type, fields: Optional[Sequence[str]] = None):
+        self.schema = schema
+        self.fields = list(fields) if fields is not None else list(schema.model_fields)
+        self.adapter = TypeAdapter(List[row_type(schema, fields)])
+        self._subsets: Dict[frozenset, "ListSerializer"] = {}
+
+    def select_fields(self, fields: Optional[str]) -> "ListSerializer":
+        """Serializer for a comma-separated ?fields= value (None/empty: all fields); 400 on unknown names"""
+        if not fields:
+            return self
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s): {', '.join(unknown)}. Valid: {', '.join(self.fields)}"
+            )
+        wanted = frozenset(names) | ({"id"} & set(self.fields))
+        subset = self._subsets.get(wanted)
+        if subset is None:
+            subset = ListSerializer(self.schema, [name for name in self.fields if name in wanted])
+            if len(self._subsets) < MAX_FIELD_SUBSETS:
+                self._subsets[wanted] = subset
+        return subset
+
+    def columns(self, model) -> list:
+        """The model's columns that appear in the schema, in schema order"""
+        table = model.__table__
+        return [table.c[name] for name in self.fields if name in table.c]
+
+    def rows(self, result: Iterable) -> List[dict]:
+        """Rows of a select(*self.columns(model)) as dicts"""
+        keys = None
+        rows = []
+        for row in result:
+            if keys is None:
+                keys = list(row._fields)
+            rows.append(dict(zip(keys, row)))
+        return rows
+
+    def dump(self, rows: List[dict]) -> bytes:
+        return self.adapter.dump_json(rows)
+
+    def response(self, rows: List[dict], response: Optional[Response] = None) -> Response:
+        return json_response(self.dump(rows), response)
+
+
+def json_response(content: bytes, response: Optional[Response] = None) -> Response:
+    """Response for serialized JSON, keeping headers already set on the route's `response` (ETag, ...)"""
+    headers = dict(response.headers) if response is not None else None
+    if headers:
+        headers.pop("content-length", None)
+    return Response(content=content, media_type="application/json", headers=headers)
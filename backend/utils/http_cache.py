@@ -0,0 +1,180 @@
+"""
+HTTP conditional caching (weak ETag / Last-Modified) for read endpoints
+
+Validators:
+- detail routes: (id, updated_at) of the row, plus the versions of its own
+  table and of the child tables embedded in the payload (e.g. invoice_items
+  for an invoice). updated_at alone isn't enough: SQLite's now() has
+  one-second precision, so two writes within a second would share an ETag
+- list routes: the versions of the tables the response is built from
+  (utils/table_versions.py), so any write to one of them changes the ETag
+- static reference data (SOW section templates): a hash of the payload
+
+Routes call check_detail() / check_list() / check_static() before loading or
+serializing anything; when the client's If-None-Match (or If-Modified-Since)
+is still current they get back a bare 304 to return as is. Otherwise the
+validators are set on the route's Response and the route carries on.
+
+Detail ETags handed out by this process are remembered with the table versions
+they were computed at. While those versions are unchanged the row can't have
+changed either, so a revalidation is answered without fetching the row.
+
+Every ETag includes a hash of schemas.py, so a deploy that changes a response
+model doesn't serve stale payload shapes. Responses are marked
+"Cache-Control: private, no-cache": browsers keep them but revalidate each use.
+
+HTTP_CACHE_ENABLED=false turns it off.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from utils.table_versions import get_table_versions
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() not in ("false", "0", "no")
+CACHE_CONTROL = "private, no-cache"
+
+# ETags remembered for version-only revalidation of detail routes
+ISSUED_ETAGS_SIZE = 4096
+
+_SCHEMA_HASH = hashlib.sha1((Path(__file__).resolve().parent.parent / "schemas.py").read_bytes()).hexdigest()[:8]
+
+_lock = threading.Lock()
+_issued: "OrderedDict[str, Tuple[tuple, tuple, Optional[datetime]]]" = OrderedDict()
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(map(str, (_SCHEMA_HASH,) + parts)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    # SQLite returns naive datetimes; func.now() there is UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _latest(*values: Optional[datetime]) -> Optional[datetime]:
+    present = [_utc(v) for v in values if v is not None]
+    return max(present) if present else None
+
+
+def _table_names(models: Iterable) -> Tuple[str, ...]:
+    return tuple(model.__tablename__ for model in models)
+
+
+def _if_none_match(request: Request) -> Optional[set]:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+    # Weak comparison: W/"x" matches "x"
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def _is_current(request: Request, validators: Validators) -> bool:
+    tags = _if_none_match(request)
+    if tags is not None:
+        return "*" in tags or validators.etag.removeprefix("W/") in tags
+    # If-Modified-Since only counts when there's no If-None-Match (RFC 9110 13.1.3)
+    since = request.headers.get("if-modified-since")
+    if since and validators.last_modified:
+        try:
+            return validators.last_modified.replace(microsecond=0) <= parsedate_to_datetime(since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _headers(validators: Validators) -> dict:
+    headers = {"ETag": validators.etag, "Cache-Control": CACHE_CONTROL}
+    if validators.last_modified:
+        headers["Last-Modified"] = format_datetime(validators.last_modified, usegmt=True)
+    return headers
+
+
+def conditional_response(request: Request, response: Response, validators: Validators) -> Optional[Response]:
+    """Set the validators on `response`; return a 304 if the client's copy is current"""
+    headers = _headers(validators)
+    if _is_current(request, validators):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _remember(etag: str, key: tuple, versions: tuple, last_modified: Optional[datetime]):
+    with _lock:
+        _issued[etag] = (key, versions, last_modified)
+        _issued.move_to_end(etag)
+        while len(_issued) > ISSUED_ETAGS_SIZE:
+            _issued.popitem(last=False)
+
+
+def check_detail(request: Request, response: Response, db: Session, model, row_id: int,
+                 related: Iterable = ()) -> Optional[Response]:
+    """
+    Conditional GET for one row of `model` whose payload embeds the `related` models
+
+    Returns a 304 response, or None to build the full response (including when
+    the row doesn't exist, so the route raises its usual 404).
+    """
+    if not HTTP_CACHE_ENABLED:
+        return None
+    table = model.__table__
+    tables = (table.name,) + _table_names(related)
+    versions = get_table_versions(db, tables)
+    version_key = tuple(versions[name][0] for name in tables)
+    key = (table.name, row_id)
+
+    # Known ETag and no writes to these tables since it was issued: skip the row fetch
+    tags = _if_none_match(request) or set()
+    with _lock:
+        known = [(tag, _issued[tag]) for tag in _issued.keys() & {f'W/{t}' for t in tags}]
+    for etag, (issued_key, issued_versions, last_modified) in known:
+        if issued_key == key and issued_versions == version_key:
+            return Response(status_code=304, headers=_headers(Validators(etag, last_modified)))
+
+    row = db.execute(select(table.c.updated_at, table.c.created_at).where(table.c.id == row_id)).first()
+    if row is None:
+        return None
+    last_modified = _latest(row.updated_at, row.created_at, *(versions[name][1] for name in tables[1:]))
+    etag = make_etag(table.name, row_id, _utc(row.updated_at or row.created_at), *version_key)
+    _remember(etag, key, version_key, last_modified)
+    return conditional_response(request, response, Validators(etag, last_modified))
+
+
+def check_list(request: Request, response: Response, db: Session, models: Iterable) -> Optional[Response]:
+    """Conditional GET for a response built from the tables of `models` (any query string)"""
+    if not HTTP_CACHE_ENABLED:
+        return None
+    tables = _table_names(models)
+    versions = get_table_versions(db, tables)
+    etag = make_etag("list", *(f"{name}:{versions[name][0]}" for name in tables))
+    last_modified = _latest(*(versions[name][1] for name in tables))
+    return conditional_response(request, response, Validators(etag, last_modified))
+
+
+_static_etags = {}
+
+
+def check_static(request: Request, response: Response, name: str, payload) -> Optional[Response]:
+    """Conditional GET for reference data that only changes with a deploy"""
+    if not HTTP_CACHE_ENABLED:
+        return None
+    etag = _static_etags.get(name)
+    if etag is None:
+        etag = _static_etags[name] = make_etag(name, json.dumps(payload, sort_keys=True, default=str))
+    return conditional_response(request, response, Validators(etag, None))
@@ -0,0 +1,291 @@
+"""
+Per-route latency, DB query and external-call instrumentation
+
+MetricsMiddleware times every request and, through a per-request context,
+collects:
+- DB query count and time (SQLAlchemy before/after_cursor_execute events on the
+  engine, see instrument_engine)
+- Time spent calling OpenAI, Plaid, Google and Resend (call sites are wrapped
+  in track_external)
+
+Results are aggregated per route template (e.g. /api/clients/{client_id}, so
+the label set stays small), served in Prometheus text format by GET /metrics,
+and added to each response as a Server-Timing header, e.g.:
+
+    Server-Timing: app;dur=41.2, db;dur=12.8;desc="6 queries", openai;dur=0.0
+
+Other modules can add lines to /metrics with register_collector().
+
+Set SERVER_TIMING_ENABLED=false to stop sending the header.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import event
+
+# Prometheus histogram buckets for request duration (seconds)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() not in ("false", "0", "no")
+
+
+class RequestStats:
+    """Counters for the request currently being handled (shared with threadpool workers via the context)"""
+    __slots__ = ("scope", "db_queries", "db_seconds", "external_seconds", "cache")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.external_seconds: Dict[str, float] = defaultdict(float)
+        self.cache: Optional[str] = None  # "hit" / "miss" when the route used utils.query_cache
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+_lock = threading.Lock()
+_requests: Dict[tuple, int] = defaultdict(int)                       # (method, route, status) -> count
+_duration_buckets: Dict[tuple, list] = {}                            # (method, route) -> bucket counts
+_duration_sum: Dict[tuple, float] = defaultdict(float)               # (method, route) -> seconds
+_duration_count: Dict[tuple, int] = defaultdict(int)
+_db_queries: Dict[tuple, int] = defaultdict(int)                     # (method, route) -> queries
+_db_seconds: Dict[tuple, float] = defaultdict(float)
+_external_seconds: Dict[tuple, float] = defaultdict(float)           # (method, route, service) -> seconds
+_external_calls: Dict[tuple, int] = defaultdict(int)                 # (service, outcome) -> calls
+_external_total_seconds: Dict[str, float] = defaultdict(float)       # service -> seconds (incl. background jobs)
+
+# Functions returning extra exposition lines (with their HELP/TYPE) for /metrics
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def current_route() -> Optional[str]:
+    """'METHOD /route/{template}' of the request being handled (None outside requests)"""
+    stats = _current.get()
+    if stats is None or stats.scope is None:
+        return None
+    return f"{stats.scope['method']} {_route_template(stats.scope)}"
+
+
+def instrument_engine(engine):
+    """Count queries and time spent in the DB driver for the current request"""
+    if getattr(engine, "_metrics_instrumented", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += time.perf_counter() - started
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # after_cursor_execute doesn't fire for failed statements
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+    engine._metrics_instrumented = True
+
+
+@contextmanager
+def track_external(service: str):
+    """
+    Time a call to an external service.
+
+    Usage:
+        with track_external("resend"):
+            resend_client.Emails.send(params)
+    """
+    started = time.perf_counter()
+    outcome = "success"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        stats = _current.get()
+        if stats is not None:
+            stats.external_seconds[service] += elapsed
+        with _lock:
+            _external_calls[(service, outcome)] += 1
+            _external_total_seconds[service] += elapsed
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    # Unmatched paths (404s, scanners) share one label so they can't blow up cardinality
+    return path or "unmatched"
+
+
+def _server_timing(total_seconds: float, stats: RequestStats) -> bytes:
+    parts = [f"app;dur={total_seconds * 1000:.1f}",
+             f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries"']
+    for service, seconds in stats.external_seconds.items():
+        parts.append(f"{service};dur={seconds * 1000:.1f}")
+    if stats.cache:
+        parts.append(f'cache;desc="{stats.cache}"')
+    return ", ".join(parts).encode("latin-1")
+
+
+def _record(method: str, route: str, status: int, seconds: float, stats: RequestStats):
+    key = (method, route)
+    with _lock:
+        _requests[(method, route, status)] += 1
+        buckets = _duration_buckets.get(key)
+        if buckets is None:
+            buckets = _duration_buckets[key] = [0] * len(DURATION_BUCKETS)
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+        _duration_sum[key] += seconds
+        _duration_count[key] += 1
+        _db_queries[key] += stats.db_queries
+        _db_seconds[key] += stats.db_seconds
+        for service, external in stats.external_seconds.items():
+            _external_seconds[(method, route, service)] += external
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead, streaming responses untouched)"""
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(time.perf_counter() - started, stats)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_template(scope)
+            if route != "/metrics":
+                _record(scope["method"], route, status, time.perf_counter() - started, stats)
+            _current.reset(token)
+
+
+def register_collector(collect: Callable[[], List[str]]):
+    """Append the lines collect() returns (HELP/TYPE included) to every /metrics response"""
+    _collectors.append(collect)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_prometheus() -> str:
+    """All metrics in Prometheus text exposition format (version 0.0.4)"""
+    with _lock:
+        requests = dict(_requests)
+        buckets = {k: list(v) for k, v in _duration_buckets.items()}
+        duration_sum = dict(_duration_sum)
+        duration_count = dict(_duration_count)
+        db_queries = dict(_db_queries)
+        db_seconds = dict(_db_seconds)
+        external_seconds = dict(_external_seconds)
+        external_calls = dict(_external_calls)
+        external_total = dict(_external_total_seconds)
+
+    lines = [
+        "# HELP http_requests_total HTTP requests by route template and status code",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), count in sorted(requests.items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request duration by route template",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), counts in sorted(buckets.items()):
+        for bound, count in zip(DURATION_BUCKETS, counts):
+            lines.append(f"http_request_duration_seconds_bucket{_labels(method=method, route=route, le=bound)} {count}")
+        lines.append(f"http_request_duration_seconds_bucket{_labels(method=method, route=route, le='+Inf')} {duration_count[(method, route)]}")
+        lines.append(f"http_request_duration_seconds_sum{_labels(method=method, route=route)} {duration_sum[(method, route)]:.6f}")
+        lines.append(f"http_request_duration_seconds_count{_labels(method=method, route=route)} {duration_count[(method, route)]}")
+
+    lines += [
+        "# HELP http_request_db_queries_total DB queries executed while handling requests",
+        "# TYPE http_request_db_queries_total counter",
+    ]
+    for (method, route), count in sorted(db_queries.items()):
+        lines.append(f"http_request_db_queries_total{_labels(method=method, route=route)} {count}")
+
+    lines += [
+        "# HELP http_request_db_seconds_total Time spent in DB queries while handling requests",
+        "# TYPE http_request_db_seconds_total counter",
+    ]
+    for (method, route), seconds in sorted(db_seconds.items()):
+        lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} {seconds:.6f}")
+
+    lines += [
+        "# HELP http_request_external_seconds_total Time spent calling external services while handling requests",
+        "# TYPE http_request_external_seconds_total counter",
+    ]
+    for (method, route, service), seconds in sorted(external_seconds.items()):
+        lines.append(f"http_request_external_seconds_total{_labels(method=method, route=route, service=service)} {seconds:.6f}")
+
+    lines += [
+        "# HELP external_calls_total Calls to external services (including background jobs)",
+        "# TYPE external_calls_total counter",
+    ]
+    for (service, outcome), count in sorted(external_calls.items()):
+        lines.append(f"external_calls_total{_labels(service=service, outcome=outcome)} {count}")
+
+    lines += [
+        "# HELP external_call_seconds_total Time spent calling external services (including background jobs)",
+        "# TYPE external_call_seconds_total counter",
+    ]
+    for service, seconds in sorted(external_total.items()):
+        lines.append(f"external_call_seconds_total{_labels(service=service)} {seconds:.6f}")
+
+    for collect in _collectors:
+        lines += collect()
+
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    """Clear all aggregated metrics (benchmarks and tests)"""
+    with _lock:
+        for store in (_requests, _duration_buckets, _duration_sum, _duration_count, _db_queries,
+                      _db_seconds, _external_seconds, _external_calls, _external_total_seconds):
+            store.clear()
@@ -0,0 +1,111 @@
+"""
+Lazy registry for third-party SDK clients (OpenAI, Plaid, Resend)
+
+Routers used to build these clients as module globals, so every `import main`
+(and every --reload cycle) paid for importing the SDKs even when no request
+needed them. Now each client is built on first use, once per process, and
+shared by every router.
+
+A provider returns None when it isn't configured (missing env vars) or its
+package isn't installed - callers keep their existing "not configured" fallbacks.
+
+Usage:
+    from utils.providers import get_openai_client
+
+    openai_client = get_openai_client()
+    if not openai_client:
+        ...
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+_factories: Dict[str, Callable[[], Any]] = {}
+_instances: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def register_provider(name: str, factory: Callable[[], Any]):
+    """Register a factory; it runs the first time get_provider(name) is called"""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def get_provider(name: str) -> Optional[Any]:
+    """The shared client for a provider, built on first use (None if unavailable)"""
+    # Fast path: no lock once the client has been built
+    if name in _instances:
+        return _instances[name]
+    with _lock:
+        if name not in _instances:
+            factory = _factories[name]
+            try:
+                _instances[name] = factory()
+            except ImportError as e:
+                print(f"⚠️  WARNING: {name} package not installed ({e})")
+                _instances[name] = None
+            except Exception as e:
+                print(f"⚠️  WARNING: Error initializing {name} client: {e}")
+                _instances[name] = None
+        return _instances[name]
+
+
+def reset_providers():
+    """Drop built clients so they are rebuilt on next use (e.g. after changing env vars)"""
+    with _lock:
+        _instances.clear()
+
+
+def _create_openai_client():
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        print("⚠️  WARNING: OPENAI_API_KEY not found in environment variables")
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=openai_api_key)
+
+
+def _create_plaid_client():
+    if not (os.getenv("PLAID_CLIENT_ID") and os.getenv("PLAID_SECRET")):
+        return None
+    import plaid
+    from plaid.api import plaid_api
+    from plaid.configuration import Configuration
+    from plaid.api_client import ApiClient
+
+    configuration = Configuration(
+        host=plaid.Environment.sandbox if os.getenv("PLAID_ENV") == "sandbox" else plaid.Environment.development,
+        api_key={
+            'clientId': os.getenv("PLAID_CLIENT_ID"),
+            'secret': os.getenv("PLAID_SECRET")
+        }
+    )
+    return plaid_api.PlaidApi(ApiClient(configuration))
+
+
+def _create_resend_client():
+    resend_api_key = os.getenv("RESEND_API_KEY")
+    if not resend_api_key:
+        return None
+    # The Resend SDK is module-level: configure the key and hand back the module
+    import resend
+    resend.api_key = resend_api_key
+    return resend
+
+
+register_provider("openai", _create_openai_client)
+register_provider("plaid", _create_plaid_client)
+register_provider("resend", _create_resend_client)
+
+
+def get_openai_client():
+    return get_provider("openai")
+
+
+def get_plaid_client():
+    return get_provider("plaid")
+
+
+def get_resend_client():
+    return get_provider("resend")
@@ -0,0 +1,167 @@
+"""
+Query-result cache invalidated by table versions
+
+Popular reads (client list, invoices by status, debt summary, ...) are cached
+as their serialized response bytes, keyed on (route, params), together with
+the versions of the tables they were built from (utils/table_versions.py).
+A lookup reads the current versions (one indexed query) and serves the cached
+bytes only if none of them changed. Every ORM write bumps the versions of the
+tables it touched in its own transaction (after_flush), so a write through any
+router invalidates exactly the entries that read those tables - no TTLs and no
+invalidation calls in the write paths. Versions live in the database, so this
+holds across uvicorn workers even though each process has its own cache.
+
+The versions are read before the result is computed, so a write that commits
+in between leaves the entry stored under the older versions: it is never
+served, and the next lookup recomputes it.
+
+Bounds: least recently used entries are evicted beyond QUERY_CACHE_MAX_ENTRIES
+entries or QUERY_CACHE_MAX_BYTES of cached bytes; results larger than
+QUERY_CACHE_MAX_ENTRY_BYTES are never cached.
+
+Hits, misses and evictions per route are exported on /metrics; each cached
+route adds cache;desc="hit" / "miss" to its Server-Timing header.
+
+QUERY_CACHE_ENABLED=false turns it off.
+"""
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Hashable, Iterable, List, NamedTuple, Tuple
+from sqlalchemy.orm import Session
+from utils.metrics import current_stats, register_collector
+from utils.table_versions import get_table_versions
+
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() not in ("false", "0", "no")
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+QUERY_CACHE_MAX_ENTRY_BYTES = int(os.getenv("QUERY_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024)))
+
+# Rough per-entry bookkeeping (key, versions, OrderedDict node) counted against QUERY_CACHE_MAX_BYTES
+ENTRY_OVERHEAD_BYTES = 512
+
+
+class Entry(NamedTuple):
+    versions: Tuple[int, ...]
+    value: bytes
+    size: int
+
+
+_lock = threading.Lock()
+_entries: "OrderedDict[tuple, Entry]" = OrderedDict()
+_bytes = 0
+_hits: Dict[str, int] = defaultdict(int)         # route -> count
+_misses: Dict[str, int] = defaultdict(int)
+_evictions: Dict[str, int] = defaultdict(int)
+
+
+def _evict():
+    """Drop least recently used entries until within bounds (caller holds _lock)"""
+    global _bytes
+    while _entries and (len(_entries) > QUERY_CACHE_MAX_ENTRIES or _bytes > QUERY_CACHE_MAX_BYTES):
+        key, entry = _entries.popitem(last=False)
+        _bytes -= entry.size
+        _evictions[key[0]] += 1
+
+
+def _mark(status: str):
+    stats = current_stats()
+    if stats is not None:
+        stats.cache = status
+
+
+def cached(db: Session, route: str, params: Hashable, models: Iterable, compute: Callable[[], bytes]) -> bytes:
+    """
+    The bytes compute() returns for (route, params), reusing the last result
+    while none of the `models`' tables has been written since
+
+    Args:
+        route: Cache namespace and metrics label, e.g. "GET /api/clients/"
+        params: Everything else the result depends on (query parameters), hashable
+        models: Models whose tables the result is read from
+        compute: Builds the serialized result
+    """
+    global _bytes
+    if not QUERY_CACHE_ENABLED:
+        return compute()
+    tables = [model.__tablename__ for model in models]
+    versions = get_table_versions(db, tables)
+    version_key = tuple(versions[name][0] for name in tables)
+    key = (route, params)
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.versions == version_key:
+            _entries.move_to_end(key)
+            _hits[route] += 1
+            _mark("hit")
+            return entry.value
+        _misses[route] += 1
+    _mark("miss")
+
+    value = compute()
+    size = len(value) + ENTRY_OVERHEAD_BYTES
+    if size > QUERY_CACHE_MAX_ENTRY_BYTES:
+        return value
+    with _lock:
+        previous = _entries.pop(key, None)
+        if previous is not None:
+            _bytes -= previous.size
+        _entries[key] = Entry(version_key, value, size)
+        _bytes += size
+        _evict()
+    return value
+
+
+def get_stats() -> dict:
+    """Entries, bytes and hit/miss/eviction counts per route"""
+    with _lock:
+        routes = sorted(set(_hits) | set(_misses) | set(_evictions))
+        by_route = []
+        for route in routes:
+            hits, misses = _hits[route], _misses[route]
+            by_route.append({
+                "route": route,
+                "hits": hits,
+                "misses": misses,
+                "evictions": _evictions[route],
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+                "entries": sum(1 for key in _entries if key[0] == route),
+            })
+        return {
+            "enabled": QUERY_CACHE_ENABLED,
+            "entries": len(_entries),
+            "bytes": _bytes,
+            "max_entries": QUERY_CACHE_MAX_ENTRIES,
+            "max_bytes": QUERY_CACHE_MAX_BYTES,
+            "routes": by_route,
+        }
+
+
+def clear_query_cache():
+    """Drop every cached result (counters are kept)"""
+    global _bytes
+    with _lock:
+        _entries.clear()
+        _bytes = 0
+
+
+def _prometheus_lines() -> List[str]:
+    stats = get_stats()
+    lines = []
+    for name, help_text in (("hits", "Query cache hits"), ("misses", "Query cache misses"),
+                            ("evictions", "Query cache entries evicted (LRU / size bound)")):
+        lines += [f"# HELP query_cache_{name}_total {help_text}", f"# TYPE query_cache_{name}_total counter"]
+        lines += [f'query_cache_{name}_total{{route="{route["route"]}"}} {route[name]}' for route in stats["routes"]]
+    lines += [
+        "# HELP query_cache_entries Results currently cached",
+        "# TYPE query_cache_entries gauge",
+        f"query_cache_entries {stats['entries']}",
+        "# HELP query_cache_bytes Bytes of cached results (including per-entry overhead)",
+        "# TYPE query_cache_bytes gauge",
+        f"query_cache_bytes {stats['bytes']}",
+    ]
+    return lines
+
+
+register_collector(_prometheus_lines)
@@ -1,133 +1,324 @@
 """
-Rate limiter for AI SOW generation
-Allows 3 uses, then 5-minute cooldown before it can be used again
-Admin users bypass rate limiting
+Per-identity token-bucket rate limiting (AI SOW generation, booking form)
+
+Every limiter keeps one bucket per identity. A request is always charged to
+its client IP's bucket, and also to its user's bucket when it names one
+(`user_email`). The email isn't verified - it's a query/body parameter - so on
+its own it would let a caller pick a fresh bucket per request; it only ever
+narrows the limit. A bucket holds up to `capacity` tokens and refills
+continuously, `capacity` tokens per `per_seconds`; a request takes one token
+(or `cost`). A check is O(1) per bucket: read it, add the tokens earned since
+it was last touched, take one.
+
+A bucket that has been idle long enough to refill is indistinguishable from a
+new one, so idle buckets are evicted instead of growing memory forever.
+
+Backends (RATE_LIMIT_BACKEND):
+    memory  per-process dict, LRU-bounded (default; one uvicorn worker)
+    sqlite  a table in a shared SQLite file (RATE_LIMIT_SQLITE_PATH), updated
+            in a write transaction, so limits hold across uvicorn workers on
+            the same host
+
+Admin requests bypass the AI limiter: is_admin passed by the caller, or the
+ADMIN_API_TOKEN header (utils/admin_auth.py). An admin email alone doesn't.
 """
-from datetime import datetime, timedelta
-from typing import Optional
+import math
+import os
+import sqlite3
 import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from utils.admin_auth import is_admin_request
 
-# List of admin emails that bypass rate limiting
+# Admin users seeded into user_profiles (migrations/v002_add_admin_column.py)
 ADMIN_EMAILS = [
     "dks1018@gmail.com",
     "info@secondlifesoftware.com"
 ]
 
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "./rate_limits.db")
+# Upper bound on buckets held by the memory backend (least recently used are dropped first)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+# Only trust X-Forwarded-For when the API is behind a reverse proxy that sets it
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() in ("true", "1", "yes")
+# AI section regeneration: sections per burst, refilling over SOW_AI_SECTION_RATE_LIMIT_SECONDS
+SOW_AI_SECTION_RATE_LIMIT = int(os.getenv("SOW_AI_SECTION_RATE_LIMIT", "8"))
+SOW_AI_SECTION_RATE_LIMIT_SECONDS = int(os.getenv("SOW_AI_SECTION_RATE_LIMIT_SECONDS", "300"))
+
+# The SQLite backend deletes refilled buckets at most this often
+CLEANUP_INTERVAL_SECONDS = 60
+
+
+class Bucket(NamedTuple):
+    tokens: float
+    updated_at: float
+    full_at: float      # when the bucket will be full again (safe to evict after this)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until the bucket has a token again (0 if it has one)
+
+
+def take_token(bucket: Optional[Bucket], capacity: int, rate: float, cost: float, now: float) -> Tuple[bool, Bucket]:
+    """Refill `bucket` up to `now` and take `cost` tokens if there are enough"""
+    if bucket is None:
+        tokens = float(capacity)
+    else:
+        tokens = min(float(capacity), bucket.tokens + max(0.0, now - bucket.updated_at) * rate)
+    allowed = tokens >= cost
+    if allowed:
+        tokens -= cost
+    return allowed, Bucket(tokens, now, now + (capacity - tokens) / rate)
+
+
+class MemoryBackend:
+    """Buckets in a per-process OrderedDict, least recently used first"""
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Bucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float, cost: float, now: float) -> Tuple[bool, Bucket]:
+        with self._lock:
+            allowed, bucket = take_token(self._buckets.get(key), capacity, rate, cost, now)
+            if cost:
+                self._buckets[key] = bucket
+                self._buckets.move_to_end(key)
+                self._evict(now)
+            return allowed, bucket
+
+    def _evict(self, now: float):
+        # The front is the least recently touched bucket; drop it while it has refilled
+        # (amortized O(1)), and unconditionally when over the size cap
+        while self._buckets:
+            key, oldest = next(iter(self._buckets.items()))
+            if oldest.full_at > now and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite table shared by every worker process on the host"""
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._last_cleanup = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                " bucket TEXT PRIMARY KEY, tokens REAL NOT NULL,"
+                " updated_at REAL NOT NULL, full_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limit_buckets_full_at ON rate_limit_buckets (full_at)")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: int, rate: float, cost: float, now: float) -> Tuple[bool, Bucket]:
+        conn = self._connection()
+        if not cost:
+            row = conn.execute("SELECT tokens, updated_at, full_at FROM rate_limit_buckets WHERE bucket = ?", (key,)).fetchone()
+            return take_token(Bucket(*row) if row else None, capacity, rate, cost, now)
+
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent workers
+        # serialize on the read-modify-write instead of both spending the same token
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at, full_at FROM rate_limit_buckets WHERE bucket = ?", (key,)).fetchone()
+            allowed, bucket = take_token(Bucket(*row) if row else None, capacity, rate, cost, now)
+            if allowed:
+                conn.execute(
+                    "INSERT INTO rate_limit_buckets (bucket, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(bucket) DO UPDATE SET tokens = excluded.tokens,"
+                    " updated_at = excluded.updated_at, full_at = excluded.full_at",
+                    (key, bucket.tokens, bucket.updated_at, bucket.full_at),
+                )
+            if now - self._last_cleanup >= CLEANUP_INTERVAL_SECONDS:
+                self._last_cleanup = now
+                conn.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, bucket
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The shared backend selected by RATE_LIMIT_BACKEND (created on first use)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if RATE_LIMIT_BACKEND == "sqlite":
+                    _backend = SQLiteBackend(RATE_LIMIT_SQLITE_PATH)
+                elif RATE_LIMIT_BACKEND == "memory":
+                    _backend = MemoryBackend()
+                else:
+                    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {RATE_LIMIT_BACKEND!r} (use 'memory' or 'sqlite')")
+    return _backend
+
+
+def client_ip(request) -> str:
+    """Client address of a Starlette request (first X-Forwarded-For hop if RATE_LIMIT_TRUST_PROXY)"""
+    if request is None:
+        return "unknown"
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit_identities(user_email: Optional[str] = None, request=None) -> List[str]:
+    """Buckets a request is charged to: the client IP, plus the user's email when given"""
+    identities = [f"ip:{client_ip(request)}"]
+    if user_email:
+        identities.append(f"user:{user_email.strip().lower()}")
+    return identities
+
+
+def _format_wait(seconds: int) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    if minutes > 0:
+        return f"{minutes} minute{'s' if minutes > 1 else ''} and {seconds} second{'s' if seconds != 1 else ''}"
+    return f"{seconds} second{'s' if seconds != 1 else ''}"
+
+
 class RateLimiter:
     """
-    Simple in-memory rate limiter with admin bypass
-    Tracks: number of requests and cooldown expiration time
-    Admin users bypass all rate limits
+    Token bucket per identity: `capacity` requests in a burst, refilled at
+    `capacity` per `per_seconds`
+
+    Args:
+        name: Bucket namespace, so limiters can share a backend
+        capacity: Burst size (requests allowed back to back)
+        per_seconds: Time for an empty bucket to refill completely
+        message: 429 message; {wait} is replaced by the time until the next token
+        admin_bypass: Let is_admin / admin-token requests through
+        backend: MemoryBackend / SQLiteBackend (default: get_backend())
     """
-    def __init__(self, max_requests: int = 3, cooldown_seconds: int = 300):
+    def __init__(self, name: str, capacity: int, per_seconds: float,
+                 message: str = "Rate limit exceeded. Please wait {wait}.",
+                 admin_bypass: bool = True, backend=None):
+        self.name = name
+        self.capacity = capacity
+        self.per_seconds = per_seconds
+        self.rate = capacity / per_seconds
+        self.message = message
+        self.admin_bypass = admin_bypass
+        self._backend = backend
+
+    @property
+    def backend(self):
+        return self._backend if self._backend is not None else get_backend()
+
+    def check(self, identity: str, cost: float = 1, peek_cost: Optional[float] = None) -> RateLimitResult:
         """
-        Args:
-            max_requests: Maximum number of requests allowed (default: 3)
-            cooldown_seconds: Cooldown period in seconds after max_requests (default: 300 = 5 minutes)
+        Take `cost` tokens from the identity's bucket (cost=0 only inspects it;
+        peek_cost is then the request size `allowed` and retry_after refer to)
         """
-        self.max_requests = max_requests
-        self.cooldown_seconds = cooldown_seconds
-        self.request_count = 0
-        self.first_request_time: Optional[datetime] = None
-        self.cooldown_until: Optional[datetime] = None
-        self.lock = threading.Lock()
-    
-    def check_rate_limit(self, user_email: Optional[str] = None, is_admin: bool = False) -> tuple[bool, Optional[str]]:
+        needed = cost if peek_cost is None else peek_cost
+        allowed, bucket = self.backend.take(f"{self.name}:{identity}", self.capacity, self.rate, cost, time.time())
+        if not cost:
+            allowed = bucket.tokens + 1e-9 >= needed
+        missing = max(needed, 1) - bucket.tokens
+        retry_after = missing / self.rate if missing > 0 else 0.0
+        return RateLimitResult(allowed, int(bucket.tokens + 1e-9), retry_after)
+
+    def check_rate_limit(self, user_email: Optional[str] = None, request=None,
+                         is_admin: bool = False, cost: float = 1) -> Tuple[bool, Optional[str]]:
         """
         Check if request is allowed
-        
+
         Args:
-            user_email: Email of the user making the request
-            is_admin: Whether the user is an admin (bypasses rate limiting)
-        
+            user_email: Email the request names (an extra bucket, never instead of the IP's)
+            request: Starlette request, for the client IP and admin token
+            is_admin: Whether the caller is a verified admin (bypasses rate limiting)
+            cost: Tokens the request takes, e.g. one per OpenAI call
+
         Returns:
             (is_allowed, error_message)
-            - is_allowed: True if request can proceed, False if rate limited
-            - error_message: None if allowed, or error message if rate limited
         """
-        # Admin users bypass rate limiting
-        if is_admin or (user_email and user_email.lower() in [email.lower() for email in ADMIN_EMAILS]):
-            return True, None
-        
-        with self.lock:
-            now = datetime.now()
-            
-            # Check if we're in cooldown period
-            if self.cooldown_until and now < self.cooldown_until:
-                remaining_seconds = int((self.cooldown_until - now).total_seconds())
-                minutes = remaining_seconds // 60
-                seconds = remaining_seconds % 60
-                if minutes > 0:
-                    error_msg = f"Rate limit exceeded. Please wait {minutes} minute{'s' if minutes > 1 else ''} and {seconds} second{'s' if seconds != 1 else ''} before generating another SOW."
-                else:
-                    error_msg = f"Rate limit exceeded. Please wait {seconds} second{'s' if seconds != 1 else ''} before generating another SOW."
-                return False, error_msg
-            
-            # Reset if cooldown expired
-            if self.cooldown_until and now >= self.cooldown_until:
-                self.request_count = 0
-                self.first_request_time = None
-                self.cooldown_until = None
-            
-            # Check if we've hit the limit
-            if self.request_count >= self.max_requests:
-                # Start cooldown period
-                self.cooldown_until = now + timedelta(seconds=self.cooldown_seconds)
-                remaining_seconds = self.cooldown_seconds
-                minutes = remaining_seconds // 60
-                seconds = remaining_seconds % 60
-                error_msg = f"Rate limit exceeded ({self.max_requests} uses). Please wait {minutes} minute{'s' if minutes > 1 else ''} and {seconds} second{'s' if seconds != 1 else ''} before generating another SOW."
-                return False, error_msg
-            
-            # Increment request count
-            if self.request_count == 0:
-                self.first_request_time = now
-            self.request_count += 1
-            
+        if self.admin_bypass and (is_admin or is_admin_request(request)):
             return True, None
-    
-    def get_status(self) -> dict:
+        if cost > self.capacity:
+            return False, f"This request needs {cost:g} requests' worth of the rate limit; at most {self.capacity} are allowed at once."
+        identities = rate_limit_identities(user_email, request)
+        # Only spend tokens when every bucket has enough, so a refused request costs nothing
+        results = [self.check(identity, cost=0, peek_cost=cost) for identity in identities]
+        if all(result.allowed for result in results):
+            results = [self.check(identity, cost=cost) for identity in identities]
+            if all(result.allowed for result in results):
+                return True, None
+        retry_after = max(result.retry_after for result in results)
+        return False, self.message.format(wait=_format_wait(math.ceil(retry_after)))
+
+    def get_status(self, user_email: Optional[str] = None, request=None) -> dict:
         """
-        Get current rate limit status
-        
+        Current bucket for the caller, without taking a token
+
         Returns:
             dict with:
-            - requests_used: Number of requests used
-            - requests_remaining: Number of requests remaining
-            - cooldown_until: When cooldown expires (None if not in cooldown)
+            - requests_used: Tokens spent and not yet refilled
+            - requests_remaining: Requests allowed right now
+            - cooldown_until: When the next token arrives (None if one is available)
             - can_use: Whether a request can be made now
         """
-        with self.lock:
-            now = datetime.now()
-            
-            # Check if in cooldown
-            if self.cooldown_until and now < self.cooldown_until:
-                remaining_seconds = int((self.cooldown_until - now).total_seconds())
-                return {
-                    "requests_used": self.max_requests,
-                    "requests_remaining": 0,
-                    "cooldown_until": self.cooldown_until.isoformat(),
-                    "cooldown_remaining_seconds": remaining_seconds,
-                    "can_use": False
-                }
-            
-            # Reset if cooldown expired
-            if self.cooldown_until and now >= self.cooldown_until:
-                self.request_count = 0
-                self.first_request_time = None
-                self.cooldown_until = None
-            
-            remaining = self.max_requests - self.request_count
-            return {
-                "requests_used": self.request_count,
-                "requests_remaining": remaining,
-                "cooldown_until": None,
-                "cooldown_remaining_seconds": 0,
-                "can_use": True
-            }
-
-
-# Global rate limiter instance
-# 3 requests, then 5-minute (300 seconds) cooldown
-sow_ai_rate_limiter = RateLimiter(max_requests=3, cooldown_seconds=300)
+        if self.admin_bypass and is_admin_request(request):
+            remaining, retry_after = self.capacity, 0.0
+        else:
+            # The tightest of the caller's buckets is what limits them
+            results = [self.check(identity, cost=0) for identity in rate_limit_identities(user_email, request)]
+            remaining = min(result.remaining for result in results)
+            retry_after = max(result.retry_after for result in results)
+        cooldown_seconds = math.ceil(retry_after)
+        return {
+            "requests_used": self.capacity - remaining,
+            "requests_remaining": remaining,
+            "cooldown_until": (datetime.now() + timedelta(seconds=cooldown_seconds)).isoformat() if cooldown_seconds else None,
+            "cooldown_remaining_seconds": cooldown_seconds,
+            "can_use": remaining > 0,
+        }
+
+
+# AI SOW generation: bursts of 3 per IP (and per user), refilling over 5 minutes (one every 100s)
+sow_ai_rate_limiter = RateLimiter(
+    "sow_ai", capacity=3, per_seconds=300,
+    message="Rate limit exceeded. Please wait {wait} before generating another SOW.",
+)
+
+# AI section regeneration: one token per section, so a request can refresh up to
+# SOW_AI_SECTION_RATE_LIMIT sections (default 8, refilling over 5 minutes)
+sow_ai_section_rate_limiter = RateLimiter(
+    "sow_ai_section", capacity=SOW_AI_SECTION_RATE_LIMIT, per_seconds=SOW_AI_SECTION_RATE_LIMIT_SECONDS,
+    message="Rate limit exceeded. Please wait {wait} before regenerating more sections.",
+)
 
+# Public booking form: 3 submissions per IP (and per email), refilling over an hour
+booking_rate_limiter = RateLimiter(
+    "booking", capacity=3, per_seconds=3600,
+    message="Too many booking requests. Please wait {wait} before submitting again.",
+    admin_bypass=False,
+)
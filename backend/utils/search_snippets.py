@@ -0,0 +1,21 @@
+"""
+Search result snippets, safe to render as HTML
+
+ts_headline() / FTS5 snippet() mark matches with the private-use characters
+MATCH_START / MATCH_END instead of tags; render_snippet() HTML-escapes the
+indexed text and only then turns the markers into <mark> tags.
+"""
+import html
+from typing import Optional
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet's text, then turn the match markers into <mark> tags"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, SNIPPET_START).replace(MATCH_END, SNIPPET_END)
@@ -0,0 +1,196 @@
+"""
+Slow-query log with automatic EXPLAIN capture
+
+SQLAlchemy cursor events time every statement. Statements slower than
+SLOW_QUERY_THRESHOLD_MS are recorded in an in-memory ring buffer (the last
+SLOW_QUERY_LOG_SIZE entries) with:
+- the normalized SQL (literals replaced by ?, IN lists collapsed) for grouping
+- the bound parameters (truncated), only with SLOW_QUERY_LOG_PARAMETERS=true:
+  they carry client PII, encrypted passwords and tokens
+- the route that issued it (from utils.metrics) or "background"
+- the query plan: EXPLAIN QUERY PLAN on SQLite, EXPLAIN on Postgres, captured
+  once per normalized statement and flagged when it contains a full table scan
+
+The buffer is served by GET /api/admin/slow-queries (X-Admin-Token).
+
+Settings (environment):
+    SLOW_QUERY_THRESHOLD_MS=200   # 0 disables the log
+    SLOW_QUERY_LOG_SIZE=200
+    SLOW_QUERY_EXPLAIN=true
+    SLOW_QUERY_LOG_PARAMETERS=false
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import event
+from utils.metrics import current_route
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() not in ("false", "0", "no")
+SLOW_QUERY_LOG_PARAMETERS = os.getenv("SLOW_QUERY_LOG_PARAMETERS", "false").lower() in ("true", "1", "yes")
+
+# Plans are cached per normalized statement, so a hot slow query is explained once
+PLAN_CACHE_SIZE = 256
+MAX_PARAMETER_CHARS = 500
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE|INSERT)\b", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_lock = threading.Lock()
+_entries: deque = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_plans: "OrderedDict[str, List[str]]" = OrderedDict()
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and replace literals/placeholders with ? so equivalent queries group together"""
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("(...)", sql)
+
+
+def _format_parameters(parameters, executemany: bool) -> Optional[str]:
+    if not SLOW_QUERY_LOG_PARAMETERS:
+        return None
+    if executemany and parameters:
+        text = f"{parameters[0]!r} (+{len(parameters) - 1} more)"
+    else:
+        text = repr(parameters)
+    return text if len(text) <= MAX_PARAMETER_CHARS else text[:MAX_PARAMETER_CHARS] + "..."
+
+
+def _has_full_scan(dialect_name: str, plan: List[str]) -> bool:
+    if dialect_name == "postgresql":
+        return any("Seq Scan" in line for line in plan)
+    # SQLite: "SCAN invoice_items" is a table scan, "SCAN ... USING (COVERING) INDEX" is not
+    return any(line.lstrip().startswith("SCAN ") and "USING" not in line for line in plan)
+
+
+def _explain(cursor, dialect_name: str, statement: str, parameters) -> List[str]:
+    """Run EXPLAIN on a raw DBAPI cursor (bypasses SQLAlchemy events, so it isn't timed itself)"""
+    explain_cursor = cursor.connection.cursor()
+    try:
+        if dialect_name == "sqlite":
+            explain_cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            # Rows are (id, parent, notused, detail); indent children under their parent
+            depth = {0: -1}
+            lines = []
+            for row_id, parent, _, detail in explain_cursor.fetchall():
+                depth[row_id] = depth.get(parent, -1) + 1
+                lines.append("  " * depth[row_id] + detail)
+            return lines
+        if dialect_name == "postgresql":
+            explain_cursor.execute(f"EXPLAIN {statement}", parameters or None)
+            return [row[0] for row in explain_cursor.fetchall()]
+        return []
+    finally:
+        explain_cursor.close()
+
+
+def _plan_for(cursor, dialect_name: str, normalized: str, statement: str, parameters) -> Optional[List[str]]:
+    if not SLOW_QUERY_EXPLAIN or not _EXPLAINABLE.match(statement):
+        return None
+    with _lock:
+        if normalized in _plans:
+            _plans.move_to_end(normalized)
+            return _plans[normalized]
+    try:
+        plan = _explain(cursor, dialect_name, statement, parameters)
+    except Exception as e:
+        plan = [f"EXPLAIN failed: {e}"]
+    with _lock:
+        _plans[normalized] = plan
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+def record_slow_query(cursor, dialect_name: str, statement: str, parameters, executemany: bool, duration: float):
+    normalized = normalize_sql(statement)
+    explain_parameters = parameters[0] if executemany and parameters else parameters
+    plan = _plan_for(cursor, dialect_name, normalized, statement, explain_parameters)
+    route = current_route() or "background"
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration * 1000, 2),
+        "route": route,
+        "statement": normalized,
+        "parameters": _format_parameters(parameters, executemany),
+        "plan": plan,
+        "full_scan": _has_full_scan(dialect_name, plan) if plan else False,
+    }
+    with _lock:
+        _entries.append(entry)
+    print(f"[SLOW-QUERY] {entry['duration_ms']}ms {route}: {normalized[:200]}")
+
+
+def install_slow_query_log(engine):
+    """Attach the cursor event listeners (no-op when SLOW_QUERY_THRESHOLD_MS is 0)"""
+    if SLOW_QUERY_THRESHOLD_MS <= 0 or getattr(engine, "_slow_query_log_installed", False):
+        return
+    threshold = SLOW_QUERY_THRESHOLD_MS / 1000
+    dialect_name = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["slow_query_start_time"].pop()
+        if duration >= threshold:
+            record_slow_query(cursor, dialect_name, statement, parameters, executemany, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("slow_query_start_time"):
+            conn.info["slow_query_start_time"].pop()
+
+    engine._slow_query_log_installed = True
+
+
+def get_slow_queries(limit: int = 100, route: Optional[str] = None) -> List[dict]:
+    """Most recent slow queries first"""
+    with _lock:
+        entries = list(_entries)
+    if route:
+        entries = [e for e in entries if e["route"] == route]
+    return entries[::-1][:limit]
+
+
+def summarize_slow_queries() -> List[dict]:
+    """Slow queries grouped by normalized statement, worst total time first"""
+    with _lock:
+        entries = list(_entries)
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry["statement"], {
+            "statement": entry["statement"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "routes": set(), "plan": entry["plan"], "full_scan": entry["full_scan"],
+        })
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+        group["routes"].add(entry["route"])
+    summary = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+    for group in summary:
+        group["total_ms"] = round(group["total_ms"], 2)
+        group["routes"] = sorted(group["routes"])
+    return summary
+
+
+def clear_slow_queries():
+    with _lock:
+        _entries.clear()
+        _plans.clear()
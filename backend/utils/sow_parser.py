@@ -0,0 +1,143 @@
+"""
+Single-pass parser for AI-generated SOW text
+
+The model is asked for "SECTION: <n>. <title>" / "CONTENT: ..." blocks
+followed by "SUGGESTIONS:", but what comes back varies: markdown headings
+("### 6. Technical Architecture", "## SECTION: ..."), bold titles, "and"
+instead of "&", titles without their "(Core Section)" / "/ Purpose" suffix,
+"Section 10: ...", "---" separators, a chatty preamble, output cut off by
+max_tokens.
+
+All header forms are compiled into one multiline regex over the whole text
+(one alternative per known section title, plus unknown "SECTION:" headers and
+the suggestions header), so parsing is one finditer pass plus one marker
+substitution per section, instead of scanning every line against every title.
+
+A line is a header only if it carries a section number or a "SECTION:"
+prefix followed by a known title (so the 19 title alternatives are only tried
+on such lines), and nothing else follows the title except a
+":"/"-" and inline content. Numbered list items inside a section ("4.
+Deliverables will be reviewed weekly") stay content.
+"""
+import re
+from typing import Dict, List, Tuple
+from utils.sow_templates import SOW_SECTIONS
+
+SECTION_TITLES = [section["title"] for section in SOW_SECTIONS]
+
+
+def _title_pattern(title: str) -> str:
+    """Regex matching a canonical title (without its number) and its usual variants"""
+    name = title.split(". ", 1)[1]
+    # "Executive Summary / Purpose", "Scope of Work (Core Section)": the suffix is optional
+    main, suffix = name, []
+    for separator in (" / ", " ("):
+        if separator in name:
+            main, rest = name.split(separator, 1)
+            suffix = [separator.strip()] + rest.split()
+            break
+    words = [
+        r"(?:&|and)" if word == "&" else re.escape(word.rstrip(",")) + (",?" if word.endswith(",") else "")
+        for word in main.split()
+    ]
+    pattern = r"[ \t]+".join(words)
+    if suffix:
+        pattern += r"(?:[ \t]*" + r"[ \t]*".join(re.escape(part) for part in suffix) + ")?"
+    return pattern
+
+
+_TITLES = "|".join(f"(?P<t{index}>{_title_pattern(title)})" for index, title in enumerate(SECTION_TITLES))
+
+_DECORATION = r"(?:\#{1,6}[ \t]*)?(?:\*\*|__)?"
+_CLOSE = r"(?:\*\*|__)?"
+
+_TOKENS = re.compile(
+    rf"""^[ \t]*{_DECORATION}
+    (?:
+        # SUGGESTIONS: / Suggestions & Recommendations: (optionally followed by the first suggestion)
+        (?P<suggestions>SUGGESTIONS)(?P<qualifier>[ \t]+[^\n:*_]{{1,40}}?)?{_CLOSE}[ \t]*
+        (?:(?P<colon>:){_CLOSE}[ \t]*(?P<suggestion>[^\n]*?))?
+      |
+        # SECTION: [n.] <known title> / <n>. <known title> [: inline content]
+        (?:SECTION\b[ \t]*:?[ \t]*{_CLOSE}(?:\d{{1,2}}[ \t]*[.):\-]?[ \t]*)? | \d{{1,2}}[ \t]*[.):\-]?[ \t]*)
+        (?:{_TITLES})
+        [ \t]*{_CLOSE}(?:[ \t]*[:\-–—]{_CLOSE}[ \t]*(?P<inline>[^\n]*?))?
+      |
+        # SECTION: <anything else>
+        SECTION[ \t]*:[ \t]*{_CLOSE}(?P<unknown>[^\n]*?){_CLOSE}
+    )
+    [ \t]*$""",
+    re.MULTILINE | re.IGNORECASE | re.VERBOSE,
+)
+
+# CONTENT: markers (and stray bare SECTION: lines) left inside a section's text
+_MARKERS = re.compile(r"^[ \t]*(?:\*\*|__)?(?:CONTENT|SECTION)(?:\*\*|__)?[ \t]*:(?:\*\*|__)?[ \t]?", re.MULTILINE | re.IGNORECASE)
+# Horizontal rules / stray closing markup the model puts between sections
+_RULE = re.compile(r"-{3,}|\*{3,}|_{3,}|```")
+
+
+def _section_index(match: re.Match):
+    groups = match.groupdict()
+    for index in range(len(SECTION_TITLES)):
+        if groups[f"t{index}"] is not None:
+            return index
+    return None
+
+
+def _clean(text: str) -> str:
+    text = _MARKERS.sub("", text).strip()
+    while text:
+        rest, _, last = text.rpartition("\n")
+        if not _RULE.fullmatch(last.strip()):
+            break
+        text = rest.rstrip()
+    return text
+
+
+def parse_sow_sections(ai_content: str) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Sections and suggestions in an AI SOW response
+
+    Returns ({title: content}, suggestions). Known sections are keyed by their
+    canonical title from SOW_SECTIONS whatever heading variant the model used;
+    unknown "SECTION: ..." headers keep the title as written. Sections with no
+    content are left out; a title repeated later has its content appended.
+    Text before the first header is ignored.
+    """
+    sections: Dict[str, str] = {}
+    suggestions: List[str] = []
+    title = None
+    start = 0
+
+    def close(end: int):
+        if title is None:
+            return
+        content = _clean(ai_content[start:end])
+        if content:
+            sections[title] = f"{sections[title]}\n\n{content}" if title in sections else content
+
+    for match in _TOKENS.finditer(ai_content):
+        if match.group("suggestions"):
+            if match.group("qualifier") and not match.group("colon"):
+                continue  # "Suggestions below are ..." is a sentence, not the header
+            close(match.start())
+            title = None
+            rest = [match.group("suggestion") or ""] + ai_content[match.end():].split("\n")
+            suggestions = [line.strip() for line in rest if line.strip()]
+            break
+        if match.group("unknown") is not None:
+            if not match.group("unknown").strip():
+                continue  # a bare "SECTION:" line; dropped with the other markers
+            close(match.start())
+            title = match.group("unknown").strip()
+            start = match.end()
+            continue
+        close(match.start())
+        title = SECTION_TITLES[_section_index(match)]
+        inline = match.group("inline")
+        # Inline content starts right after the title; keep it by starting the slice there
+        start = match.start("inline") if inline else match.end()
+    else:
+        close(len(ai_content))
+
+    return sections, suggestions
@@ -0,0 +1,197 @@
+"""
+Structured (JSON schema) output for AI SOW generation
+
+In text mode the model writes SECTION:/CONTENT: blocks that utils/sow_parser.py
+has to find again, and whatever it skips, truncates or leaves as a placeholder
+is padded from templates - so users re-run the whole generation. In
+structured mode the request carries a strict JSON schema (OpenAI structured
+outputs):
+
+    {"sections": [{"title", "order", "content"}], "suggestions": [...]}
+
+with `title` restricted to the SOW section titles.
+
+- Each section is validated on its own (StructuredSection, plus a minimum
+  length and no "[placeholder]" content), so one bad section doesn't discard
+  the rest. A response cut off by max_tokens is read as partial JSON and
+  keeps every section that arrived complete.
+- Sections still missing or invalid are re-requested - only those, with the
+  same context, a schema restricted to their titles and a proportional token
+  budget - up to SOW_AI_REPAIR_ATTEMPTS times. A failed repair call keeps
+  what was already generated.
+- Whatever is still missing after that is left to the caller (template
+  padding, as in text mode).
+
+Token usage of all calls is summed and returned so callers can report it.
+"""
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
+from pydantic_core import from_json
+from utils.metrics import track_external
+from utils.sow_parser import SECTION_TITLES
+
+SOW_AI_REPAIR_ATTEMPTS = int(os.getenv("SOW_AI_REPAIR_ATTEMPTS", "1"))
+
+# Shorter content than this is not a usable section ("TBD", "See above")
+MIN_SECTION_CHARS = 40
+# Floor for a repair call's max_tokens
+MIN_REPAIR_TOKENS = 1000
+
+STRUCTURED_OUTPUT_FORMAT = """CRITICAL FORMATTING REQUIREMENTS:
+- Return a JSON object with "sections" and "suggestions"
+- "sections": one object per requested section with "title" (exactly as listed above, including the number), "order" (the section number) and "content"
+- "content" is the section text only: plain paragraphs and "- " bullet lists, no markdown headers, no section title
+- Generate comprehensive, project-specific content for EVERY requested section
+- Do NOT skip any sections or use placeholders
+- "suggestions": improvements, missing information, potential issues or recommendations based on the client context and project details, one per item
+"""
+
+
+class StructuredSection(BaseModel):
+    title: str
+    order: int
+    content: str
+
+
+def sow_json_schema(titles: List[str]) -> dict:
+    """response_format for a structured SOW limited to `titles`"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "statement_of_work",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "sections": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {"type": "string", "enum": titles},
+                                "order": {"type": "integer"},
+                                "content": {"type": "string"},
+                            },
+                            "required": ["title", "order", "content"],
+                            "additionalProperties": False,
+                        },
+                    },
+                    "suggestions": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["sections", "suggestions"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def _usable(content: str) -> bool:
+    content = content.strip()
+    return len(content) >= MIN_SECTION_CHARS and not (content.startswith("[") and content.endswith("]"))
+
+
+def parse_structured_sow(content: Optional[str], titles: List[str]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Valid sections ({title: content}, first occurrence of each of `titles`)
+    and suggestions in a structured response, which may be truncated
+    """
+    try:
+        data = from_json(content or "", allow_partial=True)
+    except ValueError:
+        return {}, []
+    if not isinstance(data, dict):
+        return {}, []
+
+    sections = {}
+    for item in data.get("sections") or []:
+        try:
+            section = StructuredSection.model_validate(item)
+        except ValidationError:
+            continue  # e.g. the section the response was cut off in
+        if section.title in titles and section.title not in sections and _usable(section.content):
+            sections[section.title] = section.content.strip()
+    suggestions = [s.strip() for s in data.get("suggestions") or [] if isinstance(s, str) and s.strip()]
+    return sections, suggestions
+
+
+def add_usage(usage: dict, response) -> dict:
+    """Add a completion's token usage to `usage` ({calls, prompt_tokens, completion_tokens})"""
+    usage["calls"] = usage.get("calls", 0) + 1
+    counts = getattr(response, "usage", None)
+    for key in ("prompt_tokens", "completion_tokens"):
+        usage[key] = usage.get(key, 0) + (getattr(counts, key, 0) or 0)
+    return usage
+
+
+def _repair_instructions(missing: List[str]) -> str:
+    listed = "\n".join(f"- {title}" for title in missing)
+    return f"""
+IMPORTANT: The other sections have already been written. Generate ONLY these {len(missing)} section(s), following the guidance above for each:
+{listed}
+Return them in the same JSON format with an empty "suggestions" list.
+"""
+
+
+def generate_structured_sow(
+    client_ai,
+    system_prompt: str,
+    prompt: str,
+    max_tokens: int,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.7,
+) -> Tuple[Dict[str, str], List[str], dict]:
+    """
+    Generate SOW sections with structured output, re-requesting missing or
+    invalid sections
+
+    Args:
+        prompt: Full prompt (context + section guidance) ending in STRUCTURED_OUTPUT_FORMAT
+
+    Returns:
+        ({title: content} for the sections generated, suggestions, usage)
+        Errors from the first call are raised; later ones end the repairs.
+    """
+    sections: Dict[str, str] = {}
+    suggestions: List[str] = []
+    usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "repaired_sections": 0}
+    missing = list(SECTION_TITLES)
+
+    for attempt in range(1 + SOW_AI_REPAIR_ATTEMPTS):
+        if attempt == 0:
+            user_prompt, tokens = prompt, max_tokens
+        else:
+            user_prompt = prompt + _repair_instructions(missing)
+            share = math.ceil(max_tokens * len(missing) / len(SECTION_TITLES) * 1.5)
+            tokens = min(max_tokens, max(MIN_REPAIR_TOKENS, share))
+        try:
+            with track_external("openai"):
+                response = client_ai.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    temperature=temperature,
+                    max_tokens=tokens,
+                    response_format=sow_json_schema(missing),
+                )
+        except Exception as e:
+            if attempt == 0:
+                raise
+            print(f"Warning: re-requesting {len(missing)} SOW sections failed: {e}")
+            break
+        add_usage(usage, response)
+
+        parsed, new_suggestions = parse_structured_sow(response.choices[0].message.content, missing)
+        if attempt > 0:
+            usage["repaired_sections"] += len(parsed)
+        sections.update(parsed)
+        suggestions = suggestions or new_suggestions
+        missing = [title for title in SECTION_TITLES if title not in sections]
+        if not missing:
+            break
+        print(f"Warning: {len(missing)} SOW sections missing or invalid after call {attempt + 1}: {', '.join(missing)}")
+
+    return sections, suggestions, usage
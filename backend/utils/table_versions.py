@@ -0,0 +1,74 @@
+"""
+Per-table write versions
+
+table_versions holds a counter (and last-write time) per table. An after_flush
+hook on SessionLocal bumps the counter of every table the flush inserted into,
+updated or deleted from, and a do_orm_execute hook covers bulk
+query().update() / query().delete(). The bump runs on the flushing connection,
+so it commits or rolls back with the write itself, and every worker process
+sees the same versions.
+
+Readers (HTTP validators in utils/http_cache.py) treat an unchanged version as
+"nothing in this table changed". Writes that bypass the ORM (raw SQL, Core
+bulk loads) must call bump_table_versions() themselves.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import TableVersion
+
+_table = TableVersion.__table__
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(_table)
+    return stmt.on_conflict_do_update(
+        index_elements=[_table.c.table_name],
+        set_={"version": _table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+
+
+def bump_table_versions(conn, tables: Iterable[str]):
+    """Increment the version of each table (in the caller's transaction)"""
+    # Sorted so concurrent transactions lock the rows in the same order (no deadlocks on Postgres)
+    names = sorted(set(tables) - {_table.name})
+    if not names:
+        return
+    now = datetime.now(timezone.utc)
+    conn.execute(_upsert(conn.dialect.name), [{"table_name": name, "version": 1, "updated_at": now} for name in names])
+
+
+def get_table_versions(db: Session, tables: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """table name -> (version, last write time); tables never written report (0, None)"""
+    names = list(dict.fromkeys(tables))
+    rows = db.execute(
+        select(_table.c.table_name, _table.c.version, _table.c.updated_at).where(_table.c.table_name.in_(names))
+    ).all()
+    versions = {name: (0, None) for name in names}
+    for name, version, updated_at in rows:
+        if updated_at is not None and updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)  # SQLite drops the offset
+        versions[name] = (version, updated_at)
+    return versions
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _bump_flushed_tables(session: Session, flush_context):
+    tables = {obj.__table__.name for obj in session.new}
+    tables.update(obj.__table__.name for obj in session.deleted)
+    tables.update(obj.__table__.name for obj in session.dirty if session.is_modified(obj, include_collections=False))
+    if tables:
+        bump_table_versions(session.connection(), tables)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _bump_bulk_statement_tables(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        tables = {mapper.local_table.name for mapper in orm_execute_state.all_mappers}
+        bump_table_versions(orm_execute_state.session.connection(), tables)
@@ -31,14 +31,15 @@ function ClientDetail() {
 
   useEffect(() => {
     fetchClient();
-    fetchMeetingNotes();
   }, [id]);
 
+  // Client, contacts and notes in one request
   const fetchClient = async () => {
     try {
       setLoading(true);
-      const data = await clientAPI.getById(id);
-      setClient(data);
+      const workspace = await clientAPI.getWorkspace(id, ['contacts', 'notes']);
+      setClient({ ...workspace.client, contacts: workspace.contacts });
+      setMeetingNotesFrom(workspace.notes);
       setError('');
     } catch (err) {
       setError('Failed to load client: ' + err.message);
@@ -48,18 +49,22 @@ function ClientDetail() {
     }
   };
 
+  const setMeetingNotesFrom = (notes) => {
+    // Filter for meeting notes and sort by date (most recent first)
+    const meetings = notes
+      .filter(note => note.note_type === 'Meeting')
+      .sort((a, b) => {
+        const dateA = a.meeting_date ? new Date(a.meeting_date) : new Date(a.created_at);
+        const dateB = b.meeting_date ? new Date(b.meeting_date) : new Date(b.created_at);
+        return dateB - dateA;
+      });
+    setMeetingNotes(meetings);
+  };
+
   const fetchMeetingNotes = async () => {
     try {
       const notes = await clientNoteAPI.getByClientId(id);
-      // Filter for meeting notes and sort by date (most recent first)
-      const meetings = notes
-        .filter(note => note.note_type === 'Meeting')
-        .sort((a, b) => {
-          const dateA = a.meeting_date ? new Date(a.meeting_date) : new Date(a.created_at);
-          const dateB = b.meeting_date ? new Date(b.meeting_date) : new Date(b.created_at);
-          return dateB - dateA;
-        });
-      setMeetingNotes(meetings);
+      setMeetingNotesFrom(notes);
     } catch (err) {
       console.error('Error fetching meeting notes:', err);
     }
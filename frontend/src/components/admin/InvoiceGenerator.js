@@ -36,7 +36,7 @@ function InvoiceGenerator() {
       
       const [invoicesData, clientsData] = await Promise.all([
         invoiceAPI.getAll(params),
-        clientAPI.getAll(),
+        clientAPI.getAll({ fields: 'first_name,last_name,company' }),
       ]);
       
       setInvoices(invoicesData);
@@ -28,7 +28,7 @@ function ScopeOfWorkList() {
       }
       const [scopesData, clientsData] = await Promise.all([
         scopeOfWorkAPI.getAll(params),
-        clientAPI.getAll(),
+        clientAPI.getAll({ fields: 'first_name,last_name,company' }),
       ]);
       
       setScopes(scopesData);
@@ -98,6 +98,14 @@ export const clientAPI = {
     return handleResponse(response);
   },
 
+  // Get client with sub-resources in one request
+  // include: e.g. ['contacts', 'notes'] (default: every section)
+  getWorkspace: async (clientId, include = null) => {
+    const query = include && include.length ? `?include=${encodeURIComponent(include.join(','))}` : '';
+    const response = await fetch(`${API_BASE_URL}/api/clients/${clientId}/workspace${query}`);
+    return handleResponse(response);
+  },
+
   // Create client
   create: async (clientData) => {
     try {
@@ -688,8 +696,11 @@ export const scopeOfWorkAPI = {
     return handleResponse(response);
   },
 
-  getRateLimitStatus: async () => {
-    const response = await fetch(`${API_BASE_URL}/api/scope-of-work/ai/rate-limit-status`);
+  getRateLimitStatus: async (userEmail = null) => {
+    const url = userEmail
+      ? `${API_BASE_URL}/api/scope-of-work/ai/rate-limit-status?user_email=${encodeURIComponent(userEmail)}`
+      : `${API_BASE_URL}/api/scope-of-work/ai/rate-limit-status`;
+    const response = await fetch(url);
     return handleResponse(response);
   },
 
@@ -720,6 +731,22 @@ export const scopeOfWorkAPI = {
     return handleResponse(response);
   },
 
+  regenerateSections: async (scopeId, sectionTitles, userEmail = null) => {
+    const url = userEmail 
+      ? `${API_BASE_URL}/api/scope-of-work/${scopeId}/ai/regenerate-sections?user_email=${encodeURIComponent(userEmail)}`
+      : `${API_BASE_URL}/api/scope-of-work/${scopeId}/ai/regenerate-sections`;
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        section_titles: sectionTitles,
+      }),
+    });
+    return handleResponse(response);
+  },
+
   previewPDF: async (previewData) => {
     const response = await fetch(`${API_BASE_URL}/api/scope-of-work/preview-pdf`, {
       method: 'POST',
@@ -866,3 +893,19 @@ export const debtTrackerAPI = {
   },
 };
 
+
+// Batch API
+export const batchAPI = {
+  // Run several API calls in one request
+  // requests: [{ id, method = 'GET', path, query, body }] -> [{ id, status, headers, body }]
+  run: async (requests) => {
+    const response = await fetch(`${API_BASE_URL}/api/batch`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ requests }),
+    });
+    return handleResponse(response);
+  },
+};